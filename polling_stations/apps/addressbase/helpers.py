@@ -1,7 +1,13 @@
 import logging
 from collections import namedtuple
+from multiprocessing import Pool, current_process
+from django import db
+from django.contrib.gis.geos import GEOSGeometry
 from django.db import connection
+from councils.helpers import CouncilResolver
 from councils.models import Council
+from data_collection.loghelper import LogHelper
+from data_collection.staginghelper import get_live_table
 from pollingstations.models import (PollingDistrict, ResidentialAddress,
                                     PollingStation)
 from uk_geo_utils.helpers import Postcode
@@ -41,6 +47,7 @@ class EdgeCaseFixer:
         self.address_set = AddressSet()
         self.target_council_id = target_council_id
         self.logger = logger
+        self.council_resolver = CouncilResolver()
         self.AddressRecord = namedtuple('AddressRecord', [
             'uprn',
             'address',
@@ -55,14 +62,27 @@ class EdgeCaseFixer:
     def unpack_address(self, record):
         return self.AddressRecord(*record)
 
+    def assign_councils(self, addresses):
+        """
+        Fill in council_id for any addresses where we didn't find one
+        in ONSUD, using the address' location.
+        If we can't assign exactly one council, council_id is left blank.
+        """
+        missing = [i for i, a in enumerate(addresses) if not a.council_id]
+        if not missing:
+            return addresses
+
+        council_ids = self.council_resolver.get_council_ids(
+            [GEOSGeometry(addresses[i].location) for i in missing])
+        for i, council_id in zip(missing, council_ids):
+            addresses[i] = addresses[i]._replace(council_id=council_id or '')
+        return addresses
+
     def get_station_id(self, address):
         if not address.council_id:
-            c = Council.objects\
-                .defer("area")\
-                .get(area__covers=address.location)
-            council_id = c.council_id
-        else:
-            council_id = address.council_id
+            # see assign_councils()
+            raise Council.DoesNotExist
+        council_id = address.council_id
 
         if council_id != self.target_council_id:
             # treat addresses in other council areas as district not found
@@ -88,6 +108,36 @@ class EdgeCaseFixer:
         return polling_station
 
     def make_addresses_for_postcode(self, postcode):
+        self.make_addresses_for_postcodes([postcode])
+
+    def get_source(self, model):
+        """
+        SQL (and params) to select model's records from.
+
+        When we are staging an import, model's table only holds the council
+        we are importing, so we read every other council's records from
+        the live table. Otherwise we couldn't see an address in this council
+        which is also covered by a neighbouring council's district, and
+        staged imports would give different answers to live ones.
+        """
+        table = model._meta.db_table
+        live_table = get_live_table(model)
+        if live_table == table:
+            return table, []
+        return """(
+                SELECT * FROM {table}
+                UNION ALL
+                SELECT * FROM {live_table} WHERE council_id != %s
+            )""".format(table=table, live_table=live_table),\
+            [self.target_council_id]
+
+    def make_addresses_for_postcodes(self, postcodes):
+        if not postcodes:
+            return
+
+        districts, district_params = self.get_source(PollingDistrict)
+        stations, station_params = self.get_source(PollingStation)
+
         cursor = connection.cursor()
         cursor.execute(
             """
@@ -102,13 +152,13 @@ class EdgeCaseFixer:
                 ab.location
             FROM addressbase_address ab
 
-            LEFT JOIN pollingstations_pollingdistrict pd
+            LEFT JOIN {districts} pd
             ON ST_CONTAINS(pd.area, ab.location)
 
             LEFT JOIN uk_geo_utils_onsud os
             ON os.uprn=ab.uprn
 
-            LEFT JOIN pollingstations_pollingstation ps
+            LEFT JOIN {stations} ps
             ON (
                 (pd.polling_station_id=ps.internal_council_id
                     AND pd.council_id=ps.council_id)
@@ -122,20 +172,22 @@ class EdgeCaseFixer:
                     ab.uprn,
                     COUNT(*) AS count
                 FROM addressbase_address ab
-                LEFT JOIN pollingstations_pollingdistrict pd
+                LEFT JOIN {districts} pd
                 ON ST_CONTAINS(pd.area, ab.location)
-                WHERE ab.postcode=%s
+                WHERE ab.postcode = ANY(%s)
                 GROUP BY ab.uprn
             ) ct
             ON ab.uprn=ct.uprn
 
-            WHERE ab.postcode=%s
-            """, [postcode, postcode]
+            WHERE ab.postcode = ANY(%s)
+            """.format(districts=districts, stations=stations),
+            district_params + station_params + district_params +
+            [list(postcodes), list(postcodes)]
         )
-        addresses = cursor.fetchall()
+        addresses = self.assign_councils(
+            [self.unpack_address(record) for record in cursor.fetchall()])
 
-        for record in addresses:
-            address = self.unpack_address(record)
+        for address in addresses:
             try:
                 station_id = self.get_station_id(address)
             except PollingDistrict.DoesNotExist:
@@ -166,7 +218,7 @@ class EdgeCaseFixer:
 
             self.address_set.add(AddressTuple(
                 address.address,
-                postcode,
+                address.postcode,
                 self.target_council_id,
                 station_id,
                 address.uprn,
@@ -194,25 +246,123 @@ def postcodes_not_contained_by_district(district):
     return data
 
 
-def create_address_records_for_council(council, batch_size, logger):
+def postcodes_not_contained_by_council(council):
+    """
+    Set-based equivalent of calling postcodes_not_contained_by_district()
+    for every district in a council: instead of 1 query per district
+    and 1 query per postcode, this works out which postcodes are split
+    across district boundaries in a single query.
+
+    'contained' is the number of (district, postcode) pairs where
+    the district contains every point in the postcode.
+    """
+    data = {
+        'not_contained': set(),
+        'contained': 0,
+    }
+
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        WITH district_postcodes AS (
+            SELECT
+                pd.id AS district_id,
+                ab.postcode,
+                COUNT(*) AS count
+            FROM pollingstations_pollingdistrict pd
+            JOIN addressbase_address ab
+            ON ST_CONTAINS(pd.area, ab.location)
+            WHERE pd.council_id=%s
+            GROUP BY pd.id, ab.postcode
+        ), postcode_totals AS (
+            SELECT
+                ab.postcode,
+                COUNT(*) AS count
+            FROM addressbase_address ab
+            WHERE ab.postcode IN (SELECT postcode FROM district_postcodes)
+            GROUP BY ab.postcode
+        )
+        SELECT
+            dp.postcode,
+            dp.count = pt.count
+        FROM district_postcodes dp
+        JOIN postcode_totals pt
+        ON dp.postcode=pt.postcode
+        """, [council.pk]
+    )
+
+    for postcode, contained in cursor.fetchall():
+        if contained:
+            data['contained'] += 1
+        else:
+            data['not_contained'].add(postcode)
+    return data
+
+
+def make_addresses_for_postcodes(council_id, postcodes, verbosity):
+    """
+    Worker for make_addresses_in_parallel(). We take the verbosity
+    rather than a logger because everything we're passed gets pickled
+    and (before Python 3.7) a logging.Logger can't be.
+    """
+    fixer = EdgeCaseFixer(council_id, LogHelper(verbosity))
+    fixer.make_addresses_for_postcodes(postcodes)
+    return fixer.get_address_set()
+
+
+def make_addresses_in_parallel(council_id, postcodes, verbosity, workers):
+    # split the postcodes into one chunk per worker
+    chunks = [postcodes[i::workers] for i in range(workers)]
+
+    # Close any open DB connections before we fork so each
+    # worker opens its own. Otherwise, Django will throw
+    # django.db.utils.DatabaseError: lost synchronization with server
+    db.connections.close_all()
+
+    pool = Pool(workers)
+    try:
+        results = pool.starmap(
+            make_addresses_for_postcodes,
+            [(council_id, chunk, verbosity) for chunk in chunks if chunk])
+    finally:
+        pool.close()
+        pool.join()
+
+    address_set = AddressSet()
+    for result in results:
+        address_set.update(result)
+    return address_set
+
+
+def create_address_records_for_council(council, batch_size, logger, workers=1):
     postcode_report = {
         'no_attention_needed': 0,
         'addresses_created': 0,
         'postcodes_needing_address_lookup': set(),
     }
 
-    fixer = EdgeCaseFixer(council.pk, logger)
-    for district in PollingDistrict.objects.filter(council=council):
-        data = postcodes_not_contained_by_district(district)
-
-        postcode_report['no_attention_needed'] += \
-            data['total'] - len(data['not_contained'])
-        postcode_report['postcodes_needing_address_lookup'].update(data['not_contained'])
-
-        for postcode in data['not_contained']:
-            fixer.make_addresses_for_postcode(postcode)
+    data = postcodes_not_contained_by_council(council)
+    postcode_report['no_attention_needed'] = data['contained']
+    postcode_report['postcodes_needing_address_lookup'] = data['not_contained']
+
+    postcodes = sorted(data['not_contained'])
+    if workers > 1 and current_process().daemon:
+        # We're already running in a pool worker (e.g: under
+        # import --multiprocessing) and daemonic processes
+        # aren't allowed to start processes of their own
+        logger.log_message(
+            logging.WARNING,
+            "Can't use --workers inside a worker process: using 1 worker for %s",
+            variable=(council.pk))
+        workers = 1
+    if workers > 1:
+        address_set = make_addresses_in_parallel(
+            council.pk, postcodes, logger.verbosity, workers)
+    else:
+        fixer = EdgeCaseFixer(council.pk, logger)
+        fixer.make_addresses_for_postcodes(postcodes)
+        address_set = fixer.get_address_set()
 
-    address_set = fixer.get_address_set()
     address_set.save(batch_size)
     postcode_report['addresses_created'] = len(address_set)
 
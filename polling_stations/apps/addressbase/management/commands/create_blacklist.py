@@ -1,6 +1,7 @@
 from django.db import connection
 from django.core.management.base import BaseCommand
 from addressbase.models import Blacklist
+from data_finder.helpers import invalidate_routing_cache
 
 
 """
@@ -51,5 +52,6 @@ class Command(BaseCommand):
             UPDATE addressbase_blacklist
             SET postcode=REPLACE(postcode, ' ', '')
         """)
+        invalidate_routing_cache()
 
         print("...done")
@@ -36,16 +36,23 @@ To do this, we need to create ResidentialAddress objects for them.
 
 from operator import attrgetter
 
-from django.test import TestCase
+import mock
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 
 from addressbase.models import Address
 from addressbase.helpers import (postcodes_not_contained_by_district,
+                                 postcodes_not_contained_by_council,
                                  district_contains_all_points,
                                  EdgeCaseFixer,
-                                 create_address_records_for_council)
+                                 create_address_records_for_council,
+                                 make_addresses_for_postcodes,
+                                 make_addresses_in_parallel)
 from pollingstations.models import (PollingStation, PollingDistrict,
                                     ResidentialAddress)
 from councils.models import Council
+from data_collection.loghelper import LogHelper
+from data_collection.staginghelper import StagingSchema, get_live_table
 from data_finder.helpers import RoutingHelper
 
 
@@ -113,6 +120,25 @@ class PostcodeBoundaryFixerTestCase(TestCase):
         self.assertEqual(postcodes['not_contained'], ['KW15 88TF'])
         self.assertEqual(postcodes['total'], 1)
 
+    def test_postcodes_not_contained_by_council(self):
+        council = Council.objects.get(pk='X01000001')
+        data = postcodes_not_contained_by_council(council)
+
+        # we should get the same answer as checking each district in turn
+        expected = {
+            'not_contained': set(),
+            'contained': 0,
+        }
+        for district in PollingDistrict.objects.filter(council=council):
+            postcodes = postcodes_not_contained_by_district(district)
+            expected['not_contained'].update(postcodes['not_contained'])
+            expected['contained'] += \
+                postcodes['total'] - len(postcodes['not_contained'])
+
+        self.assertEqual(expected, data)
+        self.assertTrue('KW15 88TF' in data['not_contained'])
+        self.assertFalse('KW15 88LM' in data['not_contained'])
+
     def test_create_address_records_for_council(self):
         council = Council.objects.get(pk='X01000001')
         postcode_report = create_address_records_for_council(council, 1000, MockLogger())
@@ -123,6 +149,18 @@ class PostcodeBoundaryFixerTestCase(TestCase):
         self.assertFalse('KW15 88LM' in
                          postcode_report['postcodes_needing_address_lookup'])
 
+    def test_workers_in_daemonic_process(self):
+        # under import --multiprocessing we're running in a pool worker
+        # which can't start a pool of its own, so we should use 1 worker
+        council = Council.objects.get(pk="X01000001")
+        with mock.patch('addressbase.helpers.current_process') as process,\
+                mock.patch('addressbase.helpers.make_addresses_in_parallel') as parallel:
+            process.return_value.daemon = True
+            postcode_report = create_address_records_for_council(
+                council, 1000, MockLogger(), workers=2)
+        self.assertFalse(parallel.called)
+        self.assertGreater(postcode_report['addresses_created'], 0)
+
     def test_make_addresses_for_postcode(self):
         # Before the fix, we wrongly assume that we know the polling station
         postcode = 'KW15 88TF'
@@ -159,6 +197,23 @@ class PostcodeBoundaryFixerTestCase(TestCase):
 
         self.assertEqual(ResidentialAddress.objects.all().count(), 2)
 
+    def test_make_addresses_for_postcodes(self):
+        """
+        Making addresses for several postcodes at once should give
+        the same result as making them one postcode at a time
+        """
+        postcodes = ['KW15 88TF', 'KW15 88LX', 'KW15 88LZ']
+
+        fixer = EdgeCaseFixer("X01000001", MockLogger())
+        for postcode in postcodes:
+            fixer.make_addresses_for_postcode(postcode)
+        expected = fixer.get_address_set()
+
+        fixer = EdgeCaseFixer("X01000001", MockLogger())
+        fixer.make_addresses_for_postcodes(postcodes)
+        self.assertEqual(expected, fixer.get_address_set())
+        self.assertEqual(7, len(expected))
+
     def test_addresses_cross_borders_with_orphan_distirct(self):
         """
         In this case, we have a postcode which contains addresses in one
@@ -199,3 +254,72 @@ class PostcodeBoundaryFixerTestCase(TestCase):
         # 82 Kendell Street is wholly in one district
         self.assertEqual(records[2].address, '82 Kendell Street')
         self.assertEqual(records[2].polling_station_id, '2')
+
+    def test_staged_import_sees_neighbouring_districts(self):
+        """
+        When we stage an import, the staging tables only hold the council
+        we are importing, but an address which is also covered by
+        a neighbouring council's district should still be treated
+        as being in >1 districts
+        """
+        neighbour = Council.objects.create(pk='X01000002', name='Neighbour')
+        PollingDistrict.objects.create(
+            council=neighbour,
+            internal_council_id='1',
+            polling_station_id='1',
+            area=PollingDistrict.objects.get(pk=122).area)
+
+        postcode = 'KW15 88LZ'
+        fixer = EdgeCaseFixer("X01000001", MockLogger())
+        fixer.make_addresses_for_postcode(postcode)
+        expected = fixer.get_address_set()
+        records = sorted(list(expected), key=attrgetter('address'))
+        # 82 Kendell Street is in one of our districts and one of theirs
+        self.assertEqual(records[2].address, '82 Kendell Street')
+        self.assertEqual(records[2].polling_station_id, '')
+
+        with StagingSchema("X01000001") as staging:
+            cursor = connection.cursor()
+            for model in (PollingDistrict, PollingStation):
+                cursor.execute(
+                    "INSERT INTO {schema}.{table} SELECT * FROM {live_table} WHERE council_id=%s"\
+                    .format(
+                        schema=staging.schema,
+                        table=model._meta.db_table,
+                        live_table=get_live_table(model)),
+                    ["X01000001"])
+
+            fixer = EdgeCaseFixer("X01000001", MockLogger())
+            fixer.make_addresses_for_postcode(postcode)
+            self.assertEqual(expected, fixer.get_address_set())
+
+
+class ParallelPostcodeBoundaryFixerTestCase(TransactionTestCase):
+    """
+    Worker processes use their own DB connection, so they can't see data
+    inside the transaction a TestCase wraps each test in.
+    """
+    fixtures = ['test_kentwell_data.json']
+
+    def test_make_addresses_in_parallel(self):
+        postcodes = ['KW15 88LX', 'KW15 88LZ', 'KW15 88TF']
+        expected = make_addresses_for_postcodes(
+            "X01000001", postcodes, 0)
+        result = make_addresses_in_parallel(
+            "X01000001", postcodes, 0, 2)
+        self.assertEqual(expected, result)
+        self.assertEqual(7, len(result))
+
+    def test_workers_with_real_logger(self):
+        # a LogHelper holds a logging.Logger, which we can't pickle
+        # (before Python 3.7) so it mustn't be passed to the workers
+        council = Council.objects.get(pk="X01000001")
+        expected = create_address_records_for_council(
+            council, 1000, LogHelper(0))
+        ResidentialAddress.objects.all().delete()
+        result = create_address_records_for_council(
+            council, 1000, LogHelper(0), workers=2)
+        self.assertEqual(expected, result)
+        self.assertGreater(result['addresses_created'], 0)
+        self.assertEqual(
+            result['addresses_created'], ResidentialAddress.objects.all().count())
@@ -8,6 +8,8 @@ from data_finder.views import LogLookUpMixin
 from data_finder.helpers import (
     get_council,
     geocode,
+    get_answer_route,
+    get_postcode_answer,
     PostcodeError,
     RateLimitError,
     MultipleCouncilsException,
@@ -42,8 +44,8 @@ class PostcodeViewSet(ViewSet, LogLookUpMixin):
     def generate_polling_station(self, routing_helper, council, location):
         if routing_helper.route_type == "single_address":
             return PollingStation.objects.get_polling_station_by_id(
-                routing_helper.addresses[0].polling_station_id,
-                council_id=routing_helper.addresses[0].council_id
+                routing_helper.route.polling_station_id,
+                council_id=routing_helper.route.council_id
             )
         elif routing_helper.route_type == "postcode":
             return self.get_object(
@@ -65,7 +67,22 @@ class PostcodeViewSet(ViewSet, LogLookUpMixin):
 
     def retrieve(self, request, postcode=None, format=None, geocoder=geocode, log=True):
         postcode = Postcode(postcode)
-        ret = {}
+
+        # if we've already worked out the answer for this postcode
+        # (and we haven't been asked to use a different geocoder)
+        # we can skip geocoding and looking up the council and station
+        answer = None
+        if geocoder is geocode:
+            answer = get_postcode_answer(postcode)
+        if answer:
+            return self.build_response(
+                request, postcode, log,
+                loc=answer.geocode_result,
+                location=answer.location,
+                rh=RoutingHelper(postcode, route=get_answer_route(answer)),
+                council=answer.council,
+                polling_station=answer.polling_station,
+            )
 
         # attempt to attach point and gss_codes
         # in this situation, failure to geocode is fatal
@@ -81,8 +98,6 @@ class PostcodeViewSet(ViewSet, LogLookUpMixin):
             loc = {}
             location = None
 
-        ret['postcode_location'] = location
-
         rh = RoutingHelper(postcode)
 
         # council object
@@ -94,13 +109,27 @@ class PostcodeViewSet(ViewSet, LogLookUpMixin):
                 council = get_council(loc)
             except ObjectDoesNotExist:
                 return Response({'detail': 'Internal server error'}, 500)
+
+        return self.build_response(
+            request, postcode, log,
+            loc=loc,
+            location=location,
+            rh=rh,
+            council=council,
+            polling_station=self.generate_polling_station(rh, council, location),
+        )
+
+    def build_response(self, request, postcode, log,
+                       loc, location, rh, council, polling_station):
+        ret = {}
+        ret['postcode_location'] = location
         ret['council'] = council
 
         ret['addresses'] = self.generate_addresses(rh)
 
         # get polling station
         ret['polling_station_known'] = False
-        ret['polling_station'] = self.generate_polling_station(rh, council, location)
+        ret['polling_station'] = polling_station
         if ret['polling_station']:
             ret['polling_station_known'] = True
 
@@ -1,8 +1,19 @@
-from django.test import TestCase
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIRequestFactory
 from api.postcode import PostcodeViewSet
-from data_finder.helpers import MultipleCouncilsException
+from data_finder.helpers import (
+    delete_postcode_answers,
+    MultipleCouncilsException,
+    PostcodeAnswerBuilder
+)
+from data_finder.models import PostcodeAnswer
+from pollingstations.models import CustomFinder
+from uk_geo_utils.helpers import Postcode
+from uk_geo_utils.models import Onspd
 
 
 """
@@ -111,3 +122,92 @@ class PostcodeTest(TestCase):
         self.assertEqual(200, response.status_code)
         self.assertIsNone(response.data['council'])
         self.assertFalse(response.data['polling_station_known'])
+
+
+@override_settings(POSTCODE_ANSWERS={'ENABLED': True})
+class PostcodeAnswerTest(TestCase):
+    fixtures = ['polling_stations/apps/api/fixtures/test_address_postcode.json']
+
+    def setUp(self):
+        factory = APIRequestFactory()
+        self.request = factory.get('/foo', format='json')
+        self.request.user = AnonymousUser()
+        self.endpoint = PostcodeViewSet()
+
+        # ONSPD records which put each postcode
+        # in the same place as mock_geocode()
+        for postcode, council_id in [
+            ('AA11AA', 'X01000001'),
+            ('BB11BB', 'X01000002'),
+            ('CC11CC', 'X01000001'),
+            ('DD11DD', 'X01000003'),
+        ]:
+            self.add_onspd(postcode, council_id)
+        self.add_onspd('EE11EE', 'X01000001', loc=mock_geocode(Postcode('AA11AA')))
+
+    def add_onspd(self, postcode, council_id, loc=None):
+        if loc is None:
+            loc = mock_geocode(Postcode(postcode))
+        Onspd.objects.create(
+            pcds=Postcode(postcode).with_space,
+            oslaua=council_id,
+            location=Point(loc['wgs84_lon'], loc['wgs84_lat'], srid=4326))
+
+    def build(self):
+        for council_id in ['X01000001', 'X01000002']:
+            PostcodeAnswerBuilder(council_id).build()
+
+    def test_answers_match(self):
+        self.build()
+        for postcode in ['AA11AA', 'BB11BB', 'CC11CC']:
+            self.assertTrue(
+                PostcodeAnswer.objects.filter(postcode=postcode).exists())
+            with self.settings(POSTCODE_ANSWERS={'ENABLED': False}):
+                expected = self.endpoint.retrieve(self.request, postcode, 'json',
+                    geocoder=mock_geocode, log=False)
+
+            # the default geocoder can't geocode our fake postcodes
+            # so this only works if we answer from the PostcodeAnswer table
+            response = self.endpoint.retrieve(self.request, postcode, 'json',
+                log=False)
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(expected.data, response.data)
+
+    def test_no_answer(self):
+        self.build()
+        # we can't store answers for postcodes split between councils
+        self.assertFalse(PostcodeAnswer.objects.filter(postcode='EE11EE').exists())
+        # ..or postcodes that aren't in a council
+        self.assertFalse(PostcodeAnswer.objects.filter(postcode='DD11DD').exists())
+
+    def test_custom_finder(self):
+        self.build()
+        CustomFinder.objects.create(
+            area_code='X01000002', base_url='http://example.com/?postcode=',
+            can_pass_postcode=True)
+        # stored answers pick up custom finders added after they were built
+        response = self.endpoint.retrieve(self.request, 'BB11BB', 'json',
+            log=False)
+        self.assertEqual(
+            'http://example.com/?postcode=BB1%201BB', response.data['custom_finder'])
+
+    def test_queries_dont_grow_with_postcodes(self):
+        with CaptureQueriesContext(connection) as few:
+            PostcodeAnswerBuilder('X01000001').build()
+
+        for i in range(10):
+            self.add_onspd('CC1%iAA' % i, 'X01000001', loc={
+                'wgs84_lon': -2.1533203125, 'wgs84_lat': 52.858517622387716})
+        with CaptureQueriesContext(connection) as more:
+            self.assertEqual(12, PostcodeAnswerBuilder('X01000001').build())
+        self.assertEqual(len(few.captured_queries), len(more.captured_queries))
+
+    def test_delete_answers_for_neighbouring_council(self):
+        self.build()
+        # an answer in another council, inside one of X01000001's districts
+        PostcodeAnswer.objects.filter(postcode='CC11CC')\
+            .update(council_id='X01000002')
+        delete_postcode_answers('X01000001')
+        self.assertEqual(
+            ['BB11BB'],
+            list(PostcodeAnswer.objects.values_list('postcode', flat=True)))
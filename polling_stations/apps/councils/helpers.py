@@ -0,0 +1,173 @@
+from django.conf import settings
+from django.contrib.gis.geos import GEOSGeometry
+from django.core.cache import cache
+from django.db import connection
+
+from councils.models import Council
+
+
+class CouncilResolver:
+    """
+    Resolve points to council ids without a geography query per point
+
+    Council boundaries are simplified in the DB, then buffered
+    outwards and inwards by a margin larger than the simplification
+    tolerance and held in memory as prepared geometries:
+
+    - a point covered by the inner boundary is definitely in the council
+    - a point not covered by the outer boundary is definitely not
+    - anything in between is close to a boundary, so we fall back to
+      checking it against the exact geometry in the DB
+    """
+
+    VERSION_KEY = 'council_resolver_version'
+
+    def __init__(self, tolerance=0.001):
+        self.tolerance = tolerance
+        self.councils = None
+        self.version = None
+
+    def load(self):
+        if self.councils is not None:
+            return self.councils
+
+        margin = self.tolerance * 2
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT
+                council_id,
+                ST_AsBinary(ST_Buffer(simplified, %s)),
+                ST_AsBinary(ST_Buffer(simplified, %s))
+            FROM (
+                SELECT
+                    council_id,
+                    ST_SimplifyPreserveTopology(area::geometry, %s) AS simplified
+                FROM councils_council
+                WHERE area IS NOT NULL
+            ) AS c
+        """, [margin, -margin, self.tolerance])
+
+        self.councils = []
+        for council_id, outer, inner in cursor.fetchall():
+            outer = GEOSGeometry(bytes(outer), srid=4326)
+            inner = GEOSGeometry(bytes(inner), srid=4326)
+            self.councils.append(
+                (council_id, outer.extent, outer.prepared, inner.prepared))
+        return self.councils
+
+    def to_wgs84(self, point):
+        if point.srid and point.srid != 4326:
+            return point.transform(4326, clone=True)
+        return point
+
+    def get_candidates(self, point):
+        """
+        Return a tuple of
+        (ids of councils definitely covering point,
+        ids of councils which might cover point)
+        """
+        point = self.to_wgs84(point)
+        x, y = point.x, point.y
+
+        definite = []
+        maybe = []
+        for council_id, extent, outer, inner in self.load():
+            if x < extent[0] or y < extent[1] or x > extent[2] or y > extent[3]:
+                continue
+            if not outer.covers(point):
+                continue
+            if inner.covers(point):
+                definite.append(council_id)
+            else:
+                maybe.append(council_id)
+        return (definite, maybe)
+
+    def check_exact(self, point, council_ids):
+        return list(Council.objects\
+            .filter(pk__in=council_ids, area__covers=point)\
+            .values_list('pk', flat=True))
+
+    def get_council_ids_covering(self, point):
+        definite, maybe = self.get_candidates(point)
+        if maybe:
+            return definite + self.check_exact(point, maybe)
+        return definite
+
+    def get_council_id(self, point):
+        """
+        Return the id of the council covering point,
+        None if no council covers it or raise
+        Council.MultipleObjectsReturned if more than one does
+        (mirrors Council.objects.get(area__covers=point))
+        """
+        council_ids = self.get_council_ids_covering(point)
+        if len(council_ids) > 1:
+            raise Council.MultipleObjectsReturned(
+                "Point is covered by more than one council: %s" %\
+                (', '.join(council_ids)))
+        if council_ids:
+            return council_ids[0]
+        return None
+
+    def get_council_ids(self, points):
+        """
+        Return a list of council ids: one for each point in points
+        or None where a point is not covered by exactly one council.
+
+        Points close to a boundary are checked against the
+        exact geometries in a single query.
+        """
+        results = []
+        near_boundary = []
+        for i, point in enumerate(points):
+            definite, maybe = self.get_candidates(point)
+            results.append(definite)
+            if maybe:
+                near_boundary.append((i, point, maybe))
+
+        if near_boundary:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT p.idx, c.council_id
+                FROM unnest(%s, %s) AS p(idx, ewkt)
+                JOIN councils_council c
+                ON ST_Covers(c.area, ST_GeogFromText(p.ewkt))
+                WHERE c.council_id = ANY(%s)
+            """, [
+                [i for i, point, maybe in near_boundary],
+                [self.to_wgs84(point).ewkt for i, point, maybe in near_boundary],
+                list(set([c for i, point, maybe in near_boundary for c in maybe])),
+            ])
+            candidates = {i: maybe for i, point, maybe in near_boundary}
+            for i, council_id in cursor.fetchall():
+                if council_id in candidates[i]:
+                    results[i] = results[i] + [council_id]
+
+        return [r[0] if len(r) == 1 else None for r in results]
+
+
+def council_resolver_enabled():
+    return getattr(settings, 'COUNCIL_RESOLVER', {}).get('ENABLED', False)
+
+
+_council_resolver = None
+
+def get_council_resolver():
+    """
+    Return a CouncilResolver shared by this process, rebuilding it
+    if the councils have been re-imported since we last loaded it
+    """
+    global _council_resolver
+    version = cache.get(CouncilResolver.VERSION_KEY, 0)
+    if _council_resolver is None or _council_resolver.version != version:
+        _council_resolver = CouncilResolver()
+        _council_resolver.version = version
+    return _council_resolver
+
+
+def invalidate_council_resolver():
+    try:
+        cache.incr(CouncilResolver.VERSION_KEY)
+    except ValueError:
+        # key does not exist yet
+        cache.set(CouncilResolver.VERSION_KEY, 1, None)
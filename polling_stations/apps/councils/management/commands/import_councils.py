@@ -5,6 +5,7 @@ from django.apps import apps
 from django.contrib.gis.geos import GEOSGeometry, MultiPolygon, Polygon
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from councils.helpers import invalidate_council_resolver
 from councils.models import Council
 
 
@@ -126,4 +127,5 @@ class Command(BaseCommand):
             council.postcode = info['postcode']
             self._save_council(council)
 
+        invalidate_council_resolver()
         self.stdout.write('..done')
@@ -0,0 +1,80 @@
+from django.contrib.gis.geos import Point
+from django.test import TestCase, override_settings
+
+from councils.helpers import CouncilResolver, invalidate_council_resolver
+from councils.models import Council
+from data_finder.helpers import get_council
+
+
+class CouncilResolverTest(TestCase):
+
+    fixtures = ['test_councils.json']
+
+    def setUp(self):
+        # X01000001 covers the rectangle
+        # (-2.83447265625 52.52691653862567, 1.549072265625 53.64203274279828)
+        self.points = [
+            # well inside the boundary
+            Point(-1, 53),
+            # well outside the boundary
+            Point(-4, 51),
+            # inside, but closer to the boundary than the simplify tolerance
+            Point(-2.8342, 53),
+            # outside, but closer to the boundary than the simplify tolerance
+            Point(-2.8347, 53),
+            # same point as Point(-1, 53) in a different srid
+            Point(-1, 53, srid=4326).transform(27700, clone=True),
+        ]
+
+    def get_expected(self, point):
+        return list(Council.objects\
+            .filter(area__covers=point)\
+            .values_list('pk', flat=True))
+
+    def test_get_council_id(self):
+        resolver = CouncilResolver()
+        for point in self.points:
+            expected = self.get_expected(point)
+            if expected:
+                self.assertEqual(expected[0], resolver.get_council_id(point))
+            else:
+                self.assertIsNone(resolver.get_council_id(point))
+
+    def test_get_council_ids(self):
+        resolver = CouncilResolver()
+        expected = []
+        for point in self.points:
+            council_ids = self.get_expected(point)
+            expected.append(council_ids[0] if council_ids else None)
+        self.assertEqual(expected, resolver.get_council_ids(self.points))
+        self.assertEqual(
+            ['X01000001', None, 'X01000001', None, 'X01000001'],
+            resolver.get_council_ids(self.points))
+
+    def test_overlapping_councils(self):
+        # X01000002 covers exactly the same area as X01000001
+        Council.objects.create(
+            pk='X01000002', area=Council.objects.get(pk='X01000001').area)
+        resolver = CouncilResolver()
+        for point in self.points:
+            if self.get_expected(point):
+                with self.assertRaises(Council.MultipleObjectsReturned):
+                    resolver.get_council_id(point)
+        self.assertEqual(
+            [None, None, None, None, None],
+            resolver.get_council_ids(self.points))
+
+    def test_get_council_overlapping_councils(self):
+        Council.objects.create(
+            pk='X01000002', area=Council.objects.get(pk='X01000001').area)
+        geocode_result = {'wgs84_lon': -1, 'wgs84_lat': 53}
+
+        # get_council() should raise the same exceptions
+        # whether we use the resolver or not
+        for enabled in (False, True):
+            invalidate_council_resolver()
+            with override_settings(COUNCIL_RESOLVER={'ENABLED': enabled}):
+                with self.assertRaises(Council.MultipleObjectsReturned):
+                    get_council(geocode_result)
+                with self.assertRaises(Council.DoesNotExist):
+                    get_council({'wgs84_lon': -4, 'wgs84_lat': 51})
@@ -18,6 +18,7 @@ from django.contrib.gis.geos import Point, GEOSGeometry
 from django.db import connection
 from django.db import transaction
 
+from councils.helpers import CouncilResolver
 from councils.models import Council
 from data_collection.data_types import (
     AddressSet,
@@ -26,14 +27,16 @@ from data_collection.data_types import (
 )
 from data_collection.data_quality_report import (
     DataQualityReportBuilder,
-    StationReport,
-    DistrictReport,
-    ResidentialAddressReport
+    get_data_quality_counts
 )
 from data_collection.filehelpers import FileHelperFactory
+from data_collection.geo_utils import geojson_to_geos, shape_to_ewkb
+from data_collection.fingerprinthelper import fingerprint, get_source_files
 from data_collection.loghelper import LogHelper
 from data_collection.slugger import Slugger
+from data_collection.staginghelper import StagingSchema
 from data_collection.s3wrapper import S3Wrapper
+from pollingstations.helpers import invalidate_district_index
 from pollingstations.models import (
     PollingStation,
     PollingDistrict,
@@ -41,14 +44,23 @@ from pollingstations.models import (
 )
 from data_collection.models import DataQuality
 from uk_geo_utils.helpers import Postcode
-from data_finder.helpers import geocode_point_only, PostcodeError
+from data_finder.helpers import (
+    BulkPointGeocoder,
+    delete_postcode_answers,
+    geocode_point_only,
+    invalidate_routing_cache,
+    postcode_answers_enabled,
+    PostcodeAnswerBuilder,
+    PostcodeError
+)
 from addressbase.helpers import create_address_records_for_council
 
 
 class PostProcessingMixin:
 
-    def clean_postcodes_overlapping_districts(self, batch_size, logger):
-        data = create_address_records_for_council(self.council, batch_size, logger)
+    def clean_postcodes_overlapping_districts(self, batch_size, logger, workers=1):
+        data = create_address_records_for_council(
+            self.council, batch_size, logger, workers)
         self.postcodes_contained_by_district = data['no_attention_needed']
         self.postcodes_with_addresses_generated = data['addresses_created']
 
@@ -57,10 +69,19 @@ class CsvMixin:
     csv_encoding = 'utf-8'
     csv_delimiter = ','
 
+    """
+    If csv_stream is True, get_data() returns a lazy re-iterable
+    instead of a list, so large CSVs are read one row at a time.
+    This only works for files which still exist when we iterate them
+    (i.e: not the temp files used by BaseGenericApiImporter)
+    """
+    csv_stream = False
+
     def get_file_options(self):
         return {
             'encoding': self.csv_encoding,
-            'delimiter': self.csv_delimiter
+            'delimiter': self.csv_delimiter,
+            'stream': self.csv_stream,
         }
 
 
@@ -79,6 +100,21 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
     logger = None
     batch_size = None
 
+    """
+    If shp_stream or geojson_stream is True, get_data() returns
+    a lazy re-iterable for that type of file instead of a list
+    of every feature
+    """
+    shp_stream = False
+    geojson_stream = False
+
+    """
+    Names (relative to base_folder_path) of any other files the import
+    reads (e.g: in post_import()) so that --incremental notices when
+    they change
+    """
+    extra_input_files = []
+
     def add_arguments(self, parser):
         parser.add_argument(
             '-n',
@@ -104,6 +140,15 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
             default=3000
         )
 
+        parser.add_argument(
+            '-w',
+            '--workers',
+            help='<Optional> Number of worker processes to use when running clean_postcodes_overlapping_districts() (ignored under import --multiprocessing)',
+            type=check_positive,
+            required=False,
+            default=1
+        )
+
         parser.add_argument(
             '--nochecks',
             help='<Optional> Do not perform validation checks',
@@ -112,10 +157,42 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
             default=False
         )
 
+        parser.add_argument(
+            '-s',
+            '--staging',
+            help='<Optional> Import into staging tables and swap the data into the live tables when the import has finished',
+            action='store_true',
+            required=False,
+            default=False
+        )
+
+        parser.add_argument(
+            '-i',
+            '--incremental',
+            help='<Optional> Skip the import if the input files and importer code have not changed since the last import',
+            action='store_true',
+            required=False,
+            default=False
+        )
+
+        parser.add_argument(
+            '-f',
+            '--force',
+            help='<Optional> With --incremental, import even if nothing has changed',
+            action='store_true',
+            required=False,
+            default=False
+        )
+
     def teardown(self, council):
+        delete_postcode_answers(council.pk)
         PollingStation.objects.filter(council=council).delete()
         PollingDistrict.objects.filter(council=council).delete()
         ResidentialAddress.objects.filter(council=council).delete()
+        # whatever we imported last time has gone now
+        DataQuality.objects.filter(council=council).update(import_fingerprint='')
+        invalidate_district_index()
+        invalidate_routing_cache()
 
     def get_council(self, council_id):
         return Council.objects.get(pk=council_id)
@@ -125,6 +202,8 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
             options = self.get_file_options()
         else:
             options = {}
+        options['shp_stream'] = self.shp_stream
+        options['geojson_stream'] = self.geojson_stream
         helper = FileHelperFactory.create(filetype, filename, options)
         return helper.get_features()
 
@@ -145,10 +224,8 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
 
     def report(self):
         # build report
-        report = DataQualityReportBuilder(self.council_id)
-        station_report = StationReport(self.council_id)
-        district_report = DistrictReport(self.council_id)
-        address_report = ResidentialAddressReport(self.council_id)
+        counts = get_data_quality_counts(self.council_id)
+        report = DataQualityReportBuilder(self.council_id, counts)
         report.build_report()
 
         # save a static copy in the DB that we can serve up on the website
@@ -156,9 +233,8 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
             council_id=self.council_id,
         )
         record[0].report = report.generate_string_report()
-        record[0].num_stations = station_report.get_stations_imported()
-        record[0].num_districts = district_report.get_districts_imported()
-        record[0].num_addresses = address_report.get_addresses_imported()
+        for field, value in DataQuality.counts_to_fields(counts).items():
+            setattr(record[0], field, value)
         record[0].save()
 
         # output to console
@@ -187,6 +263,67 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
                 return glob.glob(path)[0]
         return self.base_folder_path
 
+    def get_input_files(self):
+        """
+        Return a list of the local files this import reads,
+        or None if we can't tell (e.g: the data comes from an API)
+        """
+        if not getattr(self, 'local_files', True) or not self.base_folder_path:
+            return None
+
+        names = [getattr(self, attr, None)
+            for attr in ('stations_name', 'districts_name', 'addresses_name')]
+        names.extend(self.extra_input_files)
+
+        files = set()
+        for name in names:
+            if not name:
+                continue
+            path = os.path.join(self.base_folder_path, name)
+            # shapefiles come with sidecar files (.dbf, .prj, etc)
+            # so include anything with the same name
+            files.update(glob.glob(os.path.splitext(path)[0] + '.*'))
+            if os.path.isfile(path):
+                files.add(path)
+
+        if not files:
+            return None
+        return sorted(files)
+
+    def get_fingerprint(self):
+        input_files = self.get_input_files()
+        if input_files is None:
+            return None
+        return fingerprint(
+            get_source_files(type(self)), input_files, self.base_folder_path)
+
+    def is_unchanged(self, current_fingerprint):
+        if not current_fingerprint:
+            return False
+        return DataQuality.objects.filter(
+            council_id=self.council_id,
+            import_fingerprint=current_fingerprint).exists()
+
+    def save_fingerprint(self, current_fingerprint):
+        DataQuality.objects.update_or_create(
+            council_id=self.council_id,
+            defaults={'import_fingerprint': current_fingerprint or ''})
+
+    def import_council_data(self, **kwargs):
+        self.import_data()
+
+        # Optional step for post import tasks
+        try:
+            self.post_import()
+        except NotImplementedError:
+            pass
+
+        # For areas with shape data, use AddressBase
+        # to clean up overlapping postcode
+        if not kwargs.get('noclean'):
+            self.clean_postcodes_overlapping_districts(
+                self.batch_size, self.logger, self.workers)
+
     def handle(self, *args, **kwargs):
         """
         Manually run system checks for the
@@ -202,30 +339,47 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
         verbosity = kwargs.get('verbosity')
         self.logger = LogHelper(verbosity)
         self.batch_size = kwargs.get('batch_size')
+        self.workers = kwargs.get('workers') or 1
         self.validation_checks = not(kwargs.get('nochecks'))
 
         if self.council_id is None:
             self.council_id = args[0]
 
         self.council = self.get_council(self.council_id)
-
-        # Delete old data for this council
-        self.teardown(self.council)
-
         self.base_folder_path = self.get_base_folder_path()
 
-        self.import_data()
+        current_fingerprint = self.get_fingerprint()
+        if kwargs.get('incremental') and not kwargs.get('force'):
+            if self.is_unchanged(current_fingerprint):
+                self.logger.log_message(
+                    logging.INFO,
+                    "Input files and importer for %s are unchanged since the last import - skipping",
+                    variable=(self.council_id))
+                return
+
+        if kwargs.get('staging'):
+            # Import into a staging schema and only replace
+            # the live data once the import has finished
+            with StagingSchema(self.council_id, self.logger) as staging:
+                self.import_council_data(**kwargs)
+                staging.swap()
+        else:
+            # Delete old data for this council
+            self.teardown(self.council)
+            self.import_council_data(**kwargs)
 
-        # Optional step for post import tasks
-        try:
-            self.post_import()
-        except NotImplementedError:
-            pass
+        # remember what we imported so
+        # we can skip it next time if nothing has changed
+        self.save_fingerprint(current_fingerprint)
 
-        # For areas with shape data, use AddressBase
-        # to clean up overlapping postcode
-        if not kwargs.get('noclean'):
-            self.clean_postcodes_overlapping_districts(self.batch_size, self.logger)
+        # make sure nothing is still serving the districts we deleted
+        # or routing decisions based on the addresses we deleted
+        invalidate_district_index()
+        invalidate_routing_cache()
+
+        if postcode_answers_enabled():
+            PostcodeAnswerBuilder(
+                self.council_id, self.logger, self.batch_size).build()
 
         # save and output data quality report
         if verbosity > 0:
@@ -235,6 +389,8 @@ class BaseImporter(BaseCommand, PostProcessingMixin, metaclass=abc.ABCMeta):
 class BaseStationsImporter(BaseImporter, metaclass=abc.ABCMeta):
 
     stations = None
+    station_geocoder = None
+    council_resolver = None
 
     @property
     @abc.abstractmethod
@@ -257,108 +413,148 @@ class BaseStationsImporter(BaseImporter, metaclass=abc.ABCMeta):
     def get_station_hash(self, station):
         raise NotImplementedError
 
+    def get_station_postcode_to_geocode(self, record):
+        """
+        Optionally return the postcode we will need to geocode
+        to get a location for this station record (or None if
+        we don't need to geocode it). If this is implemented,
+        we geocode all the station postcodes in bulk before
+        calling station_record_to_dict()
+        """
+        raise NotImplementedError
+
+    def build_station_geocoder(self, stations):
+        postcodes = set()
+        for station in stations:
+            if self.stations_filetype in ['shp', 'shp.zip']:
+                record = station.record
+            else:
+                record = station
+            try:
+                postcode = self.get_station_postcode_to_geocode(record)
+            except NotImplementedError:
+                return None
+            if postcode:
+                postcodes.add(postcode)
+        return BulkPointGeocoder(postcodes)
+
+    def geocode_point_only(self, postcode):
+        if self.station_geocoder:
+            return self.station_geocoder.geocode_point_only(postcode)
+        return geocode_point_only(postcode)
+
     def check_station_point(self, station_record):
         if station_record['location']:
-            try:
-                council = Council.objects.get(area__covers=station_record['location'])
-                if council.council_id != self.council_id:
-                    self.logger.log_message(
-                        logging.WARNING,
-                        "Polling station %s is in %s (%s) but target council is %s (%s) - manual check recommended",
-                        variable=(
-                            station_record['internal_council_id'],
-                            council.name,
-                            council.council_id,
-                            self.council.name,
-                            self.council.council_id))
-            except Council.DoesNotExist:
+            if self.council_resolver is None:
+                self.council_resolver = CouncilResolver()
+            council_id = self.council_resolver.get_council_id(
+                station_record['location'])
+
+            if council_id is None:
                 self.logger.log_message(
                     logging.WARNING,
                     "Polling station %s is not covered by any council area - manual check recommended",
                     variable=(station_record['internal_council_id']))
+            elif council_id != self.council_id:
+                council = Council.objects.defer("area").get(pk=council_id)
+                self.logger.log_message(
+                    logging.WARNING,
+                    "Polling station %s is in %s (%s) but target council is %s (%s) - manual check recommended",
+                    variable=(
+                        station_record['internal_council_id'],
+                        council.name,
+                        council.council_id,
+                        self.council.name,
+                        self.council.council_id))
 
     def import_polling_stations(self):
         stations = self.get_stations()
-        seen = set()
-        for station in stations:
-            """
-            We can optionally define a function get_station_hash()
+        try:
+            self.station_geocoder = self.build_station_geocoder(stations)
+            seen = set()
+            for station in stations:
+                """
+                We can optionally define a function get_station_hash()
 
-            This is useful if residential addresses and polling
-            station details are embedded in the same input file
+                This is useful if residential addresses and polling
+                station details are embedded in the same input file
 
-            We can use this to avoid calling station_record_to_dict()
-            (which is potentially quite a slow operation)
-            on a record where we have already processed the station data
-            to make the import process run more quickly.
-            """
-            try:
-                station_hash = self.get_station_hash(station)
-                if station_hash in seen:
-                    continue
+                We can use this to avoid calling station_record_to_dict()
+                (which is potentially quite a slow operation)
+                on a record where we have already processed the station data
+                to make the import process run more quickly.
+                """
+                try:
+                    station_hash = self.get_station_hash(station)
+                    if station_hash in seen:
+                        continue
+                    else:
+                        self.logger.log_message(
+                            logging.INFO, "Polling station added to set:\n%s",
+                            variable=station, pretty=True)
+                        seen.add(station_hash)
+                except NotImplementedError:
+                    pass
+
+                if self.stations_filetype in ['shp', 'shp.zip']:
+                    record = station.record
                 else:
-                    self.logger.log_message(
-                        logging.INFO, "Polling station added to set:\n%s",
-                        variable=station, pretty=True)
-                    seen.add(station_hash)
-            except NotImplementedError:
-                pass
-
-            if self.stations_filetype in ['shp', 'shp.zip']:
-                record = station.record
-            else:
-                record = station
-            station_info = self.station_record_to_dict(record)
-
-            """
-            station_record_to_dict() will usually return a dict
-            but it may also optionally return a list of dicts.
-
-            This is helpful if we encounter a polling station record
-            with a delimited list of polling districts served by this
-            polling station: it allows us to add the same station
-            address/point many times with different district ids.
-            """
-            if isinstance(station_info, list):
-                self.logger.log_message(
-                    logging.INFO, "station_record_to_dict() returned list with input:\n%s",
-                    variable=record, pretty=True)
-                station_records = station_info
-            else:
-                # If station_info is a dict, create a singleton list
-                station_records = [station_info]
-
-            for station_record in station_records:
+                    record = station
+                station_info = self.station_record_to_dict(record)
 
                 """
-                station_record_to_dict() may optionally return None
-                if we want to exclude a particular station record
-                from being imported
+                station_record_to_dict() will usually return a dict
+                but it may also optionally return a list of dicts.
+
+                This is helpful if we encounter a polling station record
+                with a delimited list of polling districts served by this
+                polling station: it allows us to add the same station
+                address/point many times with different district ids.
                 """
-                if station_record is None:
+                if isinstance(station_info, list):
                     self.logger.log_message(
-                        logging.INFO,
-                        "station_record_to_dict() returned None with input:\n%s",
+                        logging.INFO, "station_record_to_dict() returned list with input:\n%s",
                         variable=record, pretty=True)
-                    continue
-
-                if 'council' not in station_record:
-                    station_record['council'] = self.council
-
-                """
-                If the file type is shp, we can usually derive 'location'
-                automatically, but we can return it if necessary.
-                For other file types, we must return the key
-                'location' from station_record_to_dict()
-                """
-                if self.stations_filetype in ['shp', 'shp.zip'] and 'location' not in station_record:
-                    station_record['location'] = Point(
-                        *station.shape.points[0],
-                        srid=self.get_srid())
-
-                if self.validation_checks:
-                    self.check_station_point(station_record)
-                self.add_polling_station(station_record)
+                    station_records = station_info
+                else:
+                    # If station_info is a dict, create a singleton list
+                    station_records = [station_info]
+
+                for station_record in station_records:
+
+                    """
+                    station_record_to_dict() may optionally return None
+                    if we want to exclude a particular station record
+                    from being imported
+                    """
+                    if station_record is None:
+                        self.logger.log_message(
+                            logging.INFO,
+                            "station_record_to_dict() returned None with input:\n%s",
+                            variable=record, pretty=True)
+                        continue
+
+                    if 'council' not in station_record:
+                        station_record['council'] = self.council
+
+                    """
+                    If the file type is shp, we can usually derive 'location'
+                    automatically, but we can return it if necessary.
+                    For other file types, we must return the key
+                    'location' from station_record_to_dict()
+                    """
+                    if self.stations_filetype in ['shp', 'shp.zip'] and 'location' not in station_record:
+                        station_record['location'] = Point(
+                            *station.shape.points[0],
+                            srid=self.get_srid())
+
+                    if self.validation_checks:
+                        self.check_station_point(station_record)
+                    self.add_polling_station(station_record)
+        finally:
+            # streamed shapefiles hold temp files until closed
+            if hasattr(stations, 'close'):
+                stations.close()
 
     def add_polling_station(self, station_info):
         self.stations.add(station_info)
@@ -389,59 +585,59 @@ class BaseDistrictsImporter(BaseImporter, metaclass=abc.ABCMeta):
             return poly
         return poly
 
-    def strip_z_values(self, geojson):
-        districts = json.loads(geojson)
-        districts['type'] = 'Polygon'
-        for points in districts['coordinates'][0][0]:
-            if len(points) == 3:
-                points.pop()
-        districts['coordinates'] = districts['coordinates'][0]
-        return json.dumps(districts)
-
     @abc.abstractmethod
     def district_record_to_dict(self, record):
         pass
 
     def import_polling_districts(self):
         districts = self.get_districts()
-        for district in districts:
-            if self.districts_filetype in ['shp', 'shp.zip']:
-                district_info = self.district_record_to_dict(district.record)
-            else:
-                district_info = self.district_record_to_dict(district)
-
-            """
-            district_record_to_dict() may optionally return None
-            if we want to exclude a particular district record
-            from being imported
-            """
-            if district_info is None:
-                self.logger.log_message(
-                    logging.INFO,
-                    "district_record_to_dict() returned None with input:\n%s",
-                    variable=district, pretty=True)
-                continue
+        try:
+            for district in districts:
+                if self.districts_filetype in ['shp', 'shp.zip']:
+                    district_info = self.district_record_to_dict(district.record)
+                else:
+                    district_info = self.district_record_to_dict(district)
 
-            if 'council' not in district_info:
-                district_info['council'] = self.council
-
-            """
-            If the file type is shp or geojson, we can usually derive
-            'area' automatically, but we can return it if necessary.
-            For other file types, we must return the key
-            'area' from address_record_to_dict()
-            """
-            if self.districts_filetype in ['shp', 'shp.zip']:
-                geojson = json.dumps(district.shape.__geo_interface__)
-            if self.districts_filetype == 'geojson':
-                geojson = json.dumps(district['geometry'])
-            if 'area' not in district_info and\
-                    (self.districts_filetype in ['shp', 'shp.zip', 'geojson']):
-                poly = self.clean_poly(
-                    GEOSGeometry(geojson, srid=self.get_srid('districts')))
-                district_info['area'] = poly
-
-            self.add_polling_district(district_info)
+                """
+                district_record_to_dict() may optionally return None
+                if we want to exclude a particular district record
+                from being imported
+                """
+                if district_info is None:
+                    self.logger.log_message(
+                        logging.INFO,
+                        "district_record_to_dict() returned None with input:\n%s",
+                        variable=district, pretty=True)
+                    continue
+
+                if 'council' not in district_info:
+                    district_info['council'] = self.council
+
+                """
+                If the file type is shp or geojson, we can usually derive
+                'area' automatically, but we can return it if necessary.
+                For other file types, we must return the key
+                'area' from address_record_to_dict()
+                """
+                if 'area' not in district_info:
+                    if self.districts_filetype in ['shp', 'shp.zip']:
+                        # build EWKB straight from the shape if we can
+                        # and hand it to DistrictSet as-is
+                        district_info['area'] = shape_to_ewkb(
+                            district.shape, self.get_srid('districts'))
+                        if district_info['area'] is None:
+                            geojson = json.dumps(district.shape.__geo_interface__)
+                            district_info['area'] = self.clean_poly(
+                                GEOSGeometry(geojson, srid=self.get_srid('districts')))
+                    if self.districts_filetype == 'geojson':
+                        district_info['area'] = self.clean_poly(geojson_to_geos(
+                            district['geometry'], self.get_srid('districts')))
+
+                self.add_polling_district(district_info)
+        finally:
+            # streamed shapefiles hold temp files until closed
+            if hasattr(districts, 'close'):
+                districts.close()
 
     def add_polling_district(self, district_info):
         self.districts.add(district_info)
@@ -590,6 +786,7 @@ class BaseCsvStationsJsonDistrictsImporter(BaseStationsDistrictsImporter,
 
     stations_filetype = 'csv'
     districts_filetype = 'geojson'
+    geojson_stream = True
 
 
 class BaseCsvStationsKmlDistrictsImporter(BaseStationsDistrictsImporter,
@@ -606,9 +803,13 @@ class BaseCsvStationsKmlDistrictsImporter(BaseStationsDistrictsImporter,
     # this is mainly here for legacy compatibility
     # mostly we should override this
     def district_record_to_dict(self, record):
-        geojson = self.strip_z_values(record.geom.geojson)
+        # KmlReader has already dropped any z values.
+        # Like we always have, only keep the first polygon
+        geom = record.geom
+        if geom.geom_name == 'MULTIPOLYGON':
+            geom = geom[0]
         poly = self.clean_poly(
-            GEOSGeometry(geojson, srid=self.get_srid('districts')))
+            GEOSGeometry(geom.wkb, srid=self.get_srid('districts')))
         return {
             'internal_council_id': record['Name'].value,
             'name': record['Name'].value,
@@ -709,6 +910,7 @@ class BaseCsvStationsCsvAddressesImporter(BaseStationsAddressesImporter,
 
     stations_filetype = 'csv'
     addresses_filetype = 'csv'
+    csv_stream = True
 
 
 class BaseShpStationsCsvAddressesImporter(BaseStationsAddressesImporter,
@@ -720,6 +922,7 @@ class BaseShpStationsCsvAddressesImporter(BaseStationsAddressesImporter,
 
     stations_filetype = 'shp'
     addresses_filetype = 'csv'
+    csv_stream = True
 
 
 class BaseGenericApiImporter(BaseStationsDistrictsImporter):
@@ -783,6 +986,7 @@ class BaseApiShpZipStationsShpZipDistrictsImporter(BaseGenericApiImporter):
 
     stations_filetype = 'shp.zip'
     districts_filetype = 'shp.zip'
+    shp_stream = True
 
 
 class BaseApiCsvStationsShpZipDistrictsImporter(BaseGenericApiImporter,
@@ -794,3 +998,4 @@ class BaseApiCsvStationsShpZipDistrictsImporter(BaseGenericApiImporter,
 
     stations_filetype = 'csv'
     districts_filetype = 'shp.zip'
+    shp_stream = True
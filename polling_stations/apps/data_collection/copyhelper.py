@@ -0,0 +1,128 @@
+"""
+Helpers for writing records to the DB with COPY instead of INSERT
+"""
+
+import binascii
+from django.db import connection, transaction
+
+
+def copy_supported():
+    return connection.vendor == 'postgresql'
+
+
+def copy_escape(value):
+    # format a value for COPY's default text format
+    if value is None:
+        return '\\N'
+    return str(value)\
+        .replace('\\', '\\\\')\
+        .replace('\t', '\\t')\
+        .replace('\n', '\\n')\
+        .replace('\r', '\\r')
+
+
+class CopyStream:
+    """
+    File-like object which psycopg2's copy_expert() can read from.
+    Rows are formatted as they are read, so we never have to
+    hold the whole table in memory as one big string.
+    """
+
+    def __init__(self, rows):
+        self.lines = (
+            '\t'.join([copy_escape(value) for value in row]) + '\n'
+            for row in rows
+        )
+        self.buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.lines)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+class CopyHelper:
+    """
+    Write rows into a model's table using COPY
+
+    columns is a list of DB column names and each row is a sequence of
+    values in the same order. If geometry_column is set, values in that
+    column should be EWKB (or None): they are copied into a temp table
+    first and transformed to the SRID of the field on the way into the
+    real table, as the ORM would do if we used bulk_create()
+    """
+
+    def __init__(self, model, columns, geometry_column=None):
+        self.model = model
+        self.table = model._meta.db_table
+        self.columns = columns
+        self.geometry_column = geometry_column
+
+    def format_rows(self, rows):
+        if not self.geometry_column:
+            return rows
+
+        i = self.columns.index(self.geometry_column)
+        for row in rows:
+            row = list(row)
+            if row[i] is not None:
+                row[i] = binascii.hexlify(bytes(row[i])).decode('ascii')
+            yield row
+
+    def get_srid(self):
+        for field in self.model._meta.fields:
+            if field.column == self.geometry_column:
+                return field.srid
+
+    def copy(self, cursor, table, rows):
+        cursor.copy_expert(
+            "COPY %s (%s) FROM STDIN" % (table, ', '.join(self.columns)),
+            CopyStream(self.format_rows(rows))
+        )
+
+    def write(self, rows):
+        cursor = connection.cursor()
+
+        if not self.geometry_column:
+            self.copy(cursor, self.table, rows)
+            return
+
+        tmp_table = 'tmp_copy_%s' % (self.table)
+        srid = self.get_srid()
+        select = []
+        for column in self.columns:
+            if column == self.geometry_column:
+                select.append("""
+                    CASE WHEN ST_SRID({0}) = 0 THEN ST_SetSRID({0}, {1})
+                    ELSE ST_Transform({0}, {1}) END""".format(column, srid))
+            else:
+                select.append(column)
+
+        with transaction.atomic():
+            cursor.execute("""
+                CREATE TEMP TABLE {tmp} ON COMMIT DROP AS
+                SELECT {columns} FROM {table} WITH NO DATA;
+                ALTER TABLE {tmp} ALTER COLUMN {geom} TYPE geometry;
+            """.format(
+                tmp=tmp_table,
+                columns=', '.join(self.columns),
+                table=self.table,
+                geom=self.geometry_column,
+            ))
+            self.copy(cursor, tmp_table, rows)
+            cursor.execute("""
+                INSERT INTO {table} ({columns})
+                SELECT {select} FROM {tmp};
+                DROP TABLE {tmp};
+            """.format(
+                table=self.table,
+                columns=', '.join(self.columns),
+                select=', '.join(select),
+                tmp=tmp_table,
+            ))
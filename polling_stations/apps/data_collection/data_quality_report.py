@@ -1,6 +1,5 @@
+from collections import namedtuple
 from django.db import connection
-from django.db.models import Q
-from pollingstations.models import PollingStation, PollingDistrict, ResidentialAddress
 
 
 # define some methods we can use to print coloured console output
@@ -27,267 +26,241 @@ class OutputFormatter:
         print(OutputFormatter.OKGREEN + OutputFormatter.BOLD + text + OutputFormatter.ENDC)
 
 
-# data quality stats for polling stations
-class StationReport():
-
-    def __init__(self, council_id):
-        self.council_id = council_id
-        self.counts = {
-            '0': 0,
-            '1': 0,
-            '>1': 0
-        }
-        self.generate_counts()
-
-    def get_stations_imported(self):
-        return PollingStation.objects.filter(
-            council_id=self.council_id
-        ).count()
-
-    def get_stations_with_district_id(self):
-        return PollingStation.objects.filter(
-            council_id=self.council_id,
-            polling_district_id__isnull=False
-        ).exclude(polling_district_id='').count()
-
-    def get_stations_without_district_id(self):
-        return PollingStation.objects.filter(
-            Q(polling_district_id__isnull=True) | Q(polling_district_id=''),
-            council_id=self.council_id
-        ).count()
-
-    def get_stations_with_valid_district_id_ref(self):
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM pollingstations_pollingstation
-            WHERE polling_district_id IN
-                (SELECT internal_council_id FROM pollingstations_pollingdistrict
-                WHERE council_id=%s)
-            AND council_id=%s
-            AND polling_district_id != ''
-            AND polling_district_id IS NOT NULL;
-        """,
-        [self.council_id, self.council_id])
-        results = cursor.fetchall()
-        return results[0][0]
-
-    def get_stations_with_invalid_district_id_ref(self):
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM pollingstations_pollingstation
-            WHERE polling_district_id NOT IN
-                (SELECT internal_council_id FROM pollingstations_pollingdistrict
-                WHERE council_id=%s)
-            AND council_id=%s
-            AND polling_district_id != ''
-            AND polling_district_id IS NOT NULL;
-        """,
-        [self.council_id, self.council_id])
-        results = cursor.fetchall()
-        return results[0][0]
-
-    def get_stations_with_point(self):
-        return PollingStation.objects.filter(
-            council_id=self.council_id,
-            location__isnull=False
-        ).count()
-
-    def get_stations_without_point(self):
-        return PollingStation.objects.filter(
-            council_id=self.council_id,
-            location__isnull=True
-        ).count()
-
-    def get_stations_with_address(self):
-        return PollingStation.objects.filter(
-            council_id=self.council_id,
-            address__isnull=False
-        ).exclude(address='').count()
-
-    def get_stations_without_address(self):
-        return PollingStation.objects.filter(
-            Q(address__isnull=True) | Q(address=''),
-            council_id=self.council_id
-        ).count()
-
-    def generate_counts(self):
-        stations = PollingStation.objects.filter(
-            council_id=self.council_id
-        )
-        counts = []
-        for station in stations:
-            if station.location is not None:
-                counts.append(
-                    PollingDistrict.objects.filter(
-                        area__contains=station.location
-                    ).count()
-                )
-        for count in counts:
-            if count == 0:
-                self.counts['0'] = self.counts['0'] + 1
-            elif count == 1:
-                self.counts['1'] = self.counts['1'] + 1
-            else:
-                self.counts['>1'] = self.counts['>1'] + 1
-
-    def get_stations_in_zero_districts(self):
-        return self.counts['0']
-
-    def get_stations_in_one_districts(self):
-        return self.counts['1']
-
-    def get_stations_in_more_districts(self):
-        return self.counts['>1']
-
-
-# data quality stats for polling districts
-class DistrictReport():
-
-    def __init__(self, council_id):
-        self.council_id = council_id
-        self.counts = {
-            '0': 0,
-            '1': 0,
-            '>1': 0
-        }
-        self.generate_counts()
-
-    def get_districts_imported(self):
-        return PollingDistrict.objects.filter(
-            council_id=self.council_id
-        ).count()
-
-    def get_districts_with_station_id(self):
-        return PollingDistrict.objects.filter(
-            council_id=self.council_id,
-            polling_station_id__isnull=False
-        ).exclude(polling_station_id='').count()
-
-    def get_districts_without_station_id(self):
-        return PollingDistrict.objects.filter(
-            Q(polling_station_id__isnull=True) | Q(polling_station_id=''),
-            council_id=self.council_id
-        ).count()
-
-    def get_districts_with_valid_station_id_ref(self):
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM pollingstations_pollingdistrict
-            WHERE polling_station_id IN
-                (SELECT internal_council_id FROM pollingstations_pollingstation
-                WHERE council_id=%s)
-            AND council_id=%s
-            AND polling_station_id != ''
-            AND polling_station_id IS NOT NULL;
-        """,
-        [self.council_id, self.council_id])
-        results = cursor.fetchall()
-        return results[0][0]
-
-    def get_districts_with_invalid_station_id_ref(self):
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM pollingstations_pollingdistrict
-            WHERE polling_station_id NOT IN
-                (SELECT internal_council_id FROM pollingstations_pollingstation
-                WHERE council_id=%s)
-            AND council_id=%s
-            AND polling_station_id != ''
-            AND polling_station_id IS NOT NULL;
-        """,
-        [self.council_id, self.council_id])
-        results = cursor.fetchall()
-        return results[0][0]
-
-    def generate_counts(self):
-        districts = PollingDistrict.objects.filter(
-            council_id=self.council_id
-        )
-        counts = []
-        for district in districts:
-            if district.area is not None:
-                counts.append(
-                    PollingStation.objects.filter(
-                        location__within=district.area
-                    ).count()
-                )
-        for count in counts:
-            if count == 0:
-                self.counts['0'] = self.counts['0'] + 1
-            elif count == 1:
-                self.counts['1'] = self.counts['1'] + 1
-            else:
-                self.counts['>1'] = self.counts['>1'] + 1
-
-    def get_districts_containing_zero_stations(self):
-        return self.counts['0']
-
-    def get_districts_containing_one_stations(self):
-        return self.counts['1']
-
-    def get_districts_containing_more_stations(self):
-        return self.counts['>1']
-
-
-# data quality stats for residential addresses
-class ResidentialAddressReport():
-
-    def __init__(self, council_id):
-        self.council_id = council_id
-
-    def get_addresses_imported(self):
-        return ResidentialAddress.objects.filter(
-            council_id=self.council_id
-        ).count()
-
-    def get_addresses_with_station_id(self):
-        return ResidentialAddress.objects.filter(
-            council_id=self.council_id,
-            polling_station_id__isnull=False
-        ).exclude(polling_station_id='').count()
-
-    def get_addresses_without_station_id(self):
-        return ResidentialAddress.objects.filter(
-            Q(polling_station_id__isnull=True) | Q(polling_station_id=''),
-            council_id=self.council_id
-        ).count()
-
-    def get_addresses_with_valid_station_id_ref(self):
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM pollingstations_residentialaddress
-            WHERE polling_station_id IN
-                (SELECT internal_council_id FROM pollingstations_pollingstation
-                WHERE council_id=%s)
-            AND council_id=%s
-            AND polling_station_id != ''
-            AND polling_station_id IS NOT NULL;
-        """,
-        [self.council_id, self.council_id])
-        results = cursor.fetchall()
-        return results[0][0]
-
-    def get_addresses_with_invalid_station_id_ref(self):
-        cursor = connection.cursor()
-        cursor.execute("""
-            SELECT COUNT(*) FROM pollingstations_residentialaddress
-            WHERE polling_station_id NOT IN
-                (SELECT internal_council_id FROM pollingstations_pollingstation
-                WHERE council_id=%s)
-            AND council_id=%s
-            AND polling_station_id != ''
-            AND polling_station_id IS NOT NULL;
-        """,
-        [self.council_id, self.council_id])
-        results = cursor.fetchall()
-        return results[0][0]
+StationCounts = namedtuple('StationCounts', [
+    'imported',
+    'with_district_id',
+    'without_district_id',
+    'valid_district_id_refs',
+    'invalid_district_id_refs',
+    'with_point',
+    'without_point',
+    'with_address',
+    'without_address',
+    'in_zero_districts',
+    'in_one_district',
+    'in_more_districts',
+])
+
+DistrictCounts = namedtuple('DistrictCounts', [
+    'imported',
+    'with_station_id',
+    'without_station_id',
+    'valid_station_id_refs',
+    'invalid_station_id_refs',
+    'containing_zero_stations',
+    'containing_one_station',
+    'containing_more_stations',
+])
+
+AddressCounts = namedtuple('AddressCounts', [
+    'imported',
+    'with_station_id',
+    'without_station_id',
+    'valid_station_id_refs',
+    'invalid_station_id_refs',
+])
+
+DataQualityCounts = namedtuple('DataQualityCounts', [
+    'stations',
+    'districts',
+    'addresses',
+])
+
+
+# Counts for each table, per council. The LEFT JOINs can't multiply rows
+# because (council, internal_council_id) is unique for stations and
+# districts, so a row with an id ref but nothing joined has an invalid ref.
+# {council} is filled in with "= %s" for one council or
+# "IS NOT NULL" to report on every council at once.
+ATTRIBUTE_COUNTS_SQL = """
+    SELECT
+        c.council_id,
+        stations.imported,
+        stations.with_ref,
+        stations.valid_refs,
+        stations.invalid_refs,
+        stations.with_point,
+        stations.with_address,
+        districts.imported,
+        districts.with_ref,
+        districts.valid_refs,
+        districts.invalid_refs,
+        addresses.imported,
+        addresses.with_ref,
+        addresses.valid_refs,
+        addresses.invalid_refs
+    FROM councils_council c
+    LEFT JOIN
+    (SELECT
+        s.council_id,
+        COUNT(*) AS imported,
+        COUNT(CASE WHEN COALESCE(s.polling_district_id, '') != '' THEN 1 END) AS with_ref,
+        COUNT(CASE WHEN COALESCE(s.polling_district_id, '') != ''
+            AND d.id IS NOT NULL THEN 1 END) AS valid_refs,
+        COUNT(CASE WHEN COALESCE(s.polling_district_id, '') != ''
+            AND d.id IS NULL THEN 1 END) AS invalid_refs,
+        COUNT(s.location) AS with_point,
+        COUNT(CASE WHEN COALESCE(s.address, '') != '' THEN 1 END) AS with_address
+    FROM pollingstations_pollingstation s
+    LEFT JOIN pollingstations_pollingdistrict d
+        ON d.council_id = s.council_id
+        AND d.internal_council_id = s.polling_district_id
+    WHERE s.council_id {council}
+    GROUP BY s.council_id) AS stations
+        ON stations.council_id = c.council_id
+    LEFT JOIN
+    (SELECT
+        d.council_id,
+        COUNT(*) AS imported,
+        COUNT(CASE WHEN COALESCE(d.polling_station_id, '') != '' THEN 1 END) AS with_ref,
+        COUNT(CASE WHEN COALESCE(d.polling_station_id, '') != ''
+            AND s.id IS NOT NULL THEN 1 END) AS valid_refs,
+        COUNT(CASE WHEN COALESCE(d.polling_station_id, '') != ''
+            AND s.id IS NULL THEN 1 END) AS invalid_refs
+    FROM pollingstations_pollingdistrict d
+    LEFT JOIN pollingstations_pollingstation s
+        ON s.council_id = d.council_id
+        AND s.internal_council_id = d.polling_station_id
+    WHERE d.council_id {council}
+    GROUP BY d.council_id) AS districts
+        ON districts.council_id = c.council_id
+    LEFT JOIN
+    (SELECT
+        a.council_id,
+        COUNT(*) AS imported,
+        COUNT(CASE WHEN COALESCE(a.polling_station_id, '') != '' THEN 1 END) AS with_ref,
+        COUNT(CASE WHEN COALESCE(a.polling_station_id, '') != ''
+            AND s.id IS NOT NULL THEN 1 END) AS valid_refs,
+        COUNT(CASE WHEN COALESCE(a.polling_station_id, '') != ''
+            AND s.id IS NULL THEN 1 END) AS invalid_refs
+    FROM pollingstations_residentialaddress a
+    LEFT JOIN pollingstations_pollingstation s
+        ON s.council_id = a.council_id
+        AND s.internal_council_id = a.polling_station_id
+    WHERE a.council_id {council}
+    GROUP BY a.council_id) AS addresses
+        ON addresses.council_id = c.council_id
+    WHERE c.council_id {council};
+"""
+
+# How many districts (from any council) contain each station
+# and how many stations each district contains, bucketed
+# into 0, 1 and >1 (2) for each council
+POLYGON_LOOKUPS_SQL = """
+    SELECT 'stations', council_id, LEAST(matches, 2), COUNT(*) FROM
+    (SELECT s.id, s.council_id, COUNT(d.id) AS matches
+    FROM pollingstations_pollingstation s
+    LEFT JOIN pollingstations_pollingdistrict d
+        ON ST_Contains(d.area, s.location)
+    WHERE s.council_id {council}
+    AND s.location IS NOT NULL
+    GROUP BY s.id, s.council_id) AS station_matches
+    GROUP BY council_id, LEAST(matches, 2)
+    UNION ALL
+    SELECT 'districts', council_id, LEAST(matches, 2), COUNT(*) FROM
+    (SELECT d.id, d.council_id, COUNT(s.id) AS matches
+    FROM pollingstations_pollingdistrict d
+    LEFT JOIN pollingstations_pollingstation s
+        ON ST_Within(s.location, d.area)
+    WHERE d.council_id {council}
+    AND d.area IS NOT NULL
+    GROUP BY d.id, d.council_id) AS district_matches
+    GROUP BY council_id, LEAST(matches, 2);
+"""
+
+
+def make_counts(row, lookups):
+    # councils with no stations, districts or
+    # addresses come back from the LEFT JOINs as NULLs
+    row = [value or 0 for value in row]
+    stations_lookups = lookups.get('stations', {})
+    districts_lookups = lookups.get('districts', {})
+
+    stations_imported, with_district_id = row[1], row[2]
+    with_point, with_address = row[5], row[6]
+    stations = StationCounts(
+        imported=stations_imported,
+        with_district_id=with_district_id,
+        without_district_id=stations_imported - with_district_id,
+        valid_district_id_refs=row[3],
+        invalid_district_id_refs=row[4],
+        with_point=with_point,
+        without_point=stations_imported - with_point,
+        with_address=with_address,
+        without_address=stations_imported - with_address,
+        in_zero_districts=stations_lookups.get(0, 0),
+        in_one_district=stations_lookups.get(1, 0),
+        in_more_districts=stations_lookups.get(2, 0),
+    )
+
+    districts_imported, with_station_id = row[7], row[8]
+    districts = DistrictCounts(
+        imported=districts_imported,
+        with_station_id=with_station_id,
+        without_station_id=districts_imported - with_station_id,
+        valid_station_id_refs=row[9],
+        invalid_station_id_refs=row[10],
+        containing_zero_stations=districts_lookups.get(0, 0),
+        containing_one_station=districts_lookups.get(1, 0),
+        containing_more_stations=districts_lookups.get(2, 0),
+    )
+
+    addresses_imported, with_station_id = row[11], row[12]
+    addresses = AddressCounts(
+        imported=addresses_imported,
+        with_station_id=with_station_id,
+        without_station_id=addresses_imported - with_station_id,
+        valid_station_id_refs=row[13],
+        invalid_station_id_refs=row[14],
+    )
+
+    return DataQualityCounts(stations, districts, addresses)
+
+
+def query_data_quality_counts(council_id=None):
+    """
+    Gather the data quality stats for one council (or every council
+    if council_id is None) in two queries. Return a dict of
+    {council_id: DataQualityCounts}
+    """
+    if council_id is None:
+        council, params = 'IS NOT NULL', []
+    else:
+        council, params = '= %s', [council_id]
+
+    cursor = connection.cursor()
+    cursor.execute(
+        POLYGON_LOOKUPS_SQL.format(council=council), params * 2)
+    lookups = {}
+    for table, row_council_id, matches, count in cursor.fetchall():
+        lookups.setdefault(row_council_id, {}).setdefault(table, {})[matches] = count
+
+    cursor.execute(
+        ATTRIBUTE_COUNTS_SQL.format(council=council), params * 4)
+    return {
+        row[0]: make_counts(row, lookups.get(row[0], {}))
+        for row in cursor.fetchall()
+    }
+
+
+def get_data_quality_counts(council_id):
+    """
+    Gather all of the data quality stats for a council
+    in two queries and return them as DataQualityCounts
+    """
+    counts = query_data_quality_counts(council_id)
+    if council_id in counts:
+        return counts[council_id]
+    # we don't know about this council: everything is 0
+    return make_counts([council_id] + [0] * 14, {})
 
 
 # generate all the stats
 class DataQualityReportBuilder():
 
-    def __init__(self, council_id):
+    def __init__(self, council_id, counts=None):
         self.council_id = council_id
+        self.counts = counts
         self.report = []
 
     def build_header(self):
@@ -302,9 +275,9 @@ class DataQualityReportBuilder():
         })
 
     def build_station_report(self):
-        stations_report = StationReport(self.council_id)
+        stations = self.counts.stations
 
-        stations_imported = stations_report.get_stations_imported()
+        stations_imported = stations.imported
         if stations_imported > 0:
             self.report.append({ 'style': 'bold',
                 'text': "STATIONS IMPORTED                : %i" % (stations_imported)
@@ -313,16 +286,16 @@ class DataQualityReportBuilder():
                 'text': "----------------------------------"
             })
 
-            district_ids = stations_report.get_stations_with_district_id()
+            district_ids = stations.with_district_id
             if district_ids > 0:
                 self.report.append({ 'style': 'ok_bold',
                     'text': " - with district id              : %i" % (district_ids)
                 })
                 self.report.append({ 'style': 'ok',
-                    'text': "   - valid district id refs      : %i" % (stations_report.get_stations_with_valid_district_id_ref())
+                    'text': "   - valid district id refs      : %i" % (stations.valid_district_id_refs)
                 })
                 self.report.append({ 'style': 'warning',
-                    'text': "   - invalid district id refs    : %i" % (stations_report.get_stations_with_invalid_district_id_ref())
+                    'text': "   - invalid district id refs    : %i" % (stations.invalid_district_id_refs)
                 })
             else:
                 self.report.append({ 'style': 'ok',
@@ -330,19 +303,19 @@ class DataQualityReportBuilder():
                 })
 
             self.report.append({ 'style': 'warning',
-                'text': " - without district id           : %i" % (stations_report.get_stations_without_district_id())
+                'text': " - without district id           : %i" % (stations.without_district_id)
             })
             self.report.append({ 'style': 'ok',
-                'text': " - with point                    : %i" % (stations_report.get_stations_with_point())
+                'text': " - with point                    : %i" % (stations.with_point)
             })
             self.report.append({ 'style': 'warning',
-                'text': " - without point                 : %i" % (stations_report.get_stations_without_point())
+                'text': " - without point                 : %i" % (stations.without_point)
             })
             self.report.append({ 'style': 'ok',
-                'text': " - with address                  : %i" % (stations_report.get_stations_with_address())
+                'text': " - with address                  : %i" % (stations.with_address)
             })
             self.report.append({ 'style': 'warning',
-                'text': " - without address               : %i" % (stations_report.get_stations_without_address())
+                'text': " - without address               : %i" % (stations.without_address)
             })
             self.report.append({ 'style': None,
                 'text': "----------------------------------"
@@ -351,22 +324,22 @@ class DataQualityReportBuilder():
                 'text': "POLYGON LOOKUPS"
             })
             self.report.append({ 'style': 'warning',
-                'text': "Stations in 0 districts          : %i" % (stations_report.get_stations_in_zero_districts())
+                'text': "Stations in 0 districts          : %i" % (stations.in_zero_districts)
             })
             self.report.append({ 'style': 'ok',
-                'text': "Stations in 1 districts          : %i" % (stations_report.get_stations_in_one_districts())
+                'text': "Stations in 1 districts          : %i" % (stations.in_one_district)
             })
             self.report.append({ 'style': 'warning',
-                'text': "Stations in >1 districts         : %i" % (stations_report.get_stations_in_more_districts())
+                'text': "Stations in >1 districts         : %i" % (stations.in_more_districts)
             })
             self.report.append({ 'style': None,
                 'text': "\n"
             })
 
     def build_district_report(self):
-        districts_report = DistrictReport(self.council_id)
+        districts = self.counts.districts
 
-        districts_imported = districts_report.get_districts_imported()
+        districts_imported = districts.imported
         if districts_imported > 0:
             self.report.append({ 'style': 'bold',
                 'text': "DISTRICTS IMPORTED               : %i" % (districts_imported)
@@ -375,16 +348,16 @@ class DataQualityReportBuilder():
                 'text': "----------------------------------"
             })
 
-            station_ids = districts_report.get_districts_with_station_id()
+            station_ids = districts.with_station_id
             if station_ids > 0:
                 self.report.append({ 'style': 'ok_bold',
                     'text': " - with station id               : %i" % (station_ids)
                 })
                 self.report.append({ 'style': 'ok',
-                    'text': "   - valid station id refs       : %i" % (districts_report.get_districts_with_valid_station_id_ref())
+                    'text': "   - valid station id refs       : %i" % (districts.valid_station_id_refs)
                 })
                 self.report.append({ 'style': 'warning',
-                    'text': "   - invalid station id refs     : %i" % (districts_report.get_districts_with_invalid_station_id_ref())
+                    'text': "   - invalid station id refs     : %i" % (districts.invalid_station_id_refs)
                 })
             else:
                 self.report.append({ 'style': 'ok',
@@ -392,7 +365,7 @@ class DataQualityReportBuilder():
                 })
 
             self.report.append({ 'style': 'warning',
-                'text': " - without station id            : %i" % (districts_report.get_districts_without_station_id())
+                'text': " - without station id            : %i" % (districts.without_station_id)
             })
             self.report.append({ 'style': None,
                 'text': "----------------------------------"
@@ -401,22 +374,22 @@ class DataQualityReportBuilder():
                 'text': "POLYGON LOOKUPS"
             })
             self.report.append({ 'style': 'warning',
-                'text': "Districts containing 0 stations  : %i" % (districts_report.get_districts_containing_zero_stations())
+                'text': "Districts containing 0 stations  : %i" % (districts.containing_zero_stations)
             })
             self.report.append({ 'style': 'ok',
-                'text': "Districts containing 1 stations  : %i" % (districts_report.get_districts_containing_one_stations())
+                'text': "Districts containing 1 stations  : %i" % (districts.containing_one_station)
             })
             self.report.append({ 'style': 'warning',
-                'text': "Districts containing >1 stations : %i" % (districts_report.get_districts_containing_more_stations())
+                'text': "Districts containing >1 stations : %i" % (districts.containing_more_stations)
             })
             self.report.append({ 'style': None,
                 'text': "\n"
             })
 
     def build_residential_address_report(self):
-        address_report = ResidentialAddressReport(self.council_id)
+        addresses = self.counts.addresses
 
-        addresses_imported = address_report.get_addresses_imported()
+        addresses_imported = addresses.imported
         if addresses_imported > 0:
             self.report.append({ 'style': 'bold',
                 'text': "ADDRESSES IMPORTED               : %i" % (addresses_imported)
@@ -425,16 +398,16 @@ class DataQualityReportBuilder():
                 'text': "----------------------------------"
             })
 
-            station_ids = address_report.get_addresses_with_station_id()
+            station_ids = addresses.with_station_id
             if station_ids > 0:
                 self.report.append({ 'style': 'ok_bold',
                     'text': " - with station id               : %i" % (station_ids)
                 })
                 self.report.append({ 'style': 'ok',
-                    'text': "   - valid station id refs       : %i" % (address_report.get_addresses_with_valid_station_id_ref())
+                    'text': "   - valid station id refs       : %i" % (addresses.valid_station_id_refs)
                 })
                 self.report.append({ 'style': 'warning',
-                    'text': "   - invalid station id refs     : %i" % (address_report.get_addresses_with_invalid_station_id_ref())
+                    'text': "   - invalid station id refs     : %i" % (addresses.invalid_station_id_refs)
                 })
             else:
                 self.report.append({ 'style': 'ok',
@@ -442,13 +415,15 @@ class DataQualityReportBuilder():
                 })
 
             self.report.append({ 'style': 'warning',
-                'text': " - without station id            : %i" % (address_report.get_addresses_without_station_id())
+                'text': " - without station id            : %i" % (addresses.without_station_id)
             })
             self.report.append({ 'style': None,
                 'text': "\n"
             })
 
     def build_report(self):
+        if self.counts is None:
+            self.counts = get_data_quality_counts(self.council_id)
         self.build_header()
         self.build_district_report()
         self.build_station_report()
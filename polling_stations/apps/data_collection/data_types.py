@@ -4,7 +4,9 @@ Data type classes used by base importers
 
 import abc
 import logging
+from array import array
 from collections import namedtuple
+from data_collection.copyhelper import CopyHelper, copy_supported
 from data_collection.slugger import Slugger
 from pollingstations.models import (
     PollingStation,
@@ -39,8 +41,16 @@ Address = namedtuple('Address', [
     'slug'])
 
 
+def get_council_id(council):
+    # elements may hold a Council object or just its id
+    return getattr(council, 'pk', council)
+
+
 class CustomSet(metaclass=abc.ABCMeta):
 
+    # set this to False to always save using bulk_create()
+    use_copy = True
+
     def __init__(self):
         self.elements = set()
 
@@ -51,6 +61,18 @@ class CustomSet(metaclass=abc.ABCMeta):
     def build_namedtuple(self, element):
         pass
 
+    def get_copy_helper(self):
+        raise NotImplementedError
+
+    def get_copy_rows(self):
+        raise NotImplementedError
+
+    def can_copy(self):
+        return self.use_copy and copy_supported()
+
+    def copy(self):
+        self.get_copy_helper().write(self.get_copy_rows())
+
 
 class StationSet(CustomSet):
 
@@ -71,7 +93,28 @@ class StationSet(CustomSet):
             element.get('polling_district_id', ''),
         )
 
+    def get_copy_helper(self):
+        return CopyHelper(
+            PollingStation,
+            ['council_id', 'internal_council_id', 'postcode',
+             'address', 'location', 'polling_district_id'],
+            geometry_column='location')
+
+    def get_copy_rows(self):
+        for station in self.elements:
+            yield (
+                get_council_id(station.council),
+                station.internal_council_id,
+                station.postcode,
+                station.address,
+                station.location,
+                station.polling_district_id,
+            )
+
     def save(self):
+        if self.can_copy():
+            return self.copy()
+
         stations_db = []
         for station in self.elements:
             record = PollingStation(
@@ -90,8 +133,10 @@ class DistrictSet(CustomSet):
 
     def build_namedtuple(self, element):
 
-        # MultiPolygon is mutable, so we must serialize it to store in a tuple
-        area = element['area'].ewkb  # use ewkb so it encodes srid
+        area = element['area']
+        if not isinstance(area, (bytes, memoryview)):
+            # MultiPolygon is mutable, so we must serialize it to store in a tuple
+            area = area.ewkb  # use ewkb so it encodes srid
 
         return District(
             element.get('name', ''),
@@ -102,7 +147,28 @@ class DistrictSet(CustomSet):
             element.get('polling_station_id', ''),
         )
 
+    def get_copy_helper(self):
+        return CopyHelper(
+            PollingDistrict,
+            ['name', 'council_id', 'internal_council_id',
+             'extra_id', 'area', 'polling_station_id'],
+            geometry_column='area')
+
+    def get_copy_rows(self):
+        for district in self.elements:
+            yield (
+                district.name,
+                get_council_id(district.council),
+                district.internal_council_id,
+                district.extra_id,
+                district.area,
+                district.polling_station_id,
+            )
+
     def save(self):
+        if self.can_copy():
+            return self.copy()
+
         districts_db = []
         for district in self.elements:
             record = PollingDistrict(
@@ -142,66 +208,93 @@ class AddressSet(CustomSet):
                 logging.DEBUG, "Duplicate address found:\n%s",
                 variable=address, pretty=True)
 
-    def get_address_lookup(self, addresses):
-        # for each address, build a lookup of address -> list of station ids
-        address_lookup = {}
-        for i, record in enumerate(addresses):
-            address_slug = Slugger.slugify(
-                "-".join([record['address'], record['postcode']]))
-            addresses[i]['address_slug'] = address_slug
-            if address_slug in address_lookup:
-                address_lookup[address_slug].append(
-                    record['polling_station_id'])
-            else:
-                address_lookup[address_slug] = [record['polling_station_id']]
-
-        return address_lookup
-
-    def get_ambiguous_postcodes(self, address_list, address_lookup):
-        # build a set of postcodes containing
-        # an address that maps to >1 polling stations
-        ambiguous_postcodes = set()
-        for record in address_list:
-            if len(address_lookup[record['address_slug']]) != 1:
-                ambiguous_postcodes.add(record['postcode'])
-
-        return ambiguous_postcodes
+    def get_address_keys(self, addresses):
+        """
+        Slugify each address + postcode once and give every distinct
+        slug a small integer id. Return the ids as a compact array
+        (one per address), the number of addresses using each id
+        and the slug for each id.
+        """
+        slug_ids = {}
+        slugs = []
+        keys = array('L')
+        counts = array('L')
+        address_slugs = Slugger.slugify_many(
+            ["-".join([record.address, record.postcode]) for record in addresses])
+        for address_slug in address_slugs:
+            key = slug_ids.get(address_slug)
+            if key is None:
+                key = len(slugs)
+                slug_ids[address_slug] = key
+                slugs.append(address_slug)
+                counts.append(0)
+            keys.append(key)
+            counts[key] += 1
+        return (keys, counts, slugs)
 
     def remove_ambiguous_addresses(self):
+        """
+        Discard every address with the same postcode as an ambiguous
+        address (one which appears more than once after slugifying,
+        i.e: it may map to more than one polling station)
+        """
+        addresses = list(self.elements)
+        keys, counts, slugs = self.get_address_keys(addresses)
+
+        # build a set of postcodes containing an ambiguous address
+        # and, for logging, the station ids each ambiguous address maps to
+        ambiguous_postcodes = set()
+        ambiguous_stations = {}
+        for record, key in zip(addresses, keys):
+            if counts[key] != 1:
+                ambiguous_postcodes.add(record.postcode)
+                ambiguous_stations.setdefault(key, []).append(
+                    record.polling_station_id)
 
-        # convert our set of tuples into a list of dicts
-        tmp_addresses = list(self.elements)
-        tmp_addresses = [x._asdict() for x in tmp_addresses]
+        if not ambiguous_postcodes:
+            return set(addresses)
 
-        address_lookup = self.get_address_lookup(tmp_addresses)
-        ambiguous_postcodes = self.get_ambiguous_postcodes(tmp_addresses, address_lookup)
         out_addresses = set()
+        for record, key in zip(addresses, keys):
+            if record.postcode not in ambiguous_postcodes:
+                out_addresses.add(record)
+                continue
+
+            if counts[key] != 1:
+                # we discard it because the address itself is ambiguous
+                reason = ambiguous_stations[key]
+            else:
+                # we've discarded it because it has the same postcode
+                # as some other addresses we have discarded
+                reason = record.postcode
 
-        # discard all addresses with an ambiguous postcode
-        for i, record in enumerate(tmp_addresses):
-            if record['postcode'] in ambiguous_postcodes:
-                tmp_addresses[i] = None
-                if len(address_lookup[record['address_slug']]) != 1:
-                    # we discard it because the address itself is ambiguous
-                    reason = address_lookup[record['address_slug']]
-                else:
-                    # we've discarded it because it has the same postcode
-                    # as some other addresses we have discarded
-                    reason = record['postcode']
-
-                self.logger.log_message(
-                    logging.INFO, "Ambiguous addresses discarded: %s: %s",
-                    variable=(record['address_slug'], reason))
-
-        for record in tmp_addresses:
-            if record:
-                out_addresses.add(self.build_namedtuple(record))
+            self.logger.log_message(
+                logging.INFO, "Ambiguous addresses discarded: %s: %s",
+                variable=(slugs[key], reason))
 
         return out_addresses
 
+    def get_copy_helper(self):
+        return CopyHelper(
+            ResidentialAddress,
+            ['address', 'postcode', 'polling_station_id', 'council_id', 'slug'])
+
+    def get_copy_rows(self):
+        for address in self.elements:
+            yield (
+                address.address,
+                address.postcode,
+                address.polling_station_id,
+                get_council_id(address.council),
+                address.slug,
+            )
+
     def save(self, batch_size):
 
         self.elements = self.remove_ambiguous_addresses()
+        if self.can_copy():
+            return self.copy()
+
         addresses_db = []
 
         for address in self.elements:
@@ -6,7 +6,7 @@ import abc
 from django.contrib.gis.geos import Point
 from django.utils.text import slugify
 from data_collection.base_importers import BaseCsvStationsCsvAddressesImporter
-from data_finder.helpers import geocode_point_only, PostcodeError
+from data_finder.helpers import PostcodeError
 
 
 """
@@ -64,16 +64,23 @@ class BaseXpressCsvImporter(BaseCsvStationsCsvAddressesImporter,
     def get_station_postcode(self, record):
         return getattr(record, self.station_postcode_field).strip()
 
-    def get_station_point(self, record):
-        location = None
-
-        if (hasattr(record, self.easting_field) and\
+    def station_has_point(self, record):
+        return (hasattr(record, self.easting_field) and\
             hasattr(record, self.northing_field) and\
             getattr(record, self.easting_field) != '0' and\
             getattr(record, self.easting_field) != '' and\
             getattr(record, self.northing_field) != '0' and\
-            getattr(record, self.northing_field) != ''):
+            getattr(record, self.northing_field) != '')
+
+    def get_station_postcode_to_geocode(self, record):
+        if self.station_has_point(record):
+            return None
+        return self.get_station_postcode(record)
 
+    def get_station_point(self, record):
+        location = None
+
+        if self.station_has_point(record):
             # if we've got points, use them
             location = Point(
                 float(getattr(record, self.easting_field)),
@@ -86,7 +93,7 @@ class BaseXpressCsvImporter(BaseCsvStationsCsvAddressesImporter,
                 return None
 
             try:
-                location_data = geocode_point_only(postcode)
+                location_data = self.geocode_point_only(postcode)
                 location = Point(
                     location_data['wgs84_lon'],
                     location_data['wgs84_lat'],
@@ -264,6 +271,11 @@ class BaseHalaroseCsvImporter(BaseCsvStationsCsvAddressesImporter,
             address = address.replace("\n\n", "\n").strip()
         return address
 
+    def get_station_postcode_to_geocode(self, record):
+        if record.pollingstationnumber.strip() == 'n/a':
+            return None
+        return getattr(record, self.station_postcode_field).strip()
+
     def get_station_point(self, record):
         location = None
 
@@ -273,7 +285,7 @@ class BaseHalaroseCsvImporter(BaseCsvStationsCsvAddressesImporter,
             return None
 
         try:
-            location_data = geocode_point_only(postcode)
+            location_data = self.geocode_point_only(postcode)
             location = Point(
                 location_data['wgs84_lon'],
                 location_data['wgs84_lat'],
@@ -389,11 +401,20 @@ class BaseDemocracyCountsCsvImporter(BaseCsvStationsCsvAddressesImporter,
             'polling_station_id': getattr(record, self.station_id_field).strip(),
         }
 
+    def station_has_point(self, record):
+        badvalues = ['', '0', '0.00']
+        return record.xordinate not in badvalues and\
+            record.yordinate not in badvalues
+
+    def get_station_postcode_to_geocode(self, record):
+        if self.station_has_point(record):
+            return None
+        return record.postcode.strip()
+
     def get_station_point(self, record):
         location = None
 
-        badvalues = ['', '0', '0.00']
-        if (record.xordinate not in badvalues and record.yordinate not in badvalues):
+        if self.station_has_point(record):
             # if we've got points, use them
             location = Point(float(record.xordinate), float(record.yordinate), srid=27700)
         else:
@@ -403,7 +424,7 @@ class BaseDemocracyCountsCsvImporter(BaseCsvStationsCsvAddressesImporter,
                 return None
 
             try:
-                location_data = geocode_point_only(postcode)
+                location_data = self.geocode_point_only(postcode)
                 location = Point(
                     location_data['wgs84_lon'],
                     location_data['wgs84_lat'],
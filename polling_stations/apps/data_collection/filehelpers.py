@@ -3,36 +3,28 @@ import fnmatch
 import json
 import os
 import shapefile
+import shutil
 import tempfile
 import zipfile
 
 from collections import namedtuple
+from contextlib import ExitStack
 
-from django.contrib.gis.gdal import DataSource, GDALException
+from data_collection.xmlhelpers import KmlReader
 
 
-def recursive_find(path, pattern):
-    matches = []
-    for root, dirnames, filenames in os.walk(path):
-        for filename in fnmatch.filter(filenames, pattern):
-            matches.append(os.path.join(root, filename))
-    return matches
-
 """
 Helper class for reading data from CSV files
 """
 class CsvHelper:
 
-    def __init__(self, filepath, encoding='utf-8', delimiter=','):
+    def __init__(self, filepath, encoding='utf-8', delimiter=',', stream=False):
         self.filepath = filepath
         self.encoding = encoding
         self.delimiter = delimiter
+        self.stream = stream
 
-    def get_features(self):
-        file = open(self.filepath, 'rt', encoding=self.encoding)
-        reader = csv.reader(file, delimiter=self.delimiter)
-        header = next(reader)
-
+    def clean_header(self, header):
         # mimic the data structure generated by ffs so existing import
         # scripts don't break
         replace = {
@@ -52,58 +44,295 @@ class CsvHelper:
             while '__' in s:
                 s = s.replace('__', '_')
             clean.append(s)
-        RowKlass = namedtuple('RowKlass', clean)
+        return clean
+
+    def iter_features(self):
+        """
+        Yield one RowKlass per line of the file without reading
+        the whole file into memory. The file is closed when the
+        generator is exhausted, closed or an exception is raised.
+        """
+        with open(self.filepath, 'rt', encoding=self.encoding) as file:
+            reader = csv.reader(file, delimiter=self.delimiter)
+            header = next(reader)
+            RowKlass = namedtuple('RowKlass', self.clean_header(header))
+            for row in map(RowKlass._make, reader):
+                yield row
+
+    def get_features(self):
+        if self.stream:
+            return CsvFeatures(self)
+        return list(self.iter_features())
 
-        data = []
-        for row in map(RowKlass._make, reader):
-            data.append(row)
 
-        file.close()
-        return data
+class CsvFeatures:
+    """
+    Lazy, re-iterable view of a CSV file
+
+    Each call to __iter__() re-opens the file and streams it from the top,
+    so an importer can walk the same file more than once
+    (e.g: addresses, then stations) while only holding one row in memory.
+    """
+
+    def __init__(self, helper):
+        self.helper = helper
+
+    def __iter__(self):
+        return self.helper.iter_features()
 
 
 """
 Helper class for reading geographic data from ESRI SHP files
+
+If the shapefile is in a zip, we read the .shp, .shx and .dbf
+members straight out of the archive rather than extracting it.
+Members bigger than SPOOL_SIZE are spooled to an anonymous temp file,
+which is deleted when the helper is closed.
+
+If stream is True, get_features() returns a lazy re-iterable
+instead of a list, so we only hold one shape in memory at a time.
 """
 class ShpHelper:
 
-    def __init__(self, filepath, zip=False):
+    SPOOL_SIZE = 10 * 1024 * 1024
+
+    def __init__(self, filepath, zip=False, stream=False):
         self.filepath = filepath
         self.zip = zip
+        self.stream = stream
+        self.members = None
+
+    def read_zip_members(self):
+        members = {}
+        with zipfile.ZipFile(self.filepath, 'r') as zip_file:
+            names = zip_file.namelist()
+            shp_files = [
+                name for name in names
+                if fnmatch.fnmatch(os.path.basename(name), '*.shp')
+            ]
+            if len(shp_files) != 1:
+                raise ValueError('Found %i shapefiles in archive' % len(shp_files))
 
-    def get_features(self):
-        # If our shapefile is in a zip, extract it
-        # otherwise, we can read it directly
+            root = os.path.splitext(shp_files[0])[0]
+            names = {name.lower(): name for name in names}
+            for ext in ('shp', 'shx', 'dbf'):
+                name = names.get(('%s.%s' % (root, ext)).lower())
+                if name is None:
+                    continue
+                # pyshp needs to seek, which we can't do on a zip member
+                spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
+                with zip_file.open(name) as member:
+                    shutil.copyfileobj(member, spool)
+                members[ext] = spool
+        return members
+
+    def open_files(self, stack):
         if self.zip:
-            zip_file = zipfile.ZipFile(self.filepath, 'r')
-            tmpdir = tempfile.mkdtemp()
-            zip_file.extractall(tmpdir)
+            if self.members is None:
+                self.members = self.read_zip_members()
+            for member in self.members.values():
+                member.seek(0)
+            return self.members
+
+        root = os.path.splitext(self.filepath)[0]
+        files = {}
+        for ext in ('shp', 'shx', 'dbf'):
+            path = '%s.%s' % (root, ext)
+            if os.path.exists(path):
+                files[ext] = stack.enter_context(open(path, 'rb'))
+        return files
+
+    def iter_features(self):
+        with ExitStack() as stack:
+            sf = shapefile.Reader(**self.open_files(stack))
+            for shape_record in sf.iterShapeRecords():
+                yield shape_record
+
+    def close(self):
+        if self.members is not None:
+            for member in self.members.values():
+                member.close()
+            self.members = None
 
-            shp_files = recursive_find(tmpdir, "*.shp")
-            if len(shp_files) != 1:
-                raise ValueError('Found %i shapefiles in archive' % len(shp_files))
-            shp_file = shp_files[0]
+    def get_features(self):
+        if self.stream:
+            return ShpFeatures(self)
+        try:
+            return list(self.iter_features())
+        finally:
+            self.close()
 
-            sf = shapefile.Reader(shp_file)
-            return sf.shapeRecords()
-        else:
-            sf = shapefile.Reader(self.filepath)
-            return sf.shapeRecords()
+
+class ShpFeatures:
+    """
+    Lazy, re-iterable view of a shapefile
+
+    Like CsvFeatures, each call to __iter__() reads the shapes from
+    the top. For a zipped shapefile, the members are read out of the
+    archive once, so it doesn't matter if the zip file has been
+    deleted by the time we iterate.
+
+    The members are held in temp files until close() is called
+    (or the with block we're used in ends).
+    """
+
+    def __init__(self, helper):
+        self.helper = helper
+        if helper.zip:
+            helper.members = helper.read_zip_members()
+
+    def __iter__(self):
+        return self.helper.iter_features()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.helper.close()
 
 
 """
 Helper class for reading geographic data from GeoJSON files
+
+If stream is True, get_features() returns a lazy re-iterable
+which parses one feature at a time instead of loading the
+whole FeatureCollection into memory.
 """
 class GeoJsonHelper:
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, stream=False):
         self.filepath = filepath
+        self.stream = stream
+
+    def iter_features(self):
+        with open(self.filepath, 'r') as f:
+            for feature in JsonObjectReader(f).iter_array('features'):
+                yield feature
 
     def get_features(self):
-        geometries = json.load(open(self.filepath))
+        if self.stream:
+            return GeoJsonFeatures(self)
+        with open(self.filepath, 'r') as f:
+            geometries = json.load(f)
         return geometries['features']
 
 
+class GeoJsonFeatures:
+    """
+    Lazy, re-iterable view of a GeoJSON FeatureCollection
+    """
+
+    def __init__(self, helper):
+        self.helper = helper
+
+    def __iter__(self):
+        return self.helper.iter_features()
+
+
+class JsonObjectReader:
+    """
+    Incrementally read the members of a JSON object from a file
+
+    We only hold one member of the top-level object (or one element
+    of the array we're interested in) in memory at a time. Each value
+    is parsed with json's raw_decode(), so there is no dependency on
+    an event-based parser like ijson. If a value runs off the end of
+    the buffer, we read more and try again, doubling the amount we
+    read each time so a very large value doesn't take quadratic time.
+    """
+
+    WHITESPACE = ' \t\n\r'
+    DELIMITERS = WHITESPACE + ',:]}'
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, f, chunk_size=None):
+        self.f = f
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size):
+        # discard what we've already parsed, then read some more
+        if self.eof:
+            return False
+        self.buf = self.buf[self.pos:]
+        self.pos = 0
+        data = self.f.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill(self.chunk_size):
+                return
+
+    def expect(self, chars):
+        self.skip_whitespace()
+        if self.pos >= len(self.buf) or self.buf[self.pos] not in chars:
+            found = self.buf[self.pos:self.pos + 1] or 'end of file'
+            raise ValueError("Expected one of %r, found %r" % (chars, found))
+        char = self.buf[self.pos]
+        self.pos += 1
+        return char
+
+    def decode(self):
+        self.skip_whitespace()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a number might carry on into the next chunk
+                # (e.g: we've only read '1.' of '1.25'), so only accept
+                # a value if we can see what comes after it
+                if self.eof or (end < len(self.buf) and
+                                self.buf[end] in self.DELIMITERS):
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size = max(size, len(self.buf))
+
+    def iter_array(self, key):
+        """
+        Yield each element of the array self.f['key']
+        """
+        self.expect('{')
+        if self.expect('"}') == '}':
+            raise KeyError(key)
+        self.pos -= 1
+
+        while True:
+            name = self.decode()
+            self.expect(':')
+            if name == key:
+                self.expect('[')
+                self.skip_whitespace()
+                if self.buf[self.pos:self.pos + 1] == ']':
+                    self.pos += 1
+                    return
+                while True:
+                    yield self.decode()
+                    if self.expect(',]') == ']':
+                        return
+            else:
+                # not the member we want: parse and throw it away
+                self.decode()
+            if self.expect(',}') == '}':
+                raise KeyError(key)
+
+
 """
 Helper class for reading data from JSON files
 """
@@ -124,30 +353,22 @@ class KmlHelper:
     def __init__(self, filepath):
         self.filepath = filepath
 
-    def parse_features(self, kml):
-        try:
-            ds = DataSource(kml)
-        except GDALException:
-            # This is very strange – sometimes the above will fail the first
-            # time, but not the second. Seen on OS X with GDAL 2.2.0
-            ds = DataSource(kml)
-        return ds[0]
-
     def get_features(self):
         if not self.filepath.endswith('.kmz'):
-            return self.parse_features(self.filepath)
-
-        # It's a .kmz file
-        # Because the C lib that the Django DataSource is wrapping
-        # expects a file on disk, let's extract the KML to a tmpfile
-        kmz = zipfile.ZipFile(self.filepath, 'r')
-        kmlfile = kmz.open('doc.kml', 'r')
-
-        with tempfile.NamedTemporaryFile() as tmp:
-            tmp.write(kmlfile.read())
-            data = self.parse_features(tmp.name)
-            tmp.close()
-            return data
+            return KmlReader(self.filepath).get_features()
+
+        # It's a .kmz file: read the KML straight out of the archive
+        with zipfile.ZipFile(self.filepath, 'r') as kmz:
+            names = kmz.namelist()
+            if 'doc.kml' in names:
+                name = 'doc.kml'
+            else:
+                kml_files = [n for n in names if n.lower().endswith('.kml')]
+                if not kml_files:
+                    raise ValueError('Found no KML files in archive')
+                name = kml_files[0]
+            with kmz.open(name, 'r') as kmlfile:
+                return KmlReader(kmlfile).get_features()
 
 
 """
@@ -161,16 +382,22 @@ class FileHelperFactory():
     @staticmethod
     def create(filetype, filepath, options):
         if (filetype == 'shp'):
-            return ShpHelper(filepath)
+            return ShpHelper(filepath, stream=options.get('shp_stream', False))
         elif (filetype == 'shp.zip'):
-            return ShpHelper(filepath, zip=True)
+            return ShpHelper(
+                filepath, zip=True, stream=options.get('shp_stream', False))
         elif (filetype == 'kml'):
             return KmlHelper(filepath)
         elif (filetype == 'geojson'):
-            return GeoJsonHelper(filepath)
+            return GeoJsonHelper(
+                filepath, stream=options.get('geojson_stream', False))
         elif filetype == 'json':
             return JsonHelper(filepath)
         elif (filetype == 'csv'):
-            return CsvHelper(filepath, options['encoding'], options['delimiter'])
+            return CsvHelper(
+                filepath,
+                options['encoding'],
+                options['delimiter'],
+                options.get('stream', False))
         else:
             raise ValueError('Unexpected file type: %s' % (filetype))
@@ -0,0 +1,56 @@
+"""
+Work out whether the input files or code for an import
+have changed since the last time we ran it
+"""
+
+import hashlib
+import inspect
+import os
+import sys
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# only fingerprint our own code, not django's
+SOURCE_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def get_source_files(cls):
+    """
+    Return the source files for cls and its base
+    classes which are part of the data_collection app
+    """
+    files = set()
+    for klass in inspect.getmro(cls):
+        module = sys.modules.get(klass.__module__)
+        path = getattr(module, '__file__', None)
+        if not path:
+            continue
+        path = os.path.abspath(path)
+        if path.startswith(SOURCE_ROOT + os.sep):
+            files.add(path)
+    return sorted(files)
+
+
+def update_hash(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+
+def fingerprint(source_files, input_files, input_root):
+    """
+    Return a SHA-256 hex digest of the source and input files
+
+    Paths are hashed relative to SOURCE_ROOT and input_root
+    so moving the checkout or data directory doesn't
+    change the fingerprint.
+    """
+    digest = hashlib.sha256()
+    for root, paths in ((SOURCE_ROOT, source_files), (input_root, input_files)):
+        for path in sorted(paths):
+            digest.update(os.path.relpath(path, root).encode('utf-8'))
+            digest.update(b'\0')
+            update_hash(digest, path)
+            digest.update(b'\0')
+    return digest.hexdigest()
@@ -1,4 +1,10 @@
-from django.contrib.gis.geos import MultiPolygon, Polygon, LinearRing
+import json
+import shapefile
+import struct
+import sys
+from array import array
+from itertools import chain
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon, Polygon, LinearRing
 
 def convert_linestring_to_multiploygon(linestring):
     points = linestring.coords
@@ -12,3 +18,70 @@ def convert_linestring_to_multiploygon(linestring):
     poly = Polygon(ring)
     multipoly = MultiPolygon(poly)
     return multipoly
+
+
+def make_polygon(rings, srid):
+    return Polygon(*[LinearRing(ring) for ring in rings], srid=srid)
+
+
+def geojson_to_geos(geometry, srid):
+    """
+    Build a GEOS geometry from a parsed GeoJSON geometry (a dict)
+
+    For Polygons and MultiPolygons, we build it straight from the
+    coordinates rather than serialising the dict back to a string
+    for GEOSGeometry() to parse again. Anything else takes the slow path.
+    """
+    if geometry['type'] == 'Polygon':
+        return make_polygon(geometry['coordinates'], srid)
+    if geometry['type'] == 'MultiPolygon':
+        return MultiPolygon(
+            *[make_polygon(rings, srid) for rings in geometry['coordinates']],
+            srid=srid)
+    return GEOSGeometry(json.dumps(geometry), srid=srid)
+
+
+WKB_POLYGON = 3
+WKB_MULTIPOLYGON = 6
+WKB_SRID_FLAG = 0x20000000
+POLYGON_SHAPE_TYPES = (shapefile.POLYGON, shapefile.POLYGONM, shapefile.POLYGONZ)
+
+
+def shape_to_ewkb(shape, srid):
+    """
+    Build EWKB for a MultiPolygon straight from a pyshp polygon shape
+
+    This gives the same geometry as
+    clean_poly(GEOSGeometry(json.dumps(shape.__geo_interface__)))
+    without building a GeoJSON string and parsing it again.
+    pyshp keeps Z and M values separately, so they are dropped.
+    Returns None if shape isn't a polygon.
+    """
+    if shape.shapeType not in POLYGON_SHAPE_TYPES or not shape.points:
+        return None
+
+    # pack every coordinate into one array of doubles and
+    # slice the rings out of it, rather than packing point by point
+    coords = array('d', chain.from_iterable(shape.points))
+    if sys.byteorder == 'big':
+        coords.byteswap()
+
+    ends = list(shape.parts[1:]) + [len(shape.points)]
+    rings = list(zip(shape.parts, ends))
+
+    polygons = [[rings[0]]]
+    for start, end in rings[1:]:
+        # same test pyshp uses to tell outer rings from holes
+        if shapefile.signed_area(shape.points[start:end]) < 0:
+            polygons.append([(start, end)])
+        else:
+            polygons[-1].append((start, end))
+
+    wkb = [struct.pack(
+        '<BIII', 1, WKB_MULTIPOLYGON | WKB_SRID_FLAG, srid, len(polygons))]
+    for polygon in polygons:
+        wkb.append(struct.pack('<BII', 1, WKB_POLYGON, len(polygon)))
+        for start, end in polygon:
+            wkb.append(struct.pack('<I', end - start))
+            wkb.append(coords[start * 2:end * 2].tobytes())
+    return memoryview(b''.join(wkb))
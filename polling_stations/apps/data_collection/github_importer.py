@@ -1,13 +1,12 @@
 import abc
 import json
-import tempfile
 from django.apps import apps
 from django.conf import settings
 from django.contrib.gis.geos import GEOSGeometry
-from django.contrib.gis.gdal import DataSource
 from django.core.checks import Error, register
-from django.utils.encoding import force_bytes
 from data_collection.base_importers import BaseGenericApiImporter
+from data_collection.geo_utils import geojson_to_geos
+from data_collection.xmlhelpers import gml_to_ogr
 
 
 class BaseGitHubImporter(BaseGenericApiImporter, metaclass=abc.ABCMeta):
@@ -40,31 +39,8 @@ class BaseGitHubImporter(BaseGenericApiImporter, metaclass=abc.ABCMeta):
 
     def extract_json_geometry(self, record, srid):
         geom = json.loads(record['geometry'])
-        geojson = json.dumps(geom['geometry'])
-        return self.clean_poly(GEOSGeometry(geojson, srid=srid))
+        return self.clean_poly(geojson_to_geos(geom['geometry'], srid))
 
     def extract_gml_geometry(self, record, srid):
-        """
-        This is a bit of a hack
-
-        In this version of Django, there is no way to directly create an
-        OGRGeometry or GEOSGeometry object directly from a GML string but we
-        can do it by writing it out to a file and then reading it back in with
-        DataSource().
-
-        This functionality will be added in Django 1.11
-        https://docs.djangoproject.com/en/dev/releases/1.11/#django-contrib-gis
-        """
-
-        with tempfile.NamedTemporaryFile() as tmp:
-            tmp.write(force_bytes(record['geometry']))
-            tmp.seek(0)
-            try:
-                ds = DataSource(tmp.name)
-            except:
-                ds = DataSource(tmp.name)
-            if len(ds[0]) == 1:
-                geojson = next(iter(ds[0])).geom.geojson
-                return self.clean_poly(GEOSGeometry(geojson, srid=srid))
-            else:
-                raise ValueError("Expected 1 feature, found %i" % len(ds[0]))
+        geom = gml_to_ogr(record['geometry'])
+        return self.clean_poly(GEOSGeometry(geom.wkb, srid=srid))
@@ -0,0 +1,139 @@
+"""
+Run a batch of import scripts, optionally in parallel
+"""
+
+import os
+import time
+import traceback
+from collections import namedtuple
+from importlib.machinery import SourceFileLoader
+from multiprocessing import Pool
+from django import db
+
+
+ImportJob = namedtuple('ImportJob', ['name', 'path', 'council_id', 'series'])
+JobResult = namedtuple('JobResult', ['job', 'success', 'attempts', 'seconds', 'error'])
+
+
+# errors which might go away if we try again
+# e.g: the DB server closed the connection, deadlocks, etc
+TRANSIENT_ERRORS = (db.OperationalError, db.InterfaceError)
+
+
+# load a django management command from file f
+def load_command(f):
+    # give each module its own name so we can
+    # find the source for a command from its class
+    name = os.path.splitext(os.path.basename(f))[0]
+    command = SourceFileLoader(name, f).load_module()
+    return command.Command()
+
+
+def run_job(job, opts, retries=2, retry_delay=5):
+    """
+    Run a single import script, retrying transient DB errors.
+    Never raises: any other exception is caught and reported
+    in the JobResult so one council can't stop the others
+    """
+    start = time.time()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            cmd = load_command(job.path)
+            cmd.handle(**opts)
+            return JobResult(job, True, attempts, time.time() - start, None)
+        except TRANSIENT_ERRORS as e:
+            traceback.print_exc()
+            if attempts > retries:
+                return JobResult(job, False, attempts, time.time() - start, repr(e))
+            # throw away the broken connection and back off before we retry
+            db.connections.close_all()
+            time.sleep(retry_delay * attempts)
+        except Exception as e:
+            traceback.print_exc()
+            return JobResult(job, False, attempts, time.time() - start, repr(e))
+
+
+def run_lane(jobs, opts, retries=2, retry_delay=5):
+    # run a list of jobs one after another
+    return [run_job(job, opts, retries, retry_delay) for job in jobs]
+
+
+class ImportScheduler:
+    """
+    Run a list of ImportJobs using at most `workers` processes
+    (and so at most `workers` concurrent DB connections).
+
+    Jobs with series=True (e.g: importers which share one big dataset)
+    run one after another in their own lane, which takes up one worker.
+    Every other job runs as soon as a worker is free.
+    """
+
+    def __init__(self, jobs, opts, workers=1, retries=2, retry_delay=5):
+        self.jobs = jobs
+        self.opts = opts
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    def get_lanes(self):
+        series = [job for job in self.jobs if job.series]
+        lanes = [[job] for job in self.jobs if not job.series]
+        if series:
+            # start the series lane first: it is likely to take longest
+            lanes.insert(0, series)
+        return lanes
+
+    def run_in_process(self):
+        results = []
+        for lane in self.get_lanes():
+            results += run_lane(lane, self.opts, self.retries, self.retry_delay)
+        return results
+
+    def run_in_pool(self):
+        # Before kicking off parallel imports, close any open
+        # DB connections. Otherwise, Django will throw
+        # django.db.utils.DatabaseError: lost synchronization with server
+        db.connections.close_all()
+
+        # use a fresh process for each lane so memory
+        # used by a big council is given back when it finishes
+        pool = Pool(self.workers, maxtasksperchild=1)
+        pending = [
+            pool.apply_async(
+                run_lane, (lane, self.opts, self.retries, self.retry_delay))
+            for lane in self.get_lanes()
+        ]
+        pool.close()
+        pool.join()
+
+        results = []
+        for lane_result in pending:
+            results += lane_result.get()
+        return results
+
+    def run(self):
+        if self.workers > 1:
+            return self.run_in_pool()
+        return self.run_in_process()
+
+
+def format_timing_table(results):
+    """
+    Return a list of lines summarising each job, slowest first
+    """
+    lines = ["%-12s %-45s %-8s %8s %10s" % (
+        'council', 'importer', 'status', 'attempts', 'seconds')]
+    total = 0
+    for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+        total += result.seconds
+        lines.append("%-12s %-45s %-8s %8i %10.1f" % (
+            result.job.council_id,
+            result.job.name,
+            'OK' if result.success else 'FAILED',
+            result.attempts,
+            result.seconds,
+        ))
+    lines.append("%-12s %-45s %-8s %8s %10.1f" % ('', 'total', '', '', total))
+    return lines
@@ -0,0 +1,192 @@
+"""
+Find out which council and elections each import script covers
+without importing hundreds of modules
+"""
+
+import ast
+import glob
+import json
+import os
+import tempfile
+
+
+# attributes we can read from an importer's source
+INDEXED_ATTRIBUTES = ('council_id', 'elections', 'run_in_series')
+
+
+def get_class_info(node):
+    """
+    Return the names of a class's bases and any of the
+    INDEXED_ATTRIBUTES assigned literal values in the class body.
+    Attributes assigned anything else are listed in 'dynamic'
+    """
+    bases = []
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            bases.append(base.id)
+        elif isinstance(base, ast.Attribute):
+            bases.append(base.attr)
+
+    attributes = {}
+    dynamic = []
+    for statement in node.body:
+        if not isinstance(statement, ast.Assign):
+            continue
+        for target in statement.targets:
+            if isinstance(target, ast.Name) and target.id in INDEXED_ATTRIBUTES:
+                try:
+                    attributes[target.id] = ast.literal_eval(statement.value)
+                except ValueError:
+                    dynamic.append(target.id)
+    return {'bases': bases, 'attributes': attributes, 'dynamic': dynamic}
+
+
+def get_classes(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    return {
+        node.name: get_class_info(node)
+        for node in tree.body if isinstance(node, ast.ClassDef)
+    }
+
+
+class ImporterIndex:
+    """
+    Build (and cache as JSON) an index of import scripts
+
+    Each import script is parsed with ast, not imported. Entries are
+    only re-parsed when the file's mtime changes. run_in_series is
+    usually inherited, so we also parse the modules in base_path
+    where the base importer classes live to follow the inheritance chain.
+
+    If an importer sets council_id or elections to something we can't
+    evaluate statically, its entry is marked 'dynamic' and the caller
+    will need to load the module to find out.
+    """
+
+    VERSION = 1
+
+    def __init__(self, commands_path, base_path, index_path=None):
+        self.commands_path = commands_path
+        self.base_path = base_path
+        if index_path is None:
+            index_path = os.path.join(
+                tempfile.gettempdir(), 'polling_stations_importer_index.json')
+        self.index_path = index_path
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if index.get('version') == self.VERSION:
+                return index
+        except (IOError, ValueError):
+            pass
+        return {'version': self.VERSION, 'bases': {}, 'importers': {}}
+
+    def save(self, index):
+        # write to a temp file and rename it, so
+        # two processes can't leave a half-written index
+        tmp_path = '%s.%i.tmp' % (self.index_path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self, cache, paths):
+        """
+        Update cache ({filename: {'mtime':..., 'classes':...}})
+        for the files in paths. Return True if anything changed
+        """
+        changed = False
+        filenames = set()
+        for path in paths:
+            filename = os.path.basename(path)
+            filenames.add(filename)
+            mtime = os.path.getmtime(path)
+            if filename in cache and cache[filename]['mtime'] == mtime:
+                continue
+            try:
+                classes = get_classes(path)
+                error = None
+            except (SyntaxError, UnicodeDecodeError, ValueError) as e:
+                classes = {}
+                error = repr(e)
+            cache[filename] = {'mtime': mtime, 'classes': classes, 'error': error}
+            changed = True
+
+        for filename in set(cache.keys()) - filenames:
+            del cache[filename]
+            changed = True
+        return changed
+
+    def get_base_classes(self, bases_cache):
+        classes = {}
+        for entry in bases_cache.values():
+            classes.update(entry['classes'])
+        return classes
+
+    def inherits_attribute(self, class_name, attribute, base_classes, seen=None):
+        # walk up the inheritance chain looking for attribute
+        seen = seen or set()
+        if class_name in seen or class_name not in base_classes:
+            return None
+        seen.add(class_name)
+        info = base_classes[class_name]
+        if attribute in info['attributes']:
+            return info['attributes'][attribute]
+        for base in info['bases']:
+            value = self.inherits_attribute(base, attribute, base_classes, seen)
+            if value is not None:
+                return value
+        return None
+
+    def make_entry(self, filename, cached, base_classes):
+        entry = {
+            'filename': filename,
+            'path': os.path.join(self.commands_path, filename),
+            'council_id': None,
+            'elections': None,
+            'run_in_series': False,
+            'dynamic': False,
+            'error': cached['error'],
+        }
+        command = cached['classes'].get('Command')
+        if command is None:
+            if not entry['error']:
+                entry['error'] = 'No Command class found'
+            return entry
+
+        for attribute in ('council_id', 'elections'):
+            entry[attribute] = command['attributes'].get(attribute)
+        entry['dynamic'] = bool(command['dynamic'])
+
+        if 'run_in_series' in command['attributes']:
+            entry['run_in_series'] = bool(command['attributes']['run_in_series'])
+        else:
+            entry['run_in_series'] = any(
+                self.inherits_attribute(base, 'run_in_series', base_classes)
+                for base in command['bases'])
+        return entry
+
+    def get_importers(self):
+        """
+        Return a list of dicts describing each import script
+        """
+        index = self.load()
+        changed = self.refresh(
+            index['bases'], glob.glob(os.path.join(self.base_path, '*.py')))
+        changed = self.refresh(
+            index['importers'],
+            glob.glob(os.path.join(self.commands_path, 'import_*.py'))) or changed
+        if changed:
+            try:
+                self.save(index)
+            except (IOError, OSError):
+                # we can still use the index, just not cache it
+                pass
+
+        base_classes = self.get_base_classes(index['bases'])
+        return [
+            self.make_entry(filename, cached, base_classes)
+            for filename, cached in sorted(index['importers'].items())
+        ]
@@ -7,6 +7,7 @@ class LogHelper:
     logger = None
 
     def __init__(self, verbosity):
+        self.verbosity = verbosity
         logformat = '%(levelname)s: %(message)s'
         logging.basicConfig(format=logformat)
         logger = logging.getLogger(__name__)
@@ -0,0 +1,50 @@
+import time
+from django.core.management.base import BaseCommand
+from data_collection.data_types import AddressSet
+
+"""
+Time AddressSet.remove_ambiguous_addresses() on synthetic councils
+of different sizes. This doesn't touch the DB.
+"""
+class Command(BaseCommand):
+
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-s',
+            '--sizes',
+            nargs='+',
+            help='Number of addresses in each run',
+            type=int,
+            default=[10000, 100000, 1000000],
+        )
+
+    def make_addresses(self, rows):
+        addresses = AddressSet(QuietLogger())
+        for i in range(rows):
+            # about 1% of addresses appear twice with different stations
+            number = i - 1 if i % 100 == 1 else i
+            addresses.add({
+                'address': '%i Foo Street, Bar Town' % (number),
+                'postcode': 'AA%i 1AA' % (number // 20),
+                'council': 'X01000001',
+                'polling_station_id': str(i % 7),
+                'slug': str(i),
+            })
+        return addresses
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("%10s %10s %10s %12s" % ('rows', 'kept', 'seconds', 'rows/s'))
+        for rows in kwargs['sizes']:
+            addresses = self.make_addresses(rows)
+            start = time.time()
+            kept = addresses.remove_ambiguous_addresses()
+            elapsed = time.time() - start
+            self.stdout.write("%10i %10i %10.2f %12.0f" % (
+                rows, len(kept), elapsed, rows / elapsed))
+
+
+class QuietLogger:
+    def log_message(self, level, message, variable=None, pretty=False):
+        pass
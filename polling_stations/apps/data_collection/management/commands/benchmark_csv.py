@@ -0,0 +1,95 @@
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from data_collection.filehelpers import CsvHelper
+
+"""
+Compare reading a CSV into a list with streaming it, making two full
+passes over the rows like BaseStationsAddressesImporter does (addresses,
+then stations). Uses a synthetic Xpress-style file unless -f is given.
+This doesn't touch the DB.
+"""
+class Command(BaseCommand):
+
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-f',
+            '--file',
+            help='<Optional> CSV file to read',
+            required=False,
+            default=None,
+        )
+
+        parser.add_argument(
+            '-r',
+            '--rows',
+            help='Number of rows in the synthetic file',
+            type=int,
+            default=300000,
+        )
+
+    def make_file(self, rows):
+        f = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='')
+        writer = csv.writer(f)
+        writer.writerow([
+            'Property URN', 'Property Number', 'Property Address 1',
+            'Property Address 2', 'Property Post Code', 'Polling Place ID',
+            'Polling Place Name', 'Polling Place Address 1',
+            'Polling Place Post Code', 'Polling Place Easting',
+            'Polling Place Northing',
+        ])
+        for i in range(rows):
+            station = i % 40
+            writer.writerow([
+                str(100000 + i), str(i % 200), 'Foo Street', 'Bar Town',
+                'AA%i 1AA' % (i // 20), str(station),
+                'Station %i' % (station), '%i Baz Lane' % (station),
+                'BB%i 1BB' % (station), str(500000 + station),
+                str(200000 + station),
+            ])
+        f.close()
+        return f.name
+
+    def two_passes(self, features):
+        count = 0
+        for pass_ in range(2):
+            for row in features:
+                count += 1
+        return count
+
+    def measure(self, name, func):
+        start = time.time()
+        count = func()
+        elapsed = time.time() - start
+
+        # tracing allocations slows everything down,
+        # so measure memory use on a separate run
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write("%-15s %10i %10.2f %12.1f" % (
+            name, count, elapsed, peak / (1024 * 1024)))
+
+    def handle(self, *args, **kwargs):
+        path = kwargs['file']
+        if path is None:
+            path = self.make_file(kwargs['rows'])
+        try:
+            self.stdout.write("file size: %.1f MB" % (
+                os.path.getsize(path) / (1024 * 1024)))
+            self.stdout.write("%-15s %10s %10s %12s" % (
+                '', 'rows read', 'seconds', 'peak MB'))
+
+            self.measure('list', lambda: self.two_passes(
+                CsvHelper(path).get_features()))
+            self.measure('streaming', lambda: self.two_passes(
+                CsvHelper(path, stream=True).get_features()))
+        finally:
+            if kwargs['file'] is None:
+                os.remove(path)
@@ -0,0 +1,95 @@
+import time
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from councils.models import Council
+from data_collection.data_types import AddressSet, DistrictSet, StationSet
+
+"""
+Compare how quickly StationSet, DistrictSet and AddressSet
+can save records using COPY and using bulk_create()
+
+Everything is written inside a transaction which we roll back,
+so this doesn't change the data in the DB
+"""
+class Command(BaseCommand):
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'council_id',
+            help='Council ID to attach the records to in the format X01000001',
+        )
+
+        parser.add_argument(
+            '-r',
+            '--rows',
+            help='Number of records of each type to save',
+            type=int,
+            default=10000,
+        )
+
+    def make_stations(self, council, rows):
+        stations = StationSet()
+        for i in range(rows):
+            stations.add({
+                'council': council,
+                'internal_council_id': str(i),
+                'postcode': 'AA1 1AA',
+                'address': '%i Foo Street\nBar Town' % (i),
+                'location': Point(400000 + i, 300000 + i, srid=27700),
+            })
+        return stations
+
+    def make_districts(self, council, rows):
+        districts = DistrictSet()
+        for i in range(rows):
+            x = 400000 + (i * 10)
+            districts.add({
+                'council': council,
+                'internal_council_id': str(i),
+                'area': MultiPolygon(Polygon((
+                    (x, 300000), (x, 300010), (x + 10, 300010),
+                    (x + 10, 300000), (x, 300000))), srid=27700),
+            })
+        return districts
+
+    def make_addresses(self, council, rows):
+        addresses = AddressSet(None)
+        for i in range(rows):
+            addresses.add({
+                'address': '%i Foo Street, Bar Town' % (i),
+                'postcode': 'AA11AA',
+                'council': council,
+                'polling_station_id': '1',
+                'slug': '%i-foo-street-bar-town-aa11aa' % (i),
+            })
+        return addresses
+
+    def time_save(self, data, use_copy, *args):
+        data.use_copy = use_copy
+        # save() throws away the ambiguous addresses, so work on a copy
+        elements = set(data.elements)
+        with transaction.atomic():
+            start = time.time()
+            data.save(*args)
+            elapsed = time.time() - start
+            transaction.set_rollback(True)
+        data.elements = elements
+        return elapsed
+
+    def handle(self, *args, **kwargs):
+        council = Council.objects.get(pk=kwargs['council_id'])
+        rows = kwargs['rows']
+
+        sets = [
+            ('stations', self.make_stations(council, rows), []),
+            ('districts', self.make_districts(council, rows), []),
+            ('addresses', self.make_addresses(council, rows), [1000]),
+        ]
+
+        self.stdout.write("%-10s %15s %15s" % ('', 'COPY rows/s', 'ORM rows/s'))
+        for name, data, args in sets:
+            copy_time = self.time_save(data, True, *args)
+            orm_time = self.time_save(data, False, *args)
+            self.stdout.write("%-10s %15.0f %15.0f" % (
+                name, rows / copy_time, rows / orm_time))
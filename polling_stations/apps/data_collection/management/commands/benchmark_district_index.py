@@ -0,0 +1,67 @@
+import random
+import time
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from pollingstations.helpers import get_district_index
+from pollingstations.models import PollingStation
+
+"""
+Compare resolving random points inside the UK bounding box to polling
+districts with PostGIS (one query per point) and with the in-memory
+DistrictIndex (POLLING_DISTRICT_INDEX). This needs some districts to
+have been imported. It reads from the DB but doesn't write to it.
+"""
+class Command(BaseCommand):
+
+    requires_system_checks = False
+
+    # xmin, ymin, xmax, ymax
+    UK_EXTENT = (-8.65, 49.86, 1.77, 60.86)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-p',
+            '--points',
+            help='Number of random points to look up',
+            type=int,
+            default=5000,
+        )
+
+    def make_points(self, count):
+        rand = random.Random(1234)
+        xmin, ymin, xmax, ymax = self.UK_EXTENT
+        return [
+            Point(rand.uniform(xmin, xmax), rand.uniform(ymin, ymax), srid=4326)
+            for i in range(count)
+        ]
+
+    def time_it(self, name, enabled, points):
+        with override_settings(POLLING_DISTRICT_INDEX={'ENABLED': enabled}):
+            start = time.time()
+            districts = [
+                PollingStation.objects.get_polling_district(point)
+                for point in points
+            ]
+            elapsed = time.time() - start
+        found = len([d for d in districts if d is not None])
+        self.stdout.write("%-15s %10.2f %12.0f %10i" % (
+            name, elapsed, len(points) / elapsed, found))
+        return [d.pk if d else None for d in districts]
+
+    def handle(self, *args, **kwargs):
+        points = self.make_points(kwargs['points'])
+
+        index = get_district_index()
+        index.clear()
+        start = time.time()
+        index.load()
+        self.stdout.write("built index in %.2fs" % (time.time() - start))
+
+        self.stdout.write("%-15s %10s %12s %10s" % (
+            '', 'seconds', 'points/s', 'found'))
+        db_results = self.time_it('PostGIS', False, points)
+        index_results = self.time_it('DistrictIndex', True, points)
+
+        if db_results != index_results:
+            self.stdout.write("WARNING: results don't match")
@@ -0,0 +1,104 @@
+import json
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+from django.contrib.gis.geos import GEOSGeometry
+from django.core.management.base import BaseCommand
+from data_collection.filehelpers import GeoJsonHelper
+from data_collection.geo_utils import geojson_to_geos
+
+"""
+Compare loading a GeoJSON file in one go with streaming it,
+and building district geometries by re-serialising each geometry
+with building them directly. Uses a synthetic file unless -f is given.
+This doesn't touch the DB.
+"""
+class Command(BaseCommand):
+
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-f',
+            '--file',
+            help='<Optional> GeoJSON file to read',
+            required=False,
+            default=None,
+        )
+
+        parser.add_argument(
+            '--features',
+            help='Number of districts in the synthetic file',
+            type=int,
+            default=500,
+        )
+
+        parser.add_argument(
+            '--points',
+            help='Number of points in each synthetic district',
+            type=int,
+            default=5000,
+        )
+
+    def make_file(self, features, points):
+        f = tempfile.NamedTemporaryFile('w', suffix='.geojson', delete=False)
+        f.write('{"type": "FeatureCollection", "features": [')
+        for i in range(features):
+            x, y = -2 + (i % 50) * 0.01, 52 + (i // 50) * 0.01
+            ring = [
+                [x + 0.004 * math.cos(2 * math.pi * j / points),
+                 y + 0.004 * math.sin(2 * math.pi * j / points)]
+                for j in range(points)
+            ]
+            ring.append(ring[0])
+            if i:
+                f.write(',')
+            json.dump({
+                'type': 'Feature',
+                'properties': {'id': str(i), 'name': 'district %i' % i},
+                'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+            }, f)
+        f.write(']}')
+        f.close()
+        return f.name
+
+    def measure(self, name, func):
+        start = time.time()
+        count = func()
+        elapsed = time.time() - start
+
+        # tracing allocations slows everything down,
+        # so measure memory use on a separate run
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write("%-35s %8i %10.2f %12.1f" % (
+            name, count, elapsed, peak / (1024 * 1024)))
+
+    def handle(self, *args, **kwargs):
+        path = kwargs['file']
+        if path is None:
+            path = self.make_file(kwargs['features'], kwargs['points'])
+        try:
+            self.stdout.write("file size: %.1f MB" % (
+                os.path.getsize(path) / (1024 * 1024)))
+            self.stdout.write("%-35s %8s %10s %12s" % (
+                '', 'features', 'seconds', 'peak MB'))
+
+            self.measure('json.load()', lambda: sum(
+                1 for f in GeoJsonHelper(path).get_features()))
+            self.measure('streaming', lambda: sum(
+                1 for f in GeoJsonHelper(path, stream=True).get_features()))
+
+            self.measure('streaming + dumps/GEOSGeometry', lambda: sum(
+                1 for f in GeoJsonHelper(path, stream=True).get_features()
+                if GEOSGeometry(json.dumps(f['geometry']), srid=4326)))
+            self.measure('streaming + geojson_to_geos()', lambda: sum(
+                1 for f in GeoJsonHelper(path, stream=True).get_features()
+                if geojson_to_geos(f['geometry'], 4326)))
+        finally:
+            if kwargs['file'] is None:
+                os.remove(path)
@@ -0,0 +1,55 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from data_collection.slugger import Slugger
+
+"""
+Compare the throughput of the different ways of slugifying addresses
+on synthetic data. This doesn't touch the DB.
+"""
+class Command(BaseCommand):
+
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-r',
+            '--rows',
+            help='Number of addresses to slugify',
+            type=int,
+            default=250000,
+        )
+
+        parser.add_argument(
+            '-d',
+            '--duplicates',
+            help='Fraction of addresses which are repeated',
+            type=float,
+            default=0.5,
+        )
+
+    def make_addresses(self, rows, duplicates):
+        rand = random.Random(1234)
+        streets = ['Foo Street', 'Bar Road', 'Baz Lane', 'Rue de l\'\xc9glise']
+        addresses = []
+        for i in range(rows):
+            if addresses and rand.random() < duplicates:
+                addresses.append(rand.choice(addresses))
+            else:
+                addresses.append('%i/%i %s, Qux Town-AA%i 1AA' % (
+                    i, i % 3, rand.choice(streets), i % 1000))
+        return addresses
+
+    def time_it(self, name, func, addresses):
+        start = time.time()
+        func(addresses)
+        elapsed = time.time() - start
+        self.stdout.write("%-25s %10.2f %12.0f" % (
+            name, elapsed, len(addresses) / elapsed))
+
+    def handle(self, *args, **kwargs):
+        addresses = self.make_addresses(kwargs['rows'], kwargs['duplicates'])
+
+        self.stdout.write("%-25s %10s %12s" % ('', 'seconds', 'rows/s'))
+        self.time_it('slugify()', lambda a: [Slugger.slugify(x) for x in a], addresses)
+        self.time_it('slugify_many()', Slugger.slugify_many, addresses)
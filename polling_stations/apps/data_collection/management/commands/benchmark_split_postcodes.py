@@ -0,0 +1,72 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from addressbase.helpers import (
+    EdgeCaseFixer,
+    postcodes_not_contained_by_council,
+    postcodes_not_contained_by_district
+)
+from councils.models import Council
+from pollingstations.models import PollingDistrict
+
+"""
+Compare the old per-district way of finding postcodes which are split
+across district boundaries (and making addresses for them) with the
+set-based one create_address_records_for_council() uses now.
+
+This needs a council which has already been imported. It reads from
+the DB but doesn't write to it.
+"""
+class Command(BaseCommand):
+
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'council',
+            help='Council to run against (in the format X01000001)'
+        )
+
+    def per_district(self, council):
+        not_contained = set()
+        contained = 0
+        fixer = EdgeCaseFixer(council.pk, QuietLogger())
+        for district in PollingDistrict.objects.filter(council=council):
+            data = postcodes_not_contained_by_district(district)
+            contained += data['total'] - len(data['not_contained'])
+            not_contained.update(data['not_contained'])
+            for postcode in data['not_contained']:
+                fixer.make_addresses_for_postcode(postcode)
+        return not_contained, contained, fixer.get_address_set()
+
+    def per_council(self, council):
+        data = postcodes_not_contained_by_council(council)
+        fixer = EdgeCaseFixer(council.pk, QuietLogger())
+        fixer.make_addresses_for_postcodes(sorted(data['not_contained']))
+        return data['not_contained'], data['contained'], fixer.get_address_set()
+
+    def time_it(self, name, func, council):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.time()
+            result = func(council)
+            elapsed = time.time() - start
+        self.stdout.write("%-15s %10.2f %10i %10i %10i" % (
+            name, elapsed, len(queries), len(result[0]), len(result[2])))
+        return result
+
+    def handle(self, *args, **kwargs):
+        council = Council.objects.defer("area").get(pk=kwargs['council'])
+
+        self.stdout.write("%-15s %10s %10s %10s %10s" % (
+            '', 'seconds', 'queries', 'postcodes', 'addresses'))
+        old = self.time_it('per district', self.per_district, council)
+        new = self.time_it('per council', self.per_council, council)
+
+        if old != new:
+            self.stdout.write("WARNING: results don't match")
+
+
+class QuietLogger:
+    def log_message(self, level, message, variable=None, pretty=False):
+        pass
@@ -0,0 +1,70 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from councils.models import Council
+from data_collection.loghelper import LogHelper
+from data_finder.helpers import PostcodeAnswerBuilder
+
+"""
+Work out the answer for every postcode in one or more councils
+and store it in the PostcodeAnswer table
+
+Importers do this automatically if POSTCODE_ANSWERS['ENABLED'] is set.
+This command is useful for building the table for data we've
+already imported, or after importing AddressBase, ONSPD or the blacklist.
+"""
+class Command(BaseCommand):
+
+    """
+    Turn off auto system check for all apps
+    We will maunally run system checks only for the
+    'data_collection' and 'pollingstations' apps
+    """
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+
+        group.add_argument(
+            '-c',
+            '--council',
+            nargs='+',
+            help='Council ID(s) to build answers for in the format X01000001',
+        )
+
+        group.add_argument(
+            '-a',
+            '--all',
+            help='Build answers for all councils which have polling stations',
+            action='store_true',
+            default=False,
+        )
+
+        parser.add_argument(
+            '-b',
+            '--batch_size',
+            help='Batch size for database insert operations',
+            type=int,
+            default=1000,
+        )
+
+    def handle(self, *args, **kwargs):
+        self.check([
+            apps.get_app_config('data_collection'),
+            apps.get_app_config('pollingstations')
+        ])
+
+        logger = LogHelper(kwargs.get('verbosity'))
+
+        if kwargs.get('all'):
+            council_ids = Council.objects\
+                .exclude(pollingstation=None)\
+                .distinct()\
+                .values_list('pk', flat=True)
+        else:
+            council_ids = kwargs['council']
+
+        for council_id in council_ids:
+            # check this council exists
+            Council.objects.get(pk=council_id)
+            PostcodeAnswerBuilder(
+                council_id, logger, kwargs.get('batch_size')).build()
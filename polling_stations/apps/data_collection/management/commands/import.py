@@ -1,10 +1,15 @@
-import glob, os, re, traceback
-from importlib.machinery import SourceFileLoader
-from multiprocessing import Pool
-from django import db
+import os, re
+from multiprocessing import cpu_count
 from django.apps import apps
-from django.core.management.base import BaseCommand
-
+from django.core.management.base import BaseCommand, CommandError
+
+from data_collection.import_scheduler import (
+    format_timing_table,
+    load_command,
+    ImportJob,
+    ImportScheduler
+)
+from data_collection.importer_index import ImporterIndex
 from pollingstations.models import PollingStation
 
 
@@ -15,20 +20,6 @@ def match_in(regex, lst):
             return True
     return False
 
-# load a django management command from file f
-def load_command(f):
-    command = SourceFileLoader("module.name", f).load_module()
-    return command.Command()
-
-# run a django management command from file f
-def run_cmd(f, opts):
-    cmd = load_command(f)
-    try:
-        cmd.handle(**opts)
-    except Exception as e:
-        traceback.print_exc()
-        raise e
-
 """
 Run all of the import scripts relating to a particular election or elections
 
@@ -77,12 +68,63 @@ class Command(BaseCommand):
         parser.add_argument(
             '-m',
             '--multiprocessing',
-            help='<Optional> Use multiprocessing for import',
+            help='<Optional> Use multiprocessing for import (each importer then cleans up addresses with 1 worker)',
+            action='store_true',
+            required=False,
+            default=False
+        )
+
+        parser.add_argument(
+            '-j',
+            '--jobs',
+            help='<Optional> Maximum number of imports to run at once with --multiprocessing (default: number of CPUs)',
+            type=int,
+            required=False,
+            default=None
+        )
+
+        parser.add_argument(
+            '--retries',
+            help='<Optional> Number of times to retry an import after a transient DB error',
+            type=int,
+            required=False,
+            default=2
+        )
+
+        parser.add_argument(
+            '-s',
+            '--staging',
+            help='<Optional> Import each council into staging tables before replacing the live data',
             action='store_true',
             required=False,
             default=False
         )
 
+        parser.add_argument(
+            '-i',
+            '--incremental',
+            help='<Optional> Only re-import councils whose input files or importer code have changed since the last import',
+            action='store_true',
+            required=False,
+            default=False
+        )
+
+        parser.add_argument(
+            '-f',
+            '--force',
+            help='<Optional> With --incremental, re-import every council anyway',
+            action='store_true',
+            required=False,
+            default=False
+        )
+
+        parser.add_argument(
+            '--index-path',
+            help='<Optional> Where to cache the index of import scripts (default: in the system temp directory)',
+            required=False,
+            default=None
+        )
+
     def importer_covers_these_elections(self, args_elections, importer_elections, regex):
         for election in args_elections:
             if regex:
@@ -102,16 +144,6 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(line[1])
 
-    def run_commands_in_series(self, commands):
-        for f, opts in commands:
-            run_cmd(f, opts)
-
-    def run_commands_in_parallel(self, commands):
-        pool = Pool()
-        pool.starmap(run_cmd, commands)
-        pool.close()
-        pool.join()
-
     def handle(self, *args, **kwargs):
         """
         Manually run system checks for the
@@ -125,60 +157,79 @@ class Command(BaseCommand):
         ])
 
         base_path = os.path.dirname(__file__)
-        files = glob.glob(base_path + '/import_*.py')
+        index = ImporterIndex(
+            base_path,
+            os.path.abspath(os.path.join(base_path, '..', '..')),
+            index_path=kwargs.get('index_path'))
+        importers = index.get_importers()
 
-        if not files:
+        if not importers:
             raise ValueError("No importers matched")
 
-        commands_series = []
-        commands_parallel = []
+        jobs = []
         opts = {'noclean': False, 'nochecks': True, 'verbosity': 1}
         if kwargs['multiprocessing']:
             opts = {'noclean': False, 'nochecks': True, 'verbosity': 0}
-
-        # loop over all the import scripts
-        # and build up a list of management commands to run
-        for f in files:
-            head, tail = os.path.split(f)
-            try:
-                cmd = load_command(f)
-            except:
-                # usually we want to handle a specific exception, but in in this situation
-                # if there is any issue (at all) trying to load the module,
-                # we just want to log it and move on to the next script
+        opts['staging'] = kwargs['staging']
+        opts['incremental'] = kwargs['incremental']
+        opts['force'] = kwargs['force']
+
+        # loop over the index of import scripts
+        # and build up a list of management commands to run.
+        # We only load a module here if we can't work out
+        # its elections and council_id from the source.
+        for importer in importers:
+            f = importer['path']
+            tail = importer['filename']
+            if importer['error']:
                 self.summary.append(('WARNING', "%s could not be loaded!" % tail))
                 continue
 
-            if hasattr(cmd, 'elections'):
-                if self.importer_covers_these_elections(kwargs['elections'], cmd.elections, kwargs['regex']):
-                    # Only run if
+            if importer['dynamic']:
+                try:
+                    cmd = load_command(f)
+                except:
+                    # usually we want to handle a specific exception, but in in this situation
+                    # if there is any issue (at all) trying to load the module,
+                    # we just want to log it and move on to the next script
+                    self.summary.append(('WARNING', "%s could not be loaded!" % tail))
+                    continue
+                importer['elections'] = getattr(cmd, 'elections', None)
+                importer['council_id'] = getattr(cmd, 'council_id', None)
+                importer['run_in_series'] = hasattr(cmd, 'run_in_series')
+
+            if importer['elections'] is not None:
+                if self.importer_covers_these_elections(kwargs['elections'], importer['elections'], kwargs['regex']):
+                    # Only run if there is no data for this council yet,
+                    # we've been asked to overwrite it or the importer
+                    # will check for itself whether anything has changed
                     existing_data = PollingStation.objects.filter(
-                        council_id=cmd.council_id).exists()
-                    if not existing_data or kwargs.get('overwrite'):
+                        council_id=importer['council_id']).exists()
+                    if not existing_data or kwargs.get('overwrite') or kwargs.get('incremental'):
                         self.summary.append(
                             ('INFO', "Ran import script %s" % tail))
-                        if hasattr(cmd, 'run_in_series'):
-                            commands_series.append((f, opts))
-                        else:
-                            commands_parallel.append((f, opts))
+                        jobs.append(ImportJob(
+                            tail,
+                            f,
+                            importer['council_id'],
+                            importer['run_in_series']
+                        ))
             else:
                 self.summary.append(('WARNING', "%s does not contain elections property!" % tail))
 
-        print(
-            "running %i import scripts..." %\
-            (len(commands_series) + len(commands_parallel))
-        )
-        # run all the import scripts
+        print("running %i import scripts..." % (len(jobs)))
+        workers = 1
         if kwargs['multiprocessing']:
-            # do anything we want to run in series first
-            self.run_commands_in_series(commands_series)
-
-            # before kicking off parallel imports, close any open
-            # DB connections. Otherwise, Django will throw
-            # django.db.utils.DatabaseError: lost synchronization with server
-            db.connections.close_all()
-            self.run_commands_in_parallel(commands_parallel)
-        else:
-            self.run_commands_in_series(commands_parallel + commands_series)
+            workers = kwargs.get('jobs') or cpu_count()
+        scheduler = ImportScheduler(
+            jobs, opts, workers=workers, retries=kwargs.get('retries', 2))
+        results = scheduler.run()
 
         self.output_summary()
+        for line in format_timing_table(results):
+            self.stdout.write(line)
+
+        failed = [result.job.name for result in results if not result.success]
+        if failed:
+            raise CommandError(
+                "%i import scripts failed: %s" % (len(failed), ', '.join(failed)))
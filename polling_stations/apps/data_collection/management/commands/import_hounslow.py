@@ -9,6 +9,9 @@ class Command(BaseHalaroseCsvImporter):
     stations_name   = 'parl.2017-06-08/Version 1/polling_station_export-2017-05-09 (2).csv'
     elections       = ['parl.2017-06-08']
     csv_encoding    = 'windows-1252'
+    extra_input_files = [
+        'parl.2017-06-08/Version 1/Hounslow Polling Station grid refs.csv',
+    ]
 
     def get_station_hash(self, record):
         return "-".join([
@@ -19,9 +22,7 @@ class Command(BaseHalaroseCsvImporter):
     # better grid references for the polling stations
     def post_import(self):
         filepath = os.path.join(
-            self.base_folder_path,
-            'parl.2017-06-08/Version 1/Hounslow Polling Station grid refs.csv'
-        )
+            self.base_folder_path, self.extra_input_files[0])
         gridrefs = self.get_data('csv', filepath)
 
         print("Updating grid refs...")
@@ -9,14 +9,15 @@ class Command(BaseHalaroseCsvImporter):
     stations_name   = 'parl.2017-06-08/Version 1/polling_station_export-2017-05-08.csv'
     elections       = ['parl.2017-06-08']
     csv_encoding    = 'latin-1'
+    extra_input_files = [
+        'parl.2017-06-08/Version 1/Sutton polling station addresses.csv',
+    ]
 
     # Hounslow have supplied an additional file with
     # better grid references for the polling stations
     def post_import(self):
         filepath = os.path.join(
-            self.base_folder_path,
-            'parl.2017-06-08/Version 1/Sutton polling station addresses.csv'
-        )
+            self.base_folder_path, self.extra_input_files[0])
         gridrefs = self.get_data('csv', filepath)
 
         print("Updating grid refs...")
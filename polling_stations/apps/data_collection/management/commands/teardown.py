@@ -3,12 +3,16 @@ from django.core.management.base import BaseCommand
 from django.db import connection
 from councils.models import Council
 from data_collection.models import DataQuality
+from data_finder.helpers import delete_postcode_answers, invalidate_routing_cache
+from data_finder.models import PostcodeAnswer
+from pollingstations.helpers import invalidate_district_index
 from pollingstations.models import PollingStation, PollingDistrict, ResidentialAddress
 
 """
-Clear PollingDistrict, PollingStation and ResidentialAddress models
-Clear report, num_addresses, num_districts and num_stations
-fields in DataQuality model
+Clear PollingDistrict, PollingStation, ResidentialAddress
+and PostcodeAnswer models
+Clear report, import_fingerprint and the num_* data quality
+counts in DataQuality model
 """
 class Command(BaseCommand):
 
@@ -55,6 +59,7 @@ class Command(BaseCommand):
             # check this council exists
             Council.objects.get(pk=council_id)
 
+            delete_postcode_answers(council_id)
             PollingStation.objects.filter(council=council_id).delete()
             PollingDistrict.objects.filter(council=council_id).delete()
             ResidentialAddress.objects.filter(council=council_id).delete()
@@ -64,15 +69,35 @@ class Command(BaseCommand):
             dq.num_addresses=0
             dq.num_districts=0
             dq.num_stations=0
+            dq.num_stations_without_point=0
+            dq.num_stations_invalid_district_refs=0
+            dq.num_districts_invalid_station_refs=0
+            dq.num_districts_without_stations=0
+            dq.num_districts_multiple_stations=0
+            dq.num_addresses_without_station=0
+            dq.counts_updated=None
+            dq.import_fingerprint=''
             dq.save()
+            invalidate_district_index()
+            invalidate_routing_cache()
             print('..done')
 
         elif kwargs.get('all'):
             print('Deleting ALL data...')
+            PostcodeAnswer.objects.all().delete()
             PollingDistrict.objects.all().delete()
             PollingStation.objects.all().delete()
             ResidentialAddress.objects.all().delete()
             # use raw SQL so we don't have to loop over every single record one-by-one
             cursor = connection.cursor()
-            cursor.execute("UPDATE data_collection_dataquality SET report='', num_addresses=0, num_districts=0, num_stations=0")
+            cursor.execute("""
+                UPDATE data_collection_dataquality SET
+                    report='', num_addresses=0, num_districts=0, num_stations=0,
+                    num_stations_without_point=0, num_stations_invalid_district_refs=0,
+                    num_districts_invalid_station_refs=0, num_districts_without_stations=0,
+                    num_districts_multiple_stations=0, num_addresses_without_station=0,
+                    counts_updated=NULL, import_fingerprint=''
+            """)
+            invalidate_district_index()
+            invalidate_routing_cache()
             print('..done')
@@ -41,8 +41,8 @@ class Command(BaseCsvStationsKmlDistrictsImporter):
         print('District: ', record)
         sys.exit(1)
 
-        geojson = self.strip_z_values(record.geom.geojson)
-        poly = self.clean_poly(GEOSGeometry(geojson, srid=self.get_srid('districts')))
+        # KmlReader has already dropped any z values
+        poly = self.clean_poly(GEOSGeometry(record.geom.wkb, srid=self.get_srid('districts')))
         return {
             'internal_council_id': record['Name'].value,
             'name'               : record['Name'].value,
@@ -0,0 +1,68 @@
+import time
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from data_collection.data_quality_report import (
+    DataQualityReportBuilder,
+    query_data_quality_counts
+)
+from data_collection.models import DataQuality
+
+"""
+Recompute the data quality counts and report for every council
+(or just one) and store them in the DataQuality model
+
+All of the counts come from two queries over the whole
+pollingstation, pollingdistrict and residentialaddress tables
+rather than running a DataQualityReportBuilder per council.
+"""
+class Command(BaseCommand):
+
+    """
+    Turn off auto system check for all apps
+    We will maunally run system checks only for the
+    'data_collection' and 'pollingstations' apps
+    """
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-c',
+            '--council',
+            help='<Optional> Only update this council (in the format X01000001)',
+            required=False,
+            default=None
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Manually run system checks for the
+        'data_collection' and 'pollingstations' apps
+        Management commands can ignore checks that only apply to
+        the apps supporting the website part of the project
+        """
+        self.check([
+            apps.get_app_config('data_collection'),
+            apps.get_app_config('pollingstations')
+        ])
+
+        start = time.time()
+        all_counts = query_data_quality_counts(kwargs.get('council'))
+        query_time = time.time() - start
+
+        with transaction.atomic():
+            for council_id, counts in all_counts.items():
+                fields = DataQuality.counts_to_fields(counts)
+                if counts.stations.imported or counts.districts.imported or\
+                        counts.addresses.imported:
+                    report = DataQualityReportBuilder(council_id, counts)
+                    report.build_report()
+                    fields['report'] = report.generate_string_report()
+                else:
+                    fields['report'] = ''
+                DataQuality.objects.update_or_create(
+                    council_id=council_id, defaults=fields)
+
+        self.stdout.write(
+            "Updated data quality for %i councils (queries took %.2fs, total %.2fs)" %
+            (len(all_counts), query_time, time.time() - start))
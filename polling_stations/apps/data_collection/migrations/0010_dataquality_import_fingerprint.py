@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0009_auto_20160616_0921'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataquality',
+            name='import_fingerprint',
+            field=models.CharField(blank=True, max_length=64, help_text='SHA-256 of the input files and importer code last imported'),
+        ),
+    ]
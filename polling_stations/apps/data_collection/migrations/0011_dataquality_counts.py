@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_collection', '0010_dataquality_import_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataquality',
+            name='num_stations_without_point',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataquality',
+            name='num_stations_invalid_district_refs',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataquality',
+            name='num_districts_invalid_station_refs',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataquality',
+            name='num_districts_without_stations',
+            field=models.IntegerField(default=0, help_text='Districts containing 0 polling stations'),
+        ),
+        migrations.AddField(
+            model_name='dataquality',
+            name='num_districts_multiple_stations',
+            field=models.IntegerField(default=0, help_text='Districts containing >1 polling stations'),
+        ),
+        migrations.AddField(
+            model_name='dataquality',
+            name='num_addresses_without_station',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataquality',
+            name='counts_updated',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
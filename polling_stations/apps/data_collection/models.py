@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 from councils.models import Council
 
@@ -23,6 +24,17 @@ class DataQuality(models.Model):
     num_stations = models.IntegerField(default=0)
     num_districts = models.IntegerField(default=0)
     num_addresses = models.IntegerField(default=0)
+    num_stations_without_point = models.IntegerField(default=0)
+    num_stations_invalid_district_refs = models.IntegerField(default=0)
+    num_districts_invalid_station_refs = models.IntegerField(default=0)
+    num_districts_without_stations = models.IntegerField(default=0,
+        help_text="Districts containing 0 polling stations")
+    num_districts_multiple_stations = models.IntegerField(default=0,
+        help_text="Districts containing >1 polling stations")
+    num_addresses_without_station = models.IntegerField(default=0)
+    counts_updated = models.DateTimeField(blank=True, null=True)
+    import_fingerprint = models.CharField(blank=True, max_length=64,
+        help_text="SHA-256 of the input files and importer code last imported")
 
     class Meta:
         verbose_name_plural = "Data Quality"
@@ -31,6 +43,25 @@ class DataQuality(models.Model):
     def __unicode__(self):
         return "Data quality for %s" % self.council
 
+    @staticmethod
+    def counts_to_fields(counts):
+        """
+        Map a data_quality_report.DataQualityCounts
+        onto the numeric fields of this model
+        """
+        return {
+            'num_stations': counts.stations.imported,
+            'num_districts': counts.districts.imported,
+            'num_addresses': counts.addresses.imported,
+            'num_stations_without_point': counts.stations.without_point,
+            'num_stations_invalid_district_refs': counts.stations.invalid_district_id_refs,
+            'num_districts_invalid_station_refs': counts.districts.invalid_station_id_refs,
+            'num_districts_without_stations': counts.districts.containing_zero_stations,
+            'num_districts_multiple_stations': counts.districts.containing_more_stations,
+            'num_addresses_without_station': counts.addresses.without_station_id,
+            'counts_updated': timezone.now(),
+        }
+
 
 from django.db.models.signals import post_save
 
@@ -1,65 +1,192 @@
 import glob
+import json
 import os
-import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from boto.pyami.config import Config
 from boto.s3.connection import S3Connection
 from django.conf import settings
 
 
+MANIFEST_NAME = '.manifest-%s.json'
+
+
+def connect_to_bucket():
+    config = Config()
+    access_key = config.get_value(settings.BOTO_SECTION, 'aws_access_key_id')
+    secret_key = config.get_value(settings.BOTO_SECTION, 'aws_secret_access_key')
+
+    # connect to S3 + get ref to our data bucket
+    conn = S3Connection(access_key, secret_key)
+    return conn.get_bucket(settings.S3_DATA_BUCKET, validate=False)
+
+
 class S3Wrapper:
 
-    def __init__(self):
-        config = Config()
-        access_key = config.get_value(settings.BOTO_SECTION, 'aws_access_key_id')
-        secret_key = config.get_value(settings.BOTO_SECTION, 'aws_secret_access_key')
+    """
+    Mirror part of our S3 bucket in a local folder
+
+    For each prefix, we keep a manifest of the ETag and size of each
+    file we've downloaded, so we only fetch keys which have changed
+    since the last time. Changed keys are downloaded in parallel.
+    Anything local under the prefix which isn't in the bucket is deleted.
+    Importers running in parallel fetch different prefixes,
+    so they never write to the same manifest.
+
+    boto connections aren't thread-safe, so each download thread
+    gets its own bucket from bucket_factory. Pass a different
+    bucket_factory to fetch from somewhere other than S3
+    (e.g: a fake bucket in tests).
+    """
 
-        # connect to S3 + get ref to our data bucket
-        conn = S3Connection(access_key, secret_key)
-        self.bucket = conn.get_bucket(settings.S3_DATA_BUCKET)
+    def __init__(self, bucket_factory=connect_to_bucket, base_path=None, workers=None):
+        self.bucket_factory = bucket_factory
+        self.bucket = bucket_factory()
+        self.local = threading.local()
 
         # this is where our local data will live
-        self.base_path = os.path.abspath('./s3cache/')
+        if base_path is None:
+            base_path = './s3cache/'
+        self.base_path = os.path.abspath(base_path)
+        if workers is None:
+            workers = getattr(settings, 'S3_FETCH_WORKERS', 8)
+        self.workers = workers
 
     @property
     def data_path(self):
         return os.path.abspath(self.base_path)
 
-    def fetch_data(self, prefix):
-        local_pattern = os.path.abspath("%s/%s*" % (self.base_path, prefix))
-        local_paths = glob.glob(local_pattern)
-
-        if len(local_paths) == 1:
-            # if local dir already exists, delete it to
-            # remove any existing (potentially stale) data
-            shutil.rmtree(local_paths[0])
-        elif len(local_paths) > 1:
-            raise ValueError(
-                "Pattern '%s' matched more than one directory" % local_pattern)
-        else:
-            # if local dir does not exist, no worries. We will create
-            # any necessary directories when we pull data down from s3
-            pass
+    def get_manifest_path(self, prefix):
+        return os.path.join(
+            self.base_path, MANIFEST_NAME % prefix.replace('/', '_'))
+
+    def load_manifest(self, prefix):
+        try:
+            with open(self.get_manifest_path(prefix), 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def save_manifest(self, prefix, manifest):
+        os.makedirs(self.base_path, exist_ok=True)
+        self.write_atomic(
+            self.get_manifest_path(prefix),
+            lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+
+    def write_atomic(self, path, write):
+        # write to a temp file in the same directory and rename it,
+        # so a failed download never leaves a half-written file behind
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except:
+            os.remove(tmp_path)
+            raise
+
+    def get_thread_bucket(self):
+        if not hasattr(self.local, 'bucket'):
+            self.local.bucket = self.bucket_factory()
+        return self.local.bucket
 
-        # fetch data for this prefix
-        keys = self.bucket.list(prefix=prefix)
-        count = 0
-        for key in keys:
+    def download(self, name, etag):
+        local_file = os.path.join(self.base_path, name)
+        os.makedirs(os.path.dirname(local_file), exist_ok=True)
+        key = self.get_thread_bucket().new_key(name)
+        self.write_atomic(local_file, key.get_contents_to_file)
+        # if the key changed between listing it and downloading it,
+        # record the version we actually got
+        return key.etag or etag
 
+    def get_remote_keys(self, prefix):
+        remote = {}
+        for key in self.bucket.list(prefix=prefix):
             # ignore directories
             if key.key[-8:] == '$folder$' or key.key[-1] == '/':
                 continue
+            remote[key.key] = {'etag': key.etag, 'size': key.size}
+        return remote
 
-            local_file = os.path.join(self.base_path, key.key)
-            os.makedirs(os.path.dirname(local_file), exist_ok=True)
-            key.get_contents_to_filename(local_file)
-            # We have to manually build a count of the number of items:
-            # A BucketListResultSet does not have a len() because it is
-            # a generator expression, not a list
-            count = count + 1
+    def is_current(self, name, remote, manifest):
+        local_file = os.path.join(self.base_path, name)
+        return (manifest.get(name) == remote and
+                os.path.isfile(local_file) and
+                os.path.getsize(local_file) == remote['size'])
 
-        if count == 0:
+    def forget_stale_files(self, remote, manifest):
+        # drop anything we fetched previously which
+        # has since been removed from the bucket
+        for name in list(manifest.keys()):
+            if name not in remote:
+                del manifest[name]
+
+    def get_local_paths(self, prefix):
+        return glob.glob(os.path.join(self.base_path, "%s*" % prefix))
+
+    def remove_stale_files(self, prefix, remote):
+        # delete every local file under this prefix which isn't in the
+        # bucket: files removed from S3, anything in the cache from before
+        # we kept a manifest and whole folders which have been renamed
+        for local_path in self.get_local_paths(prefix):
+            if os.path.isdir(local_path):
+                for dirpath, dirnames, filenames in os.walk(local_path, topdown=False):
+                    for filename in filenames:
+                        local_file = os.path.join(dirpath, filename)
+                        if self.get_key_name(local_file) not in remote:
+                            os.remove(local_file)
+                    if not os.listdir(dirpath):
+                        os.rmdir(dirpath)
+            elif self.get_key_name(local_path) not in remote:
+                os.remove(local_path)
+
+    def get_key_name(self, local_file):
+        return os.path.relpath(local_file, self.base_path).replace(os.sep, '/')
+
+    def fetch_data(self, prefix):
+        remote = self.get_remote_keys(prefix)
+        if not remote:
             raise ValueError("Couldn't find any data to import")
 
+        manifest = self.load_manifest(prefix)
+        self.forget_stale_files(remote, manifest)
+
+        changed = [
+            name for name in sorted(remote)
+            if not self.is_current(name, remote[name], manifest)
+        ]
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(self.download, name, remote[name]['etag']): name
+                    for name in changed
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    manifest[name] = {
+                        'etag': future.result(),
+                        'size': remote[name]['size'],
+                    }
+        finally:
+            # remember whatever we did manage to download
+            self.save_manifest(prefix, manifest)
+
+        self.remove_stale_files(prefix, remote)
+
+        # importers glob for prefix* and use the first match,
+        # so make sure that is unambiguous
+        local_paths = [
+            path for path in self.get_local_paths(prefix) if os.path.isdir(path)]
+        if len(local_paths) > 1:
+            raise ValueError(
+                "Pattern '%s' matched more than one directory" %
+                os.path.join(self.base_path, "%s*" % prefix))
+
+        return changed
+
     def fetch_data_by_council(self, council_id):
         prefix = "%s-" % (council_id)
-        self.fetch_data(prefix)
+        return self.fetch_data(prefix)
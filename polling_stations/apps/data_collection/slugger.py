@@ -2,7 +2,32 @@ import re
 import unicodedata
 
 from django.utils.encoding import force_text
-from django.utils.safestring import mark_safe
+from django.utils.safestring import SafeText
+
+
+NOT_WORD_RE = re.compile('[^\w\s-]')
+SEPARATORS_RE = re.compile('[-\s]+')
+
+# Once we've converted to ASCII, replacing the characters NOT_WORD_RE
+# matches is just a character -> character mapping. Build the mapping
+# from the regex itself so the two can't disagree.
+NOT_WORD_TABLE = {
+    i: '-' for i in range(128) if NOT_WORD_RE.match(chr(i))
+}
+
+
+def _slugify(value):
+    if type(value) is not str:
+        value = force_text(value)
+    try:
+        # NFKD normalisation doesn't change ASCII text,
+        # so we only need to do it if there are other characters
+        value.encode('ascii')
+    except UnicodeEncodeError:
+        value = unicodedata.normalize(
+            'NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    value = value.translate(NOT_WORD_TABLE).strip().lower()
+    return SafeText(SEPARATORS_RE.sub('-', value))
 
 
 class Slugger:
@@ -28,8 +53,26 @@ class Slugger:
         This means we can avoid appending an arbitrary number and minimise
         disruption to the public URL schema if a council provides updated data
         """
-        value = force_text(value)
-        value = unicodedata.normalize(
-            'NFKD', value).encode('ascii', 'ignore').decode('ascii')
-        value = re.sub('[^\w\s-]', '-', value).strip().lower()
-        return mark_safe(re.sub('[-\s]+', '-', value))
+        return _slugify(value)
+
+    @staticmethod
+    def slugify_many(values):
+        """
+        Slugify a list of values, only doing the work
+        once for each distinct value in the list
+        """
+        slugs = {}
+        out = []
+        for value in values:
+            # key on the type too, so 1, 1.0 and True don't share a slug
+            key = (type(value), value)
+            try:
+                slug = slugs.get(key)
+            except TypeError:
+                out.append(_slugify(value))
+                continue
+            if slug is None:
+                slug = _slugify(value)
+                slugs[key] = slug
+            out.append(slug)
+        return out
@@ -0,0 +1,169 @@
+"""
+Helpers for importing a council's data into a staging schema
+and swapping it into the live tables in one short transaction
+"""
+
+import logging
+import re
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+from data_finder.helpers import delete_postcode_answers
+from pollingstations.models import (
+    PollingStation,
+    PollingDistrict,
+    ResidentialAddress
+)
+
+
+class StagingError(Exception):
+    pass
+
+
+# schema we are currently staging an import in (if any)
+_active_search_path = None
+
+# schema the live tables are in while we are staging an import
+_live_schema = None
+
+def get_live_table(model):
+    """
+    Name of model's live table. While we are staging an import,
+    model._meta.db_table resolves to the staging table, which only
+    holds the council we are importing. Queries that need to see
+    other councils' records (e.g: to find overlapping districts)
+    should read them from here instead
+    """
+    if _live_schema:
+        return '%s.%s' % (
+            connection.ops.quote_name(_live_schema),
+            connection.ops.quote_name(model._meta.db_table))
+    return model._meta.db_table
+
+def set_search_path(sender, connection, **kwargs):
+    """
+    If we are staging an import, make sure every connection this process
+    opens uses the staging tables. We need this because the address
+    clean-up closes our connection before forking workers, and each
+    worker opens a new connection of its own
+    """
+    if _active_search_path and connection.vendor == 'postgresql':
+        cursor = connection.cursor()
+        cursor.execute("SET search_path TO %s" % (_active_search_path))
+
+connection_created.connect(set_search_path)
+
+
+class StagingSchema:
+    """
+    While a StagingSchema is active, PollingStation, PollingDistrict and
+    ResidentialAddress resolve to empty copies of their tables in
+    a separate schema (everything else still resolves to the live tables)
+    so import_data(), post_import() and the address clean-up can run
+    unmodified without touching live data. The staging tables only hold
+    the council we are importing: anything that needs to see other
+    councils' records has to read them via get_live_table().
+
+    swap() then replaces the council's live data with the contents of the
+    staging tables in a single transaction. If anything goes wrong before
+    that, the staging schema is dropped and the live data is left alone.
+    """
+
+    models = [PollingStation, PollingDistrict, ResidentialAddress]
+
+    def __init__(self, council_id, logger=None):
+        self.council_id = council_id
+        self.logger = logger
+        self.schema = 'staging_%s' % (re.sub('[^a-z0-9_]', '_', council_id.lower()))
+        self.live_search_path = None
+        self.live_schema = None
+
+    def log(self, message):
+        if self.logger:
+            self.logger.log_message(logging.INFO, message)
+
+    def __enter__(self):
+        self.create()
+        self.activate()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.deactivate()
+        self.drop()
+
+    def create(self):
+        cursor = connection.cursor()
+        cursor.execute("SHOW search_path")
+        self.live_search_path = cursor.fetchone()[0]
+
+        # all of our models live in the same schema
+        cursor.execute("""
+            SELECT n.nspname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid=c.relnamespace
+            WHERE c.oid=%s::regclass
+            """, [PollingDistrict._meta.db_table])
+        self.live_schema = cursor.fetchone()[0]
+
+        self.drop()
+        cursor.execute("CREATE SCHEMA %s" % (self.schema))
+        for model in self.models:
+            # INCLUDING ALL copies the indexes and constraints (except FKs)
+            # and the default for the id column, so new records take ids
+            # from the live table's sequence and we can copy them as-is
+            cursor.execute("CREATE TABLE {schema}.{table} (LIKE {table} INCLUDING ALL)"\
+                .format(schema=self.schema, table=model._meta.db_table))
+
+    def drop(self):
+        cursor = connection.cursor()
+        cursor.execute("DROP SCHEMA IF EXISTS %s CASCADE" % (self.schema))
+
+    def activate(self):
+        global _active_search_path, _live_schema
+        _active_search_path = '%s, %s' % (self.schema, self.live_search_path)
+        _live_schema = self.live_schema
+        cursor = connection.cursor()
+        cursor.execute("SET search_path TO %s" % (_active_search_path))
+
+    def deactivate(self):
+        global _active_search_path, _live_schema
+        _active_search_path = None
+        _live_schema = None
+        cursor = connection.cursor()
+        cursor.execute("SET search_path TO %s" % (self.live_search_path))
+
+    def count(self, model):
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM {schema}.{table} WHERE council_id=%s"\
+            .format(schema=self.schema, table=model._meta.db_table),
+            [self.council_id])
+        return cursor.fetchone()[0]
+
+    def validate(self):
+        num_stations = self.count(PollingStation)
+        num_districts = self.count(PollingDistrict)
+        num_addresses = self.count(ResidentialAddress)
+        self.log("Staged %i stations, %i districts and %i addresses" % (
+            num_stations, num_districts, num_addresses))
+
+        if num_stations == 0:
+            raise StagingError(
+                "No stations imported for %s: keeping live data" % (self.council_id))
+        if num_districts == 0 and num_addresses == 0:
+            raise StagingError(
+                "No districts or addresses imported for %s: keeping live data" %\
+                (self.council_id))
+
+    def swap(self):
+        self.validate()
+        self.deactivate()
+
+        cursor = connection.cursor()
+        with transaction.atomic():
+            delete_postcode_answers(self.council_id)
+            for model in self.models:
+                cursor.execute("DELETE FROM {table} WHERE council_id=%s"\
+                    .format(table=model._meta.db_table), [self.council_id])
+                cursor.execute("INSERT INTO {table} SELECT * FROM {schema}.{table}"\
+                    .format(schema=self.schema, table=model._meta.db_table))
+
+        self.log("Swapped staged data for %s into live tables" % (self.council_id))
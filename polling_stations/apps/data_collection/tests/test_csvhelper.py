@@ -22,3 +22,23 @@ class CsvHelperTest(TestCase):
         self.assertEqual('', data[1].baz)
 
         self.assertNotIn(2, data)
+
+    def test_parse_csv_stream(self):
+        helper = CsvHelper(
+            os.path.join(os.path.dirname(__file__), 'fixtures/csv_helper/test.csv'),
+            stream=True
+        )
+        data = helper.get_features()
+
+        self.assertNotIsInstance(data, list)
+
+        # we should be able to iterate over the file more than once
+        # and get the same rows back each time
+        first_pass = list(data)
+        second_pass = list(data)
+        self.assertEqual(first_pass, second_pass)
+        self.assertEqual(2, len(first_pass))
+        self.assertEqual(list(CsvHelper(helper.filepath).get_features()), first_pass)
+
+        self.assertEqual('1', first_pass[0].foo)
+        self.assertEqual('peas', first_pass[1].b_a_r)
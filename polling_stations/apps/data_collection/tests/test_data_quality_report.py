@@ -0,0 +1,145 @@
+import io
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from councils.models import Council
+from data_collection.data_quality_report import (
+    AddressCounts,
+    DataQualityReportBuilder,
+    DistrictCounts,
+    get_data_quality_counts,
+    query_data_quality_counts,
+    StationCounts
+)
+from data_collection.models import DataQuality
+from pollingstations.models import (
+    PollingDistrict, PollingStation, ResidentialAddress)
+
+
+def box(xmin, ymin, xmax, ymax):
+    return MultiPolygon(Polygon.from_bbox((xmin, ymin, xmax, ymax)), srid=4326)
+
+
+class DataQualityReportTest(TestCase):
+
+    def setUp(self):
+        council = Council.objects.create(pk='X01000000')
+
+        # baz overlaps foo
+        for name, area, station_id in [
+            ('foo', box(0, 0, 10, 10), 'S1'),
+            ('bar', box(20, 0, 30, 10), 'missing'),
+            ('baz', box(5, 0, 15, 10), ''),
+        ]:
+            PollingDistrict.objects.create(
+                council=council, internal_council_id=name,
+                area=area, polling_station_id=station_id)
+
+        for station_id, location, district_id, address in [
+            ('S1', Point(2, 2, srid=4326), 'foo', '1 Foo Street'),
+            ('S2', Point(7, 7, srid=4326), 'missing', '2 Foo Street'),
+            ('S3', Point(50, 50, srid=4326), '', ''),
+            ('S4', None, '', '4 Foo Street'),
+        ]:
+            PollingStation.objects.create(
+                council=council, internal_council_id=station_id,
+                location=location, polling_district_id=district_id,
+                address=address)
+
+        for slug, station_id in [('a1', 'S1'), ('a2', 'S9'), ('a3', '')]:
+            ResidentialAddress.objects.create(
+                council=council, slug=slug, postcode='AA11AA',
+                polling_station_id=station_id)
+
+    def test_counts(self):
+        with self.assertNumQueries(2):
+            counts = get_data_quality_counts('X01000000')
+
+        self.assertEqual(StationCounts(
+            imported=4,
+            with_district_id=2,
+            without_district_id=2,
+            valid_district_id_refs=1,
+            invalid_district_id_refs=1,
+            with_point=3,
+            without_point=1,
+            with_address=3,
+            without_address=1,
+            in_zero_districts=1,
+            in_one_district=1,
+            in_more_districts=1,
+        ), counts.stations)
+
+        self.assertEqual(DistrictCounts(
+            imported=3,
+            with_station_id=2,
+            without_station_id=1,
+            valid_station_id_refs=1,
+            invalid_station_id_refs=1,
+            containing_zero_stations=1,
+            containing_one_station=1,
+            containing_more_stations=1,
+        ), counts.districts)
+
+        self.assertEqual(AddressCounts(
+            imported=3,
+            with_station_id=2,
+            without_station_id=1,
+            valid_station_id_refs=1,
+            invalid_station_id_refs=1,
+        ), counts.addresses)
+
+    def test_report_reuses_counts(self):
+        counts = get_data_quality_counts('X01000000')
+        report = DataQualityReportBuilder('X01000000', counts)
+        with self.assertNumQueries(0):
+            report.build_report()
+        text = report.generate_string_report()
+        self.assertIn("STATIONS IMPORTED                : 4", text)
+        self.assertIn("Districts containing >1 stations : 1", text)
+        self.assertIn("ADDRESSES IMPORTED               : 3", text)
+
+    def test_all_councils(self):
+        Council.objects.create(pk='X01000001', name='Empty')
+        with self.assertNumQueries(2):
+            counts = query_data_quality_counts()
+
+        self.assertEqual(
+            get_data_quality_counts('X01000000'), counts['X01000000'])
+        self.assertEqual(0, counts['X01000001'].stations.imported)
+        self.assertEqual(0, counts['X01000001'].districts.containing_zero_stations)
+
+    def test_update_data_quality(self):
+        Council.objects.create(pk='X01000001', name='Empty')
+        call_command('update_data_quality', stdout=io.StringIO())
+
+        record = DataQuality.objects.get(pk='X01000000')
+        self.assertEqual(4, record.num_stations)
+        self.assertEqual(1, record.num_stations_without_point)
+        self.assertEqual(1, record.num_stations_invalid_district_refs)
+        self.assertEqual(1, record.num_districts_invalid_station_refs)
+        self.assertEqual(1, record.num_districts_without_stations)
+        self.assertEqual(1, record.num_districts_multiple_stations)
+        self.assertEqual(1, record.num_addresses_without_station)
+        self.assertIn("DATA QUALITY REPORT", record.report)
+        self.assertIsNotNone(record.counts_updated)
+
+        self.assertEqual('', DataQuality.objects.get(pk='X01000001').report)
+
+    def test_league_table_sort(self):
+        Council.objects.create(pk='X01000001', name='Empty')
+        call_command('update_data_quality', stdout=io.StringIO())
+
+        response = self.client.get(reverse('league_table'), {'sort': '-stations'})
+        self.assertEqual(
+            ['X01000000', 'X01000001'],
+            [record.council_id for record in response.context['object_list']])
+        response = self.client.get(reverse('league_table'), {'sort': 'stations'})
+        self.assertEqual(
+            ['X01000001', 'X01000000'],
+            [record.council_id for record in response.context['object_list']])
+
+        # unknown sort keys are ignored
+        response = self.client.get(reverse('league_table'), {'sort': 'report'})
+        self.assertIsNone(response.context['sort'])
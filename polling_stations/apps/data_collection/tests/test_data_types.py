@@ -0,0 +1,120 @@
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.test import TestCase
+from councils.models import Council
+from data_collection.data_types import AddressSet, DistrictSet, StationSet
+from pollingstations.models import (
+    PollingDistrict,
+    PollingStation,
+    ResidentialAddress
+)
+
+
+class MockLogger:
+    def log_message(self, level, message, variable=None, pretty=False):
+        pass
+
+
+class CopySaveTest(TestCase):
+
+    """
+    Saving with COPY should give us exactly the same records
+    as saving with bulk_create()
+    """
+
+    def setUp(self):
+        self.council = Council.objects.create(council_id='X01000001')
+
+    def save_both_ways(self, data, model, fields, *args):
+        results = []
+        elements = set(data.elements)
+        for use_copy in [True, False]:
+            data.elements = set(elements)
+            data.use_copy = use_copy
+            data.save(*args)
+            results.append(sorted(model.objects.all().values_list(*fields)))
+            model.objects.all().delete()
+        return results
+
+    def test_stations(self):
+        stations = StationSet()
+        stations.add({
+            'council': self.council,
+            'internal_council_id': '1',
+            'postcode': 'AA1 1AA',
+            'address': "St Foo's Church Hall\tBar Town\\Baz",
+            'location': Point(-2.15, 52.85, srid=4326),
+        })
+        stations.add({
+            'council': self.council,
+            'internal_council_id': '2',
+            'address': 'Foo Street Primary School\nBar Town',
+            'location': Point(400000, 300000, srid=27700),
+        })
+        stations.add({
+            'council': self.council,
+            'internal_council_id': '3',
+            'postcode': None,
+            'address': None,
+        })
+
+        copy_result, orm_result = self.save_both_ways(
+            stations, PollingStation,
+            ['council_id', 'internal_council_id', 'postcode', 'address',
+             'polling_district_id', 'location'])
+
+        self.assertEqual(3, len(copy_result))
+        for copy_row, orm_row in zip(copy_result, orm_result):
+            self.assertEqual(copy_row[:5], orm_row[:5])
+            if orm_row[5] is None:
+                self.assertIsNone(copy_row[5])
+            else:
+                self.assertEqual(4326, copy_row[5].srid)
+                self.assertTrue(copy_row[5].equals_exact(orm_row[5], 0.000001))
+
+    def test_districts(self):
+        districts = DistrictSet()
+        districts.add({
+            'council': self.council,
+            'internal_council_id': 'AA',
+            'name': 'Foo',
+            'area': MultiPolygon(Polygon((
+                (400000, 300000), (400000, 300010), (400010, 300010),
+                (400010, 300000), (400000, 300000))), srid=27700),
+            'polling_station_id': '1',
+        })
+
+        copy_result, orm_result = self.save_both_ways(
+            districts, PollingDistrict,
+            ['council_id', 'internal_council_id', 'name', 'extra_id',
+             'polling_station_id', 'area'])
+
+        self.assertEqual(1, len(copy_result))
+        self.assertEqual(copy_result[0][:5], orm_result[0][:5])
+        self.assertEqual(4326, copy_result[0][5].srid)
+        self.assertTrue(
+            copy_result[0][5].equals_exact(orm_result[0][5], 0.000001))
+
+    def test_addresses(self):
+        addresses = AddressSet(MockLogger())
+        addresses.add({
+            'address': '1 Foo Street, Bar Town',
+            'postcode': 'AA11AA',
+            'council': self.council,
+            'polling_station_id': '1',
+            'slug': '1-foo-street-bar-town-aa11aa',
+        })
+        addresses.add({
+            'address': '2 Foo Street, Bar Town',
+            'postcode': 'AA11AA',
+            'council': self.council,
+            'polling_station_id': '',
+            'slug': '2-foo-street-bar-town-aa11aa',
+        })
+
+        copy_result, orm_result = self.save_both_ways(
+            addresses, ResidentialAddress,
+            ['address', 'postcode', 'council_id', 'polling_station_id', 'slug'],
+            1000)
+
+        self.assertEqual(2, len(copy_result))
+        self.assertEqual(orm_result, copy_result)
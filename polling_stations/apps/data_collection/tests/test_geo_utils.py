@@ -0,0 +1,57 @@
+import io
+import json
+import shapefile
+from django.contrib.gis.geos import GEOSGeometry, MultiPolygon
+from django.test import TestCase
+from data_collection.geo_utils import geojson_to_geos, shape_to_ewkb
+
+
+def square(x, y, size, clockwise):
+    ring = [(x, y), (x, y + size), (x + size, y + size), (x + size, y), (x, y)]
+    return ring if clockwise else list(reversed(ring))
+
+
+class GeoUtilsTest(TestCase):
+
+    def get_shapes(self):
+        writer = shapefile.Writer(shapefile.POLYGON)
+        writer.field('name', 'C', '40')
+        # one ring
+        writer.poly(parts=[square(0, 0, 10, True)])
+        writer.record('foo')
+        # two outer rings, each with a hole
+        writer.poly(parts=[
+            square(0, 0, 10, True),
+            square(2, 2, 2, False),
+            square(20, 20, 5, True),
+            square(21, 21, 1, False),
+        ])
+        writer.record('bar')
+
+        shp, shx, dbf = io.BytesIO(), io.BytesIO(), io.BytesIO()
+        writer.save(shp=shp, shx=shx, dbf=dbf)
+        return shapefile.Reader(shp=shp, shx=shx, dbf=dbf).shapes()
+
+    def test_shape_to_ewkb(self):
+        for shape in self.get_shapes():
+            expected = GEOSGeometry(
+                json.dumps(shape.__geo_interface__), srid=27700)
+            if not isinstance(expected, MultiPolygon):
+                expected = MultiPolygon(expected, srid=27700)
+
+            geom = GEOSGeometry(shape_to_ewkb(shape, 27700))
+            self.assertEqual(27700, geom.srid)
+            self.assertTrue(geom.equals_exact(expected))
+
+    def test_geojson_to_geos(self):
+        geometry = {
+            'type': 'MultiPolygon',
+            'coordinates': [
+                [square(0, 0, 10, True), square(2, 2, 2, False)],
+                [square(20, 20, 5, True)],
+            ]
+        }
+        expected = GEOSGeometry(json.dumps(geometry), srid=4326)
+        geom = geojson_to_geos(geometry, 4326)
+        self.assertEqual(4326, geom.srid)
+        self.assertTrue(geom.equals_exact(expected))
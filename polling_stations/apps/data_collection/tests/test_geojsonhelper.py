@@ -0,0 +1,57 @@
+import io
+import json
+import os
+from django.test import TestCase
+from data_collection.filehelpers import GeoJsonHelper, JsonObjectReader
+
+
+class GeoJsonHelperTest(TestCase):
+
+    filepath = os.path.join(
+        os.path.dirname(__file__), 'fixtures/json_importer/test.geojson')
+
+    def test_stream(self):
+        data = GeoJsonHelper(self.filepath, stream=True).get_features()
+        self.assertNotIsInstance(data, list)
+
+        expected = GeoJsonHelper(self.filepath).get_features()
+        self.assertEqual(expected, list(data))
+        # we can iterate over the file more than once
+        self.assertEqual(expected, list(data))
+
+    def test_small_chunks(self):
+        # make sure we cope with values split across reads
+        with open(self.filepath, 'r') as f:
+            expected = json.load(f)['features']
+        for chunk_size in (1, 2, 7, 100):
+            with open(self.filepath, 'r') as f:
+                reader = JsonObjectReader(f, chunk_size=chunk_size)
+                self.assertEqual(expected, list(reader.iter_array('features')))
+
+        # numbers split across reads
+        for text, expected, chunk_sizes in [
+            ('{"a":1.25,"features":[1]}', [1], (1, 2, 7)),
+            ('{"features":[1.5,-2e3,3]}', [1.5, -2e3, 3], (2, 8, 11)),
+        ]:
+            for chunk_size in chunk_sizes:
+                reader = JsonObjectReader(io.StringIO(text), chunk_size=chunk_size)
+                self.assertEqual(expected, list(reader.iter_array('features')))
+
+    def test_skip_other_members(self):
+        text = '{"crs": {"a": [1, 2, {"b": "]}"}]}, "n": 12345, "features": [1, {"x": 2}] , "type": "x"}'
+        reader = JsonObjectReader(io.StringIO(text), chunk_size=3)
+        self.assertEqual([1, {'x': 2}], list(reader.iter_array('features')))
+
+    def test_empty_array(self):
+        reader = JsonObjectReader(io.StringIO('{"features": [ ]}'))
+        self.assertEqual([], list(reader.iter_array('features')))
+
+    def test_missing_key(self):
+        reader = JsonObjectReader(io.StringIO('{"type": "FeatureCollection"}'))
+        with self.assertRaises(KeyError):
+            list(reader.iter_array('features'))
+
+    def test_invalid(self):
+        reader = JsonObjectReader(io.StringIO('{"features": [{"a": 1}'))
+        with self.assertRaises(ValueError):
+            list(reader.iter_array('features'))
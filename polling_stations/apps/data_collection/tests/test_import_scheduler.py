@@ -0,0 +1,70 @@
+import mock
+from django.db import OperationalError
+from django.test import TestCase
+from data_collection.import_scheduler import (
+    format_timing_table,
+    ImportJob,
+    ImportScheduler,
+    run_job
+)
+
+
+class MockCommand:
+
+    def __init__(self, errors):
+        self.errors = errors
+
+    def handle(self, **opts):
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+def mock_load_command(commands):
+    def load_command(path):
+        return commands[path]
+    return load_command
+
+
+class ImportSchedulerTest(TestCase):
+
+    def test_retry_transient_error(self):
+        job = ImportJob('import_foo.py', 'foo', 'X01000001', False)
+        commands = {'foo': MockCommand([OperationalError('server closed the connection')])}
+        with mock.patch('data_collection.import_scheduler.load_command',
+                        mock_load_command(commands)):
+            result = run_job(job, {}, retries=2, retry_delay=0)
+        self.assertTrue(result.success)
+        self.assertEqual(2, result.attempts)
+
+    def test_give_up_after_retries(self):
+        job = ImportJob('import_foo.py', 'foo', 'X01000001', False)
+        commands = {'foo': MockCommand([OperationalError('deadlock')] * 3)}
+        with mock.patch('data_collection.import_scheduler.load_command',
+                        mock_load_command(commands)):
+            result = run_job(job, {}, retries=1, retry_delay=0)
+        self.assertFalse(result.success)
+        self.assertEqual(2, result.attempts)
+
+    def test_failures_are_isolated(self):
+        jobs = [
+            ImportJob('import_foo.py', 'foo', 'X01000001', False),
+            ImportJob('import_bar.py', 'bar', 'X01000002', True),
+            ImportJob('import_baz.py', 'baz', 'X01000003', True),
+        ]
+        commands = {
+            'foo': MockCommand([ValueError('bad data')]),
+            'bar': MockCommand([KeyError('missing column')]),
+            'baz': MockCommand([]),
+        }
+        with mock.patch('data_collection.import_scheduler.load_command',
+                        mock_load_command(commands)):
+            results = ImportScheduler(jobs, {}, workers=1).run()
+
+        # the series lane runs first, and a failure in one
+        # import doesn't stop the others from running
+        self.assertEqual(
+            [('bar', False, 1), ('baz', True, 1), ('foo', False, 1)],
+            [(r.job.path, r.success, r.attempts) for r in results])
+
+        table = format_timing_table(results)
+        self.assertEqual(len(jobs) + 2, len(table))
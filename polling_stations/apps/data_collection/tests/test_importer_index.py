@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import time
+from django.test import TestCase
+from data_collection.importer_index import ImporterIndex
+
+
+BASE_IMPORTERS = """
+class BaseImporter:
+    pass
+
+class BaseSeriesImporter(BaseImporter):
+    run_in_series = True
+"""
+
+IMPORTER = """
+from data_collection.management.commands import {base}
+
+class Command({base}):
+    council_id = '{council_id}'
+    elections = ['local.{council_id}.2017-05-04']
+"""
+
+
+class ImporterIndexTest(TestCase):
+
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.commands_path = os.path.join(self.base_path, 'commands')
+        os.mkdir(self.commands_path)
+        self.write('base_importers.py', BASE_IMPORTERS, path=self.base_path)
+        self.write('import_foo.py', IMPORTER.format(
+            base='BaseImporter', council_id='X01000001'))
+        self.write('import_bar.py', IMPORTER.format(
+            base='BaseSeriesImporter', council_id='X01000002'))
+        self.write('import_baz.py', "class Command(BaseImporter):\n    council_id = get_id()\n")
+        self.write('import_qux.py', "class Command(BaseImporter:\n")
+        self.index_path = os.path.join(self.base_path, 'index.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def write(self, filename, source, path=None):
+        with open(os.path.join(path or self.commands_path, filename), 'w') as f:
+            f.write(source)
+
+    def get_importers(self):
+        index = ImporterIndex(self.commands_path, self.base_path, self.index_path)
+        return {i['filename']: i for i in index.get_importers()}
+
+    def test_index(self):
+        importers = self.get_importers()
+        self.assertEqual(
+            ['import_bar.py', 'import_baz.py', 'import_foo.py', 'import_qux.py'],
+            sorted(importers.keys()))
+
+        self.assertEqual('X01000001', importers['import_foo.py']['council_id'])
+        self.assertEqual(
+            ['local.X01000001.2017-05-04'], importers['import_foo.py']['elections'])
+        self.assertFalse(importers['import_foo.py']['run_in_series'])
+        self.assertTrue(importers['import_bar.py']['run_in_series'])
+
+        # can't be evaluated without importing the module
+        self.assertTrue(importers['import_baz.py']['dynamic'])
+        self.assertIsNone(importers['import_baz.py']['elections'])
+
+        # syntax error
+        self.assertIsNotNone(importers['import_qux.py']['error'])
+
+    def test_index_is_refreshed_when_file_changes(self):
+        self.get_importers()
+        self.assertTrue(os.path.exists(self.index_path))
+
+        self.write('import_foo.py', IMPORTER.format(
+            base='BaseImporter', council_id='X01000003'))
+        # make sure the mtime changes even on a coarse filesystem clock
+        mtime = time.time() + 10
+        os.utime(os.path.join(self.commands_path, 'import_foo.py'), (mtime, mtime))
+        os.remove(os.path.join(self.commands_path, 'import_bar.py'))
+
+        importers = self.get_importers()
+        self.assertEqual('X01000003', importers['import_foo.py']['council_id'])
+        self.assertNotIn('import_bar.py', importers)
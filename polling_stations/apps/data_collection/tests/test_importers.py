@@ -1,9 +1,12 @@
 import os
 
+import mock
 from django.db.utils import IntegrityError
 from django.test import TestCase
 
 from councils.models import Council
+from data_collection.models import DataQuality
+from data_collection.staginghelper import StagingError, StagingSchema
 from data_collection.tests.stubs import (
     stub_addressimport,
     stub_duplicatedistrict,
@@ -168,3 +171,93 @@ class ImporterTest(TestCase):
             '80 Pine Vale Cres, Bournemouth',
         ])
         self.assertEqual(set(addresses), expected)
+
+    def test_incremental_import(self):
+        self.create_dummy_council()
+        opts = dict(self.opts)
+        opts['incremental'] = True
+
+        cmd = stub_addressimport.Command()
+        cmd.handle(**opts)
+        fingerprint = DataQuality.objects.get(
+            council_id='X01000000').import_fingerprint
+        self.assertEqual(64, len(fingerprint))
+        self.assertEqual(3, ResidentialAddress.objects.filter(
+            council_id='X01000000').count())
+
+        # nothing has changed, so the second import doesn't do anything
+        ResidentialAddress.objects.filter(council_id='X01000000').delete()
+        stub_addressimport.Command().handle(**opts)
+        self.assertEqual(0, ResidentialAddress.objects.filter(
+            council_id='X01000000').count())
+
+        # unless we force it
+        opts['force'] = True
+        stub_addressimport.Command().handle(**opts)
+        self.assertEqual(3, ResidentialAddress.objects.filter(
+            council_id='X01000000').count())
+        self.assertEqual(fingerprint, DataQuality.objects.get(
+            council_id='X01000000').import_fingerprint)
+
+    def test_extra_input_files(self):
+        cmd = stub_addressimport.Command()
+        input_files = cmd.get_input_files()
+        fingerprint = cmd.get_fingerprint()
+
+        # files we read in post_import() are part of the fingerprint too
+        cmd.extra_input_files = ['../csv_helper/test.csv']
+        self.assertEqual(len(input_files) + 1, len(cmd.get_input_files()))
+        self.assertNotEqual(fingerprint, cmd.get_fingerprint())
+
+    def test_staged_import(self):
+        self.create_dummy_council()
+        PollingStation.objects.create(
+            council_id='X01000000', internal_council_id='old')
+
+        cmd = stub_jsonimport.Command()
+        opts = dict(self.opts)
+        opts['staging'] = True
+        cmd.handle(**opts)
+
+        # the staged data has replaced the old data
+        self.run_assertions()
+        self.assertFalse(PollingStation.objects.filter(
+            council_id='X01000000', internal_council_id='old').exists())
+
+    def test_staging_validation(self):
+        self.create_dummy_council()
+        PollingStation.objects.create(
+            council_id='X01000000', internal_council_id='old')
+
+        with StagingSchema('X01000000') as staging:
+            # inside the staging schema, we can't see the live data
+            self.assertFalse(PollingStation.objects.all().exists())
+            # we haven't imported anything, so don't swap it in
+            with self.assertRaises(StagingError):
+                staging.swap()
+
+        # live data is still there
+        self.assertTrue(PollingStation.objects.filter(
+            council_id='X01000000', internal_council_id='old').exists())
+
+    def test_features_closed(self):
+        # streamed features hold temp files which
+        # we should release even if the import fails
+        self.create_dummy_council()
+        cmd = stub_jsonimport.Command()
+        cmd.council = Council.objects.get(pk='X01000000')
+        features = mock.MagicMock()
+        features.__iter__.side_effect = lambda: iter([{}])
+
+        with mock.patch.object(cmd, 'get_districts', return_value=features),\
+                mock.patch.object(cmd, 'district_record_to_dict', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                cmd.import_polling_districts()
+        self.assertTrue(features.close.called)
+
+        features.reset_mock()
+        with mock.patch.object(cmd, 'get_stations', return_value=features),\
+                mock.patch.object(cmd, 'station_record_to_dict', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                cmd.import_polling_stations()
+        self.assertTrue(features.close.called)
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from django.test import TestCase
+from data_collection.s3wrapper import S3Wrapper
+
+
+class FakeKey:
+
+    def __init__(self, bucket, key):
+        self.bucket = bucket
+        self.key = key
+        self.etag = None
+        self.size = None
+        path = os.path.join(bucket.root, key)
+        if os.path.isfile(path):
+            self.size = os.path.getsize(path)
+            self.etag = self.get_etag(path)
+
+    def get_etag(self, path):
+        with open(path, 'rb') as f:
+            return '"%s"' % hashlib.md5(f.read()).hexdigest()
+
+    def get_contents_to_file(self, fp):
+        path = os.path.join(self.bucket.root, self.key)
+        with open(path, 'rb') as f:
+            fp.write(f.read())
+        self.etag = self.get_etag(path)
+        self.bucket.downloads.append(self.key)
+
+
+class FakeBucket:
+
+    """
+    A stand-in for a boto Bucket backed by a local directory
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.downloads = []
+
+    def list(self, prefix=''):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            for filename in filenames:
+                key = os.path.relpath(
+                    os.path.join(dirpath, filename), self.root)
+                if key.startswith(prefix):
+                    yield FakeKey(self, key)
+
+    def new_key(self, key):
+        return FakeKey(self, key)
+
+
+class S3WrapperTest(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.bucket_root = os.path.join(self.tmp, 'bucket')
+        self.cache = os.path.join(self.tmp, 's3cache')
+        self.bucket = FakeBucket(self.bucket_root)
+        self.put('X01000001-foo/stations.csv', 'stations')
+        self.put('X01000001-foo/districts.shp', 'districts')
+        self.put('X01000002-bar/stations.csv', 'other council')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def put(self, key, content):
+        path = os.path.join(self.bucket_root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def get_wrapper(self):
+        return S3Wrapper(
+            bucket_factory=lambda: self.bucket, base_path=self.cache, workers=2)
+
+    def read(self, key):
+        with open(os.path.join(self.cache, key)) as f:
+            return f.read()
+
+    def test_only_fetch_changed_files(self):
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        self.assertEqual(
+            ['X01000001-foo/districts.shp', 'X01000001-foo/stations.csv'],
+            sorted(self.bucket.downloads))
+        self.assertEqual('stations', self.read('X01000001-foo/stations.csv'))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.cache, 'X01000002-bar')))
+
+        # nothing has changed
+        self.bucket.downloads = []
+        self.assertEqual(
+            [], self.get_wrapper().fetch_data_by_council('X01000001'))
+        self.assertEqual([], self.bucket.downloads)
+
+        # one file has changed
+        self.put('X01000001-foo/stations.csv', 'new stations')
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        self.assertEqual(['X01000001-foo/stations.csv'], self.bucket.downloads)
+        self.assertEqual('new stations', self.read('X01000001-foo/stations.csv'))
+
+    def test_remove_stale_files(self):
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        os.remove(os.path.join(self.bucket_root, 'X01000001-foo/districts.shp'))
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        self.assertFalse(os.path.exists(
+            os.path.join(self.cache, 'X01000001-foo/districts.shp')))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.cache, 'X01000001-foo/stations.csv')))
+
+    def test_remove_files_not_in_manifest(self):
+        # left over from before we kept a manifest
+        os.makedirs(os.path.join(self.cache, 'X01000001-foo'))
+        with open(os.path.join(self.cache, 'X01000001-foo/old.csv'), 'w') as f:
+            f.write('old')
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        self.assertEqual(
+            ['districts.shp', 'stations.csv'],
+            sorted(os.listdir(os.path.join(self.cache, 'X01000001-foo'))))
+
+    def test_remove_renamed_folder(self):
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        shutil.move(
+            os.path.join(self.bucket_root, 'X01000001-foo'),
+            os.path.join(self.bucket_root, 'X01000001-baz'))
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        self.assertEqual(
+            ['X01000001-baz'],
+            [name for name in os.listdir(self.cache)
+             if name.startswith('X01000001')])
+
+    def test_more_than_one_folder(self):
+        self.put('X01000001-baz/stations.csv', 'stations')
+        with self.assertRaises(ValueError):
+            self.get_wrapper().fetch_data_by_council('X01000001')
+
+    def test_refetch_missing_local_file(self):
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        os.remove(os.path.join(self.cache, 'X01000001-foo/stations.csv'))
+        self.bucket.downloads = []
+        self.get_wrapper().fetch_data_by_council('X01000001')
+        self.assertEqual(['X01000001-foo/stations.csv'], self.bucket.downloads)
+
+    def test_no_data(self):
+        with self.assertRaises(ValueError):
+            self.get_wrapper().fetch_data_by_council('X01000003')
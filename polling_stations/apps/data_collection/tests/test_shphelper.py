@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import zipfile
+import shapefile
+from django.test import TestCase
+from data_collection.filehelpers import ShpHelper
+
+
+class ShpHelperTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+        writer = shapefile.Writer(shapefile.POINT)
+        writer.field('name', 'C', '40')
+        writer.point(1, 2)
+        writer.record('foo')
+        writer.point(3, 4)
+        writer.record('bar')
+
+        self.shp_path = os.path.join(self.tmpdir, 'stations.shp')
+        writer.save(self.shp_path)
+
+        self.zip_path = os.path.join(self.tmpdir, 'stations.shp.zip')
+        with zipfile.ZipFile(self.zip_path, 'w') as zip_file:
+            for ext in ('shp', 'shx', 'dbf'):
+                zip_file.write(
+                    os.path.join(self.tmpdir, 'stations.%s' % ext),
+                    'data/stations.%s' % ext)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def assertFeatures(self, features):
+        self.assertEqual(
+            [([1.0, 2.0], 'foo'), ([3.0, 4.0], 'bar')],
+            [(list(f.shape.points[0]), f.record[0].strip()) for f in features])
+
+    def test_shp(self):
+        self.assertFeatures(ShpHelper(self.shp_path).get_features())
+
+    def test_shp_zip(self):
+        features = ShpHelper(self.zip_path, zip=True).get_features()
+        self.assertIsInstance(features, list)
+        self.assertFeatures(features)
+        # we read the archive without extracting it
+        self.assertEqual(
+            ['stations.dbf', 'stations.shp', 'stations.shp.zip', 'stations.shx'],
+            sorted(os.listdir(self.tmpdir)))
+
+    def test_shp_zip_stream(self):
+        features = ShpHelper(self.zip_path, zip=True, stream=True).get_features()
+        self.assertNotIsInstance(features, list)
+
+        # the zip file can go away once we've called get_features()
+        os.remove(self.zip_path)
+
+        # and we can iterate over the shapes more than once
+        with features:
+            self.assertFeatures(features)
+            self.assertFeatures(features)
+        # the temp files are released when we're done
+        self.assertIsNone(features.helper.members)
+
+    def test_too_many_shapefiles(self):
+        with zipfile.ZipFile(self.zip_path, 'a') as zip_file:
+            zip_file.write(self.shp_path, 'other.shp')
+        with self.assertRaises(ValueError):
+            ShpHelper(self.zip_path, zip=True).get_features()
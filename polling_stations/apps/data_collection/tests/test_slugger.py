@@ -1,4 +1,11 @@
+import random
+import re
+import string
+import unicodedata
+
 from django.test import TestCase
+from django.utils.encoding import force_text
+from django.utils.safestring import mark_safe
 from data_collection.slugger import Slugger
 
 
@@ -25,3 +32,42 @@ class SluggerTest(TestCase):
             Slugger.slugify("Un \xe9l\xe9phant \xe0 l'or\xe9e du bois"),
             'un-elephant-a-l-oree-du-bois',
         )
+
+
+def reference_slugify(value):
+    # the original implementation of Slugger.slugify()
+    # slugs are public URLs, so the output must never change
+    value = force_text(value)
+    value = unicodedata.normalize(
+        'NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    value = re.sub('[^\w\s-]', '-', value).strip().lower()
+    return mark_safe(re.sub('[-\s]+', '-', value))
+
+
+class SluggerEquivalenceTest(TestCase):
+
+    # a mix of ASCII, whitespace, punctuation,
+    # accented, compatibility and non-latin characters
+    alphabet = (
+        string.ascii_letters + string.digits + string.punctuation +
+        ' \t\n\r\x0b\x0c\x1c\x1f\xa0' +
+        '\xe9\xe0\xfc\xdf\xc6\xf8ł’–½ﬁ①' +
+        'ΑЖא中\U0001f600'
+    )
+
+    def random_strings(self, n):
+        rand = random.Random(1234)
+        for _ in range(n):
+            length = rand.randint(0, 40)
+            yield ''.join(rand.choice(self.alphabet) for _ in range(length))
+
+    def test_slugify_matches_reference(self):
+        for value in self.random_strings(5000):
+            self.assertEqual(reference_slugify(value), Slugger.slugify(value))
+
+    def test_slugify_many_matches_reference(self):
+        values = list(self.random_strings(1000))
+        values = values + values[:100] + [123, None, 1, 1.0, True]
+        self.assertEqual(
+            [reference_slugify(value) for value in values],
+            Slugger.slugify_many(values))
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from django.test import TestCase
+from data_collection.filehelpers import KmlHelper
+from data_collection.xmlhelpers import gml_to_ogr, KmlReader
+
+
+KML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2"><Document><Folder>
+  <Placemark>
+    <name>foo</name>
+    <description><![CDATA[<b>Foo</b> district]]></description>
+    <MultiGeometry>
+      <Polygon><outerBoundaryIs><LinearRing><coordinates>
+        0,0,10 0,1,10 1,1,10 1,0,10 0,0,10
+      </coordinates></LinearRing></outerBoundaryIs></Polygon>
+      <Polygon><outerBoundaryIs><LinearRing><coordinates>
+        2,2,10 2,3,10 3,3,10 3,2,10 2,2,10
+      </coordinates></LinearRing></outerBoundaryIs></Polygon>
+    </MultiGeometry>
+    <ExtendedData><SchemaData><SimpleData name="code">A1</SimpleData></SchemaData></ExtendedData>
+  </Placemark>
+  <Placemark><name>bar</name><Point><coordinates>1,2,3</coordinates></Point></Placemark>
+</Folder><Folder>
+  <Placemark><name>label</name><Point><coordinates>5,5</coordinates></Point></Placemark>
+</Folder></Document></kml>
+"""
+
+GML = """<?xml version="1.0" encoding="UTF-8"?>
+<wfs:FeatureCollection xmlns:wfs="http://www.opengis.net/wfs"
+    xmlns:gml="http://www.opengis.net/gml" xmlns:ms="http://mapserver.gis.umn.edu/mapserver">
+  %s
+</wfs:FeatureCollection>
+"""
+
+GML_FEATURE = """<gml:featureMember><ms:district>
+  <ms:msGeometry><gml:Polygon srsName="EPSG:27700"><gml:outerBoundaryIs><gml:LinearRing>
+    <gml:coordinates>0,0 0,10 10,10 10,0 0,0</gml:coordinates>
+  </gml:LinearRing></gml:outerBoundaryIs></gml:Polygon></ms:msGeometry>
+  <ms:code>A1</ms:code>
+</ms:district></gml:featureMember>"""
+
+
+class KmlReaderTest(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.kml_path = os.path.join(self.tmpdir, 'test.kml')
+        with open(self.kml_path, 'wb') as f:
+            f.write(KML)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_kml(self):
+        features = KmlHelper(self.kml_path).get_features()
+
+        # we only read the first layer
+        self.assertEqual(['foo', 'bar'], [f['Name'].value for f in features])
+
+        foo = features[0]
+        self.assertEqual('<b>Foo</b> district', str(foo['description']))
+        self.assertEqual('A1', foo.get('CODE'))
+        self.assertEqual('MULTIPOLYGON', foo.geom.geom_name)
+        # z values have been dropped
+        self.assertEqual(2, foo.geom.coord_dim)
+        self.assertEqual(2, foo.geom.geom_count)
+
+        self.assertEqual((1.0, 2.0), features[1].geom.tuple)
+
+    def test_kmz(self):
+        kmz_path = os.path.join(self.tmpdir, 'test.kmz')
+        with zipfile.ZipFile(kmz_path, 'w') as kmz:
+            kmz.write(self.kml_path, 'doc.kml')
+        features = KmlHelper(kmz_path).get_features()
+        self.assertEqual(
+            [f['Name'].value for f in KmlReader(self.kml_path).get_features()],
+            [f['Name'].value for f in features])
+
+
+class GmlTest(TestCase):
+
+    def test_gml_to_ogr(self):
+        geom = gml_to_ogr(GML % GML_FEATURE)
+        self.assertEqual('POLYGON', geom.geom_name)
+        self.assertEqual(100, geom.area)
+
+    def test_gml_to_ogr_multiple_features(self):
+        with self.assertRaises(ValueError):
+            gml_to_ogr(GML % (GML_FEATURE * 2))
@@ -20,6 +20,41 @@ class LeagueTable(ListView):
         )\
         .order_by('-has_report', 'council__name')
 
+    # columns the table can be sorted by (?sort=stations or ?sort=-stations)
+    sort_fields = {
+        'council': 'council__name',
+        'stations': 'num_stations',
+        'districts': 'num_districts',
+        'addresses': 'num_addresses',
+        'stations_without_point': 'num_stations_without_point',
+        'invalid_district_refs': 'num_stations_invalid_district_refs',
+        'invalid_station_refs': 'num_districts_invalid_station_refs',
+        'districts_without_stations': 'num_districts_without_stations',
+        'districts_multiple_stations': 'num_districts_multiple_stations',
+        'addresses_without_station': 'num_addresses_without_station',
+    }
+
+    def get_sort(self):
+        sort = self.request.GET.get('sort', '')
+        if sort.lstrip('-') in self.sort_fields:
+            return sort
+        return None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        sort = self.get_sort()
+        if sort is None:
+            return queryset
+        field = self.sort_fields[sort.lstrip('-')]
+        if sort.startswith('-'):
+            field = '-' + field
+        return queryset.order_by(field, 'council__name')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['sort'] = self.get_sort()
+        return context
+
 
 def data_quality(request, council_id):
     data = get_object_or_404(DataQuality.objects.select_related('council'),
@@ -0,0 +1,264 @@
+"""
+Read features from KML and GML documents in memory
+
+We parse the XML with lxml and build the geometries ourselves
+(KML) or with OGR_G_CreateFromGML (GML), rather than writing
+each document out to a temp file so GDAL's DataSource can read it.
+"""
+
+import struct
+from ctypes import c_char_p
+from django.contrib.gis.gdal import OGRGeometry, SpatialReference
+from django.contrib.gis.gdal.libgdal import lgdal
+from django.contrib.gis.gdal.prototypes.generation import geom_output
+from django.utils.encoding import force_bytes
+from lxml import etree
+
+
+WKB_POINT = 1
+WKB_LINESTRING = 2
+WKB_POLYGON = 3
+WKB_GEOMETRYCOLLECTION = 7
+# MultiGeometry containing only one type becomes a Multi* of that type
+WKB_MULTI_TYPES = {WKB_POINT: 4, WKB_LINESTRING: 5, WKB_POLYGON: 6}
+
+KML_GEOMETRIES = ('Point', 'LineString', 'LinearRing', 'Polygon', 'MultiGeometry')
+
+GML_NAMESPACES = ('http://www.opengis.net/gml', 'http://www.opengis.net/gml/3.2')
+GML_GEOMETRIES = (
+    'Point', 'LineString', 'LinearRing', 'Polygon', 'Curve', 'Surface',
+    'MultiPoint', 'MultiLineString', 'MultiCurve', 'MultiPolygon',
+    'MultiSurface', 'MultiGeometry', 'CompositeSurface',
+)
+GML_FEATURE_CONTAINERS = ('featureMember', 'featureMembers', 'member')
+
+# Django 1.8 doesn't wrap this (OGRGeometry.from_gml() arrives in 1.11)
+from_gml = geom_output(lgdal.OGR_G_CreateFromGML, [c_char_p])
+
+
+def localname(el):
+    # comments and processing instructions don't have a string tag
+    if not isinstance(el.tag, str):
+        return None
+    return etree.QName(el).localname
+
+
+def find_children(el, name):
+    return [child for child in el if localname(child) == name]
+
+
+def find_child(el, name):
+    children = find_children(el, name)
+    return children[0] if children else None
+
+
+def get_text(el):
+    if el is None:
+        return ''
+    # keep any markup (e.g: HTML in a description that isn't in CDATA)
+    return (el.text or '') + ''.join(
+        etree.tostring(child, encoding='unicode') for child in el)
+
+
+def parse_coordinates(el):
+    """
+    Parse a KML <coordinates> element ("x,y[,z] x,y[,z] ...")
+    into a flat list of x and y values. Any z values are dropped here,
+    so we never have to strip them from the finished geometry.
+    """
+    coords = []
+    if el is None or not el.text:
+        return coords
+    for point in el.text.split():
+        values = point.split(',')
+        coords.append(float(values[0]))
+        coords.append(float(values[1]))
+    return coords
+
+
+def pack_points(coords):
+    return struct.pack('<I%id' % len(coords), len(coords) // 2, *coords)
+
+
+def kml_geometry_to_wkb(el):
+    """
+    Return (wkb type, 2D WKB) for a KML geometry element
+    or None if the element is empty
+    """
+    name = localname(el)
+    if name == 'Point':
+        coords = parse_coordinates(find_child(el, 'coordinates'))
+        if not coords:
+            return None
+        return WKB_POINT, struct.pack('<BI2d', 1, WKB_POINT, *coords[:2])
+
+    if name in ('LineString', 'LinearRing'):
+        coords = parse_coordinates(find_child(el, 'coordinates'))
+        return WKB_LINESTRING, struct.pack(
+            '<BI', 1, WKB_LINESTRING) + pack_points(coords)
+
+    if name == 'Polygon':
+        rings = []
+        for boundary in ('outerBoundaryIs', 'innerBoundaryIs'):
+            for boundary_el in find_children(el, boundary):
+                for ring in find_children(boundary_el, 'LinearRing'):
+                    rings.append(pack_points(
+                        parse_coordinates(find_child(ring, 'coordinates'))))
+        return WKB_POLYGON, struct.pack(
+            '<BII', 1, WKB_POLYGON, len(rings)) + b''.join(rings)
+
+    if name == 'MultiGeometry':
+        parts = [kml_geometry_to_wkb(child) for child in el]
+        parts = [part for part in parts if part is not None]
+        types = set(part[0] for part in parts)
+        if len(types) == 1 and next(iter(types)) in WKB_MULTI_TYPES:
+            wkb_type = WKB_MULTI_TYPES[next(iter(types))]
+        else:
+            wkb_type = WKB_GEOMETRYCOLLECTION
+        return wkb_type, struct.pack('<BII', 1, wkb_type, len(parts)) +\
+            b''.join(part[1] for part in parts)
+
+    return None
+
+
+class KmlField:
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def __str__(self):
+        return str(self.value).strip()
+
+
+class KmlFeature:
+    """
+    A KML Placemark
+
+    This implements the bits of django.contrib.gis.gdal.Feature our
+    importers use (e.g: feature['Name'].value, feature.geom.geojson),
+    so they don't need to care that we didn't use GDAL to read it.
+    Like OGR, field names are case-insensitive.
+    """
+
+    def __init__(self, fields, wkb, srs):
+        self._fields = fields
+        self._index = {}
+        for i, field in enumerate(fields):
+            self._index.setdefault(field.name.lower(), i)
+        self.wkb = wkb
+        self.srs = srs
+
+    def __getitem__(self, name):
+        try:
+            return self._fields[self._index[name.lower()]]
+        except KeyError:
+            raise KeyError('invalid field name given: "%s"' % name)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    @property
+    def fields(self):
+        return [field.name for field in self._fields]
+
+    def get(self, name):
+        return self[name].value
+
+    @property
+    def geom(self):
+        if self.wkb is None:
+            return None
+        return OGRGeometry(memoryview(self.wkb), srs=self.srs)
+
+
+class KmlReader:
+    """
+    Read the Placemarks from a KML document (a path or file-like object)
+
+    As with GDAL's KML driver, each Folder (or the Document) holding
+    Placemarks is a layer and get_features() returns the first one.
+    """
+
+    def __init__(self, source):
+        self.source = source
+
+    def make_feature(self, placemark, srs):
+        fields = [
+            KmlField('Name', get_text(find_child(placemark, 'name'))),
+            KmlField('Description', get_text(find_child(placemark, 'description'))),
+        ]
+
+        extended_data = find_child(placemark, 'ExtendedData')
+        if extended_data is not None:
+            for data in find_children(extended_data, 'Data'):
+                value = find_child(data, 'value')
+                fields.append(KmlField(
+                    data.get('name'),
+                    get_text(value) if value is not None else get_text(data)))
+            for schema_data in find_children(extended_data, 'SchemaData'):
+                for data in find_children(schema_data, 'SimpleData'):
+                    fields.append(KmlField(data.get('name'), get_text(data)))
+
+        wkb = None
+        for child in placemark:
+            if localname(child) in KML_GEOMETRIES:
+                geometry = kml_geometry_to_wkb(child)
+                if geometry is not None:
+                    wkb = geometry[1]
+                break
+
+        return KmlFeature(fields, wkb, srs)
+
+    def get_features(self):
+        # KML coordinates are always WGS84
+        srs = SpatialReference(4326)
+        features = []
+        layer = None
+        for event, el in etree.iterparse(self.source, events=('end',)):
+            if localname(el) != 'Placemark':
+                continue
+            parent = el.getparent()
+            if layer is None:
+                layer = parent
+            if parent is layer:
+                features.append(self.make_feature(el, srs))
+            # we're done with this Placemark: free the memory
+            el.clear()
+        return features
+
+
+def is_gml_geometry(el):
+    if not isinstance(el.tag, str):
+        return False
+    name = etree.QName(el)
+    return name.namespace in GML_NAMESPACES and name.localname in GML_GEOMETRIES
+
+
+def gml_to_ogr(gml):
+    """
+    Return the geometry of the only feature in a GML document
+    (or a bare GML geometry) as an OGRGeometry
+    """
+    root = etree.fromstring(force_bytes(gml))
+    if is_gml_geometry(root):
+        features = [root]
+    else:
+        features = [
+            feature
+            for container in root.iter()
+            if localname(container) in GML_FEATURE_CONTAINERS
+            for feature in container
+            if localname(feature) is not None
+        ]
+    if len(features) != 1:
+        raise ValueError("Expected 1 feature, found %i" % len(features))
+
+    geometry = next(
+        (el for el in features[0].iter() if is_gml_geometry(el)), None)
+    if geometry is None:
+        raise ValueError("Feature has no geometry")
+    return OGRGeometry(from_gml(etree.tostring(geometry)))
@@ -9,12 +9,21 @@ from operator import itemgetter
 
 from django.conf import settings
 from django.contrib.gis.geos import Point
+from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.urlresolvers import reverse
+from django.db import connection, transaction
 
 from addressbase.models import Address, Blacklist
+from councils.helpers import council_resolver_enabled, get_council_resolver
 from uk_geo_utils.models import Onsud
-from uk_geo_utils.helpers import Postcode
+from uk_geo_utils.helpers import (
+    Postcode,
+    get_address_model,
+    get_onspd_model,
+    get_onsud_model,
+    get_postcode_centroid_model
+)
 from uk_geo_utils.geocoders import (
     AddressBaseGeocoder,
     OnspdGeocoder,
@@ -22,7 +31,13 @@ from uk_geo_utils.geocoders import (
     MultipleCodesException
 )
 
-from pollingstations.models import Council, ResidentialAddress
+from data_finder.models import PostcodeAnswer
+from pollingstations.models import (
+    Council,
+    PollingDistrict,
+    PollingStation,
+    ResidentialAddress
+)
 from data_finder.directions_clients import (
     DirectionsException, GoogleDirectionsClient, MapzenDirectionsClient)
 
@@ -63,6 +78,14 @@ class BaseGeocoder(metaclass=abc.ABCMeta):
             return self.geocode()
 
 
+# values of 'lad' in ONSPD which mean we can't use the postcode
+ONSPD_LAD_ERROR_VALUES = [
+    'L99999999', # Channel Islands
+    'M99999999', # Isle of Man
+    '' # Terminated Postcode or other
+]
+
+
 class OnspdGeocoderAdapter(BaseGeocoder):
     """
     For the moment we need an adapter clas to sit between
@@ -82,16 +105,11 @@ class OnspdGeocoderAdapter(BaseGeocoder):
             raise PostcodeError("No location information")
 
         local_auth = geocoder.get_code('lad')
-        error_values = [
-            'L99999999', # Channel Islands
-            'M99999999', # Isle of Man
-            '' # Terminated Postcode or other
-        ]
-        if not local_auth or local_auth in error_values:
+        if not local_auth or local_auth in ONSPD_LAD_ERROR_VALUES:
             raise PostcodeError("No location information")
 
         codes = [
-            geocoder.get_code('lad'),
+            local_auth,
             geocoder.get_code('eer'),
         ]
 
@@ -139,7 +157,7 @@ class AddressBaseGeocoderAdapter(BaseGeocoder):
             raise MultipleCouncilsException(str(e))
 
         codes = [
-            geocoder.get_code('lad'),
+            lad,
             geocoder.get_code('eer'),
         ]
 
@@ -147,7 +165,7 @@ class AddressBaseGeocoderAdapter(BaseGeocoder):
             'source': 'addressbase',
             'wgs84_lon': centre.x,
             'wgs84_lat': centre.y,
-            'council_gss': geocoder.get_code('lad'),
+            'council_gss': lad,
             'gss_codes': codes,
         }
 
@@ -194,6 +212,100 @@ def geocode_point_only(postcode, sleep=True):
     raise PostcodeError('Could not geocode from any source')
 
 
+class BulkPointGeocoder:
+    """
+    Geocode a known list of postcodes to a point up-front using
+    one set-based query against AddressBase and one against ONSPD,
+    then serve geocode_point_only() lookups from memory.
+
+    This is intended for use by importers, which would otherwise call
+    geocode_point_only() (and possibly sleep) once per polling station.
+    Postcodes which were not passed to the constructor
+    fall back to calling geocode_point_only() and are then cached.
+    """
+
+    def __init__(self, postcodes):
+        postcodes = set([
+            Postcode(p).without_space for p in postcodes if p and p.strip()])
+        self.points = self.geocode_from_addressbase(postcodes)
+        self.points.update(
+            self.geocode_from_onspd(postcodes - set(self.points.keys())))
+
+        # remember failures so we don't try to look them up again
+        for postcode in postcodes - set(self.points.keys()):
+            self.points[postcode] = None
+
+    def geocode_from_addressbase(self, postcodes):
+        postcodes = [Postcode(p).with_space for p in postcodes
+            if Postcode(p).territory != 'NI']
+        if not postcodes:
+            return {}
+
+        # Use the centroids precomputed by import_cleaned_addresses
+        # where we have them
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT postcode, ST_X(location), ST_Y(location)
+            FROM {table}
+            WHERE postcode = ANY(%s)
+            AND location IS NOT NULL;
+        """.format(table=get_postcode_centroid_model()._meta.db_table), [postcodes])
+        rows = cursor.fetchall()
+
+        # otherwise, centroid of the union of all the points
+        # for each postcode: same as AddressQuerySet.centroid
+        missing = list(set(postcodes) - set(row[0] for row in rows))
+        if missing:
+            cursor.execute("""
+                SELECT
+                    postcode,
+                    ST_X(ST_Centroid(ST_Union(location))),
+                    ST_Y(ST_Centroid(ST_Union(location)))
+                FROM {table}
+                WHERE postcode = ANY(%s)
+                AND location IS NOT NULL
+                GROUP BY postcode;
+            """.format(table=get_address_model()._meta.db_table), [missing])
+            rows += cursor.fetchall()
+
+        return {
+            Postcode(postcode).without_space: {
+                'source': 'addressbase',
+                'wgs84_lon': lon,
+                'wgs84_lat': lat,
+            } for postcode, lon, lat in rows
+        }
+
+    def geocode_from_onspd(self, postcodes):
+        if not postcodes:
+            return {}
+
+        records = get_onspd_model().objects\
+            .filter(pcds__in=[Postcode(p).with_space for p in postcodes])\
+            .exclude(location=None)\
+            .values_list('pcds', 'location')
+
+        return {
+            Postcode(pcds).without_space: {
+                'source': 'onspd',
+                'wgs84_lon': location.x,
+                'wgs84_lat': location.y,
+            } for pcds, location in records
+        }
+
+    def geocode_point_only(self, postcode):
+        key = Postcode(postcode).without_space
+        if key not in self.points:
+            try:
+                self.points[key] = geocode_point_only(postcode, sleep=False)
+            except PostcodeError:
+                self.points[key] = None
+
+        if self.points[key] is None:
+            raise PostcodeError('Could not geocode from any source')
+        return self.points[key]
+
+
 def geocode(postcode):
     geocoders = (AddressBaseGeocoderAdapter(postcode), OnspdGeocoderAdapter(postcode))
     for geocoder in geocoders:
@@ -241,6 +353,14 @@ def get_council(geocode_result):
             pass
 
     location = Point(geocode_result['wgs84_lon'], geocode_result['wgs84_lat'])
+    if council_resolver_enabled():
+        # like .get(area__covers=location), this raises
+        # Council.MultipleObjectsReturned if >1 council covers location
+        council_id = get_council_resolver().get_council_id(location)
+        if council_id is None:
+            raise Council.DoesNotExist(
+                'No council covers %s' % (location.wkt))
+        return Council.objects.defer("area").get(pk=council_id)
     return Council.objects.defer("area").get(area__covers=location)
 
 
@@ -310,14 +430,54 @@ class DirectionsHelper():
             return None
 
 
+def routing_cache_options():
+    return getattr(settings, 'ROUTING_CACHE', {})
+
+
+def routing_cache_enabled():
+    return routing_cache_options().get('ENABLED', False)
+
+
+def get_routing_cache():
+    return caches[routing_cache_options().get('CACHE', 'default')]
+
+
+ROUTING_CACHE_VERSION_KEY = 'routing_cache_version'
+
+def invalidate_routing_cache():
+    """
+    Throw away every cached routing decision
+
+    Rather than finding and deleting individual keys
+    we bump a version number which forms part of every key.
+    """
+    routing_cache = get_routing_cache()
+    try:
+        routing_cache.incr(ROUTING_CACHE_VERSION_KEY)
+    except ValueError:
+        # key does not exist yet
+        routing_cache.set(ROUTING_CACHE_VERSION_KEY, 1, None)
+
+
+# Everything we need to route a user (or answer an API request)
+# for a postcode without going back to the DB.
+# address_slug, polling_station_id and council_id
+# are only populated for the 'single_address' route
+Route = namedtuple('Route', [
+    'route_type', 'councils', 'address_slug', 'polling_station_id', 'council_id'])
+
+
 # use a postcode to decide which endpoint the user should be directed to
 class RoutingHelper():
 
-    def __init__(self, postcode):
+    def __init__(self, postcode, route=None):
         self.postcode = Postcode(postcode).without_space
         self.Endpoint = namedtuple('Endpoint', ['view', 'kwargs'])
         self.get_addresses()
-        self.get_councils_from_blacklist()
+        if route is None:
+            route = self.get_route()
+        self.route = route
+        self.councils = self.route.councils
 
     def get_addresses(self):
         self.addresses = ResidentialAddress.objects.filter(
@@ -352,8 +512,7 @@ class RoutingHelper():
         stations = self.addresses.values('polling_station_id').distinct()
         return len(stations) == 1
 
-    @property
-    def route_type(self):
+    def get_route_type(self):
         if len(self.councils) > 1:
             return "multiple_councils"
         if self.has_addresses:
@@ -369,6 +528,37 @@ class RoutingHelper():
             # postcode is not in ResidentialAddress table
             return "postcode"
 
+    def make_route(self):
+        self.get_councils_from_blacklist()
+        route_type = self.get_route_type()
+        if route_type == "single_address":
+            address = self.addresses[0]
+            return Route(
+                route_type,
+                self.councils,
+                address.slug,
+                address.polling_station_id,
+                address.council_id,
+            )
+        return Route(route_type, self.councils, None, None, None)
+
+    def get_route(self):
+        if not routing_cache_enabled():
+            return self.make_route()
+
+        routing_cache = get_routing_cache()
+        version = routing_cache.get(ROUTING_CACHE_VERSION_KEY, 0)
+        key = 'routing:%s:%s' % (version, self.postcode)
+        route = routing_cache.get(key)
+        if route is None:
+            route = self.make_route()
+            routing_cache.set(
+                key, route, routing_cache_options().get('TIMEOUT', 60 * 60))
+        return route
+
+    @property
+    def route_type(self):
+        return self.route.route_type
 
     def get_endpoint(self):
         if self.route_type == "multiple_councils":
@@ -385,7 +575,7 @@ class RoutingHelper():
             # map to one polling station
             return self.Endpoint(
                 'address_view',
-                {'address_slug': self.addresses[0].slug}
+                {'address_slug': self.route.address_slug}
             )
         if self.route_type == "multiple_addresses":
             # addresses in this postcode map to
@@ -400,3 +590,421 @@ class RoutingHelper():
                 'postcode_view',
                 {'postcode': self.postcode}
             )
+
+
+def postcode_answers_enabled():
+    return getattr(settings, 'POSTCODE_ANSWERS', {}).get('ENABLED', False)
+
+
+def get_postcode_answer(postcode):
+    """
+    Return the PostcodeAnswer we stored for postcode
+    or None if we need to work it out the long way
+    """
+    if not postcode_answers_enabled():
+        return None
+    try:
+        return PostcodeAnswer.objects\
+            .select_related('council', 'polling_station')\
+            .defer('council__area')\
+            .get(postcode=Postcode(postcode).without_space)
+    except PostcodeAnswer.DoesNotExist:
+        return None
+
+
+def get_answer_route(answer):
+    # postcodes on the blacklist are never stored as answers
+    # so the list of councils is always empty here
+    if answer.route_type == "single_address":
+        station = answer.polling_station
+        return Route(
+            answer.route_type,
+            [],
+            answer.address_slug,
+            station.internal_council_id if station else None,
+            answer.council_id,
+        )
+    return Route(answer.route_type, [], None, None, None)
+
+
+def delete_postcode_answers(council_id):
+    """
+    Delete every stored answer which a council's data could affect:
+    answers in the council or pointing at one of its stations, and
+    answers for postcodes with addresses in it or inside one of its
+    districts (RoutingHelper and the district lookup consider every
+    council's addresses and districts, not just the postcode's council)
+
+    Call this before deleting or replacing a council's data.
+    """
+    cursor = connection.cursor()
+    cursor.execute("""
+        DELETE FROM {answers} a
+        WHERE a.council_id = %s
+        OR a.polling_station_id IN (
+            SELECT id FROM {stations} WHERE council_id = %s)
+        OR a.postcode IN (
+            SELECT postcode FROM {addresses} WHERE council_id = %s)
+        OR EXISTS (
+            SELECT 1 FROM {districts} d
+            WHERE d.council_id = %s
+            AND ST_Covers(d.area, a.location));
+    """.format(
+        answers=PostcodeAnswer._meta.db_table,
+        stations=PollingStation._meta.db_table,
+        addresses=ResidentialAddress._meta.db_table,
+        districts=PollingDistrict._meta.db_table,
+    ), [council_id] * 4)
+
+
+class BulkGeocoder:
+    """
+    Do what geocode() does for a known list of postcodes, in bulk:
+    BulkPointGeocoder finds the locations, then we get the ONSUD codes
+    for every postcode in AddressBase in one query and the ONSPD codes
+    (and locations) for everything else in another.
+
+    results holds what geocode() would return for each postcode.
+    Postcodes geocode() would fail on are left out and postcodes
+    split between councils are listed in multiple_councils.
+    """
+
+    def __init__(self, postcodes):
+        postcodes = set([
+            Postcode(p).without_space for p in postcodes if p and p.strip()])
+        points = BulkPointGeocoder(postcodes).points
+        addressbase_codes = self.get_addressbase_codes(postcodes)
+
+        self.results = {}
+        self.multiple_councils = set()
+        onspd_postcodes = set()
+        for postcode in postcodes:
+            point = points.get(postcode)
+            codes = addressbase_codes.get(postcode)
+            if not point or point['source'] != 'addressbase' or not codes:
+                # not in AddressBase, or none of its UPRNs are in ONSUD
+                onspd_postcodes.add(postcode)
+                continue
+
+            lads, eers = codes
+            if len(lads) > 1:
+                self.multiple_councils.add(postcode)
+                continue
+            if len(eers) > 1:
+                # geocode() gives up on AddressBase and falls back to ONSPD
+                onspd_postcodes.add(postcode)
+                continue
+
+            self.results[postcode] = {
+                'source': 'addressbase',
+                'wgs84_lon': point['wgs84_lon'],
+                'wgs84_lat': point['wgs84_lat'],
+                'council_gss': lads[0],
+                'gss_codes': [lads[0], eers[0]],
+            }
+
+        self.results.update(self.geocode_from_onspd(onspd_postcodes))
+
+    def get_addressbase_codes(self, postcodes):
+        postcodes = [Postcode(p).with_space for p in postcodes
+            if Postcode(p).territory != 'NI']
+        if not postcodes:
+            return {}
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT a.postcode, array_agg(DISTINCT o.lad), array_agg(DISTINCT o.eer)
+            FROM {addresses} a
+            JOIN {onsud} o ON o.uprn = a.uprn
+            WHERE a.postcode = ANY(%s)
+            GROUP BY a.postcode;
+        """.format(
+            addresses=get_address_model()._meta.db_table,
+            onsud=get_onsud_model()._meta.db_table,
+        ), [postcodes])
+
+        return {
+            Postcode(postcode).without_space: (lads, eers)
+            for postcode, lads, eers in cursor.fetchall()
+        }
+
+    def geocode_from_onspd(self, postcodes):
+        if not postcodes:
+            return {}
+
+        records = get_onspd_model().objects\
+            .filter(pcds__in=[Postcode(p).with_space for p in postcodes])\
+            .exclude(location=None)\
+            .values_list('pcds', 'location', 'oslaua', 'eer')
+
+        return {
+            Postcode(pcds).without_space: {
+                'source': 'onspd',
+                'wgs84_lon': location.x,
+                'wgs84_lat': location.y,
+                'gss_codes': [local_auth, eer],
+                'council_gss': local_auth,
+            } for pcds, location, local_auth, eer in records
+            if local_auth and local_auth not in ONSPD_LAD_ERROR_VALUES
+        }
+
+
+class PostcodeAnswerBuilder:
+    """
+    Work out the answer we would give for every postcode in a council
+    and store the results in the PostcodeAnswer table.
+
+    This makes the same decisions as PostcodeView and the API:
+    geocode -> RoutingHelper -> get_council -> get_polling_station,
+    but makes each one for every postcode at once with a fixed number
+    of set-based queries, however many postcodes the council has.
+
+    Postcodes we can't answer in advance (postcodes which fail to geocode
+    or which are split between councils) don't get a row,
+    so those requests still go the long way round.
+
+    Some answers depend on data from outside the council:
+    - Importing a council calls delete_postcode_answers() to drop the
+      answers its old data affected, and we rebuild answers for every
+      postcode inside its new districts, whichever council it is in.
+    - Custom finders are looked up from the stored GSS codes
+      when we serve an answer, so changes to them apply straight away.
+    - We don't track changes to AddressBase, ONSUD, ONSPD or the
+      blacklist: run build_postcode_answers --all after importing them.
+    """
+
+    def __init__(self, council_id, logger=None, batch_size=1000):
+        self.council_id = council_id
+        self.logger = logger
+        self.batch_size = batch_size
+
+    def log(self, message):
+        if self.logger:
+            self.logger.log_message(logging.INFO, message)
+
+    def get_postcodes(self):
+        onspd_model = get_onspd_model()
+        postcodes = set(onspd_model.objects\
+            .filter(oslaua=self.council_id, doterm='')\
+            .values_list('pcds', flat=True))
+
+        # postcodes in other councils can still fall inside our districts
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT DISTINCT o.pcds
+            FROM {onspd} o
+            JOIN {districts} d ON ST_Covers(d.area, o.location)
+            WHERE d.council_id = %s
+            AND o.doterm = '';
+        """.format(
+            onspd=onspd_model._meta.db_table,
+            districts=PollingDistrict._meta.db_table,
+        ), [self.council_id])
+        postcodes |= set(row[0] for row in cursor.fetchall())
+
+        postcodes = set(Postcode(postcode).without_space for postcode in postcodes)
+        postcodes |= set(ResidentialAddress.objects\
+            .filter(council_id=self.council_id)\
+            .values_list('postcode', flat=True)\
+            .distinct())
+        return sorted(postcodes)
+
+    def get_routes(self, postcodes):
+        """
+        Work out the Route RoutingHelper would pick for each postcode.
+        Postcodes on the blacklist for more than one council are left out.
+        """
+        if not postcodes:
+            return {}
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT
+                p.postcode,
+                (SELECT COUNT(*) FROM {blacklist} b WHERE b.postcode = p.postcode),
+                COUNT(a.id),
+                COUNT(DISTINCT a.polling_station_id),
+                (array_agg(a.slug ORDER BY a.id))[1],
+                (array_agg(a.polling_station_id ORDER BY a.id))[1],
+                (array_agg(a.council_id ORDER BY a.id))[1]
+            FROM unnest(%s::varchar[]) AS p(postcode)
+            LEFT JOIN {addresses} a ON a.postcode = p.postcode
+            GROUP BY p.postcode;
+        """.format(
+            blacklist=Blacklist._meta.db_table,
+            addresses=ResidentialAddress._meta.db_table,
+        ), [list(postcodes)])
+
+        routes = {}
+        for postcode, num_councils, num_addresses, num_stations,\
+                slug, station_id, council_id in cursor.fetchall():
+            if num_councils > 1:
+                continue
+            if num_addresses == 0:
+                routes[postcode] = Route("postcode", [], None, None, None)
+            elif num_stations == 1:
+                routes[postcode] = Route(
+                    "single_address", [], slug, station_id, council_id)
+            else:
+                routes[postcode] = Route(
+                    "multiple_addresses", [], None, None, None)
+        return routes
+
+    def get_covering(self, table, columns, locations, geography=False):
+        """
+        Find the row of table (if there is exactly one)
+        whose area covers each location in {postcode: location}
+        """
+        if not locations:
+            return {}
+
+        postcodes = list(locations.keys())
+        point = "ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326)"
+        if geography:
+            point += "::geography"
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT p.postcode, COUNT(*), {columns}
+            FROM unnest(%s::varchar[], %s::float8[], %s::float8[]) AS p(postcode, lon, lat)
+            JOIN {table} t ON ST_Covers(t.area, {point})
+            GROUP BY p.postcode;
+        """.format(
+            columns=', '.join('MIN(t.%s)' % column for column in columns),
+            table=table,
+            point=point,
+        ), [
+            postcodes,
+            [locations[p].x for p in postcodes],
+            [locations[p].y for p in postcodes],
+        ])
+
+        return {
+            row[0]: row[2:] for row in cursor.fetchall() if row[1] == 1
+        }
+
+    def get_councils(self, geocoded, locations):
+        """
+        Work out the council get_council() would find for each
+        postcode: from the GSS codes if we can, otherwise from the location
+        """
+        codes = set()
+        for loc in geocoded.values():
+            codes |= set(code for code in loc['gss_codes'] if code)
+        known = set(Council.objects\
+            .filter(pk__in=codes)\
+            .values_list('pk', flat=True))
+
+        councils = {}
+        unknown = {}
+        for postcode, loc in geocoded.items():
+            matches = [code for code in loc['gss_codes'] if code in known]
+            if loc['council_gss'] in known:
+                councils[postcode] = loc['council_gss']
+            elif matches:
+                councils[postcode] = matches[0]
+            else:
+                unknown[postcode] = locations[postcode]
+
+        for postcode, row in self.get_covering(
+                Council._meta.db_table, ['council_id'], unknown,
+                geography=True).items():
+            councils[postcode] = row[0]
+        return councils
+
+    def get_stations(self, council_ids):
+        by_district = {}
+        by_id = {}
+        stations = PollingStation.objects\
+            .filter(council_id__in=council_ids)\
+            .only('council_id', 'internal_council_id', 'polling_district_id', 'address')\
+            .order_by('id')
+        for station in stations:
+            by_district.setdefault(
+                (station.council_id, station.polling_district_id), []).append(station)
+            by_id.setdefault(
+                (station.council_id, station.internal_council_id), []).append(station)
+        return by_district, by_id
+
+    def pick_station(self, council_id, district, by_district, by_id):
+        # same rules as PollingStationManager.get_polling_station
+        district_id, station_id = district
+        if district_id:
+            stations = by_district.get((council_id, district_id), [])
+            if len(stations) == 1:
+                return stations[0]
+            if len(set(s.address for s in stations)) == 1:
+                return stations[0]
+
+        if station_id:
+            stations = by_id.get((council_id, station_id), [])
+            if len(stations) == 1:
+                return stations[0]
+        return None
+
+    def make_answers(self, postcodes):
+        geocoded = BulkGeocoder(postcodes).results
+        routes = self.get_routes(geocoded.keys())
+        geocoded = {
+            postcode: loc for postcode, loc in geocoded.items()
+            if postcode in routes
+        }
+        locations = {
+            postcode: Point(loc['wgs84_lon'], loc['wgs84_lat'])
+            for postcode, loc in geocoded.items()
+        }
+        councils = self.get_councils(geocoded, locations)
+
+        districts = self.get_covering(
+            PollingDistrict._meta.db_table,
+            ['internal_council_id', 'polling_station_id'],
+            {
+                postcode: locations[postcode] for postcode in councils
+                if routes[postcode].route_type == "postcode"
+            })
+
+        by_district, by_id = self.get_stations(
+            set(councils.values()) |
+            set(route.council_id for route in routes.values() if route.council_id))
+
+        answers = []
+        for postcode in sorted(councils):
+            route = routes[postcode]
+            station = None
+            if route.route_type == "single_address":
+                stations = by_id.get(
+                    (route.council_id, route.polling_station_id), [])
+                if len(stations) == 1:
+                    station = stations[0]
+            elif route.route_type == "postcode" and postcode in districts:
+                station = self.pick_station(
+                    councils[postcode], districts[postcode], by_district, by_id)
+
+            answers.append(PostcodeAnswer(
+                postcode=postcode,
+                council_id=councils[postcode],
+                route_type=route.route_type,
+                address_slug=route.address_slug or '',
+                polling_station=station,
+                location=locations[postcode],
+                gss_codes=','.join(
+                    code or '' for code in geocoded[postcode]['gss_codes']),
+            ))
+        return answers
+
+    def build(self):
+        postcodes = self.get_postcodes()
+        self.log("Building answers for %i postcodes in %s" % (
+            len(postcodes), self.council_id))
+
+        answers = self.make_answers(postcodes)
+
+        with transaction.atomic():
+            PostcodeAnswer.objects.filter(council_id=self.council_id).delete()
+            PostcodeAnswer.objects.filter(postcode__in=postcodes).delete()
+            PostcodeAnswer.objects.bulk_create(
+                answers, batch_size=self.batch_size)
+
+        self.log("Stored %i answers (%i postcodes left to the slow path)" % (
+            len(answers), len(postcodes) - len(answers)))
+        return len(answers)
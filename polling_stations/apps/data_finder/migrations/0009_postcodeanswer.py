@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.contrib.gis.db.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('councils', '0003_auto_20171031_1331'),
+        ('pollingstations', '0013_customfinders'),
+        ('data_finder', '0008_auto_20170911_1034'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostcodeAnswer',
+            fields=[
+                ('id', models.AutoField(serialize=False, auto_created=True, verbose_name='ID', primary_key=True)),
+                ('postcode', models.CharField(max_length=15, unique=True)),
+                ('route_type', models.CharField(max_length=20)),
+                ('address_slug', models.CharField(blank=True, max_length=255)),
+                ('location', django.contrib.gis.db.models.fields.PointField(srid=4326)),
+                ('gss_codes', models.CharField(blank=True, max_length=100)),
+                ('council', models.ForeignKey(null=True, to='councils.Council')),
+                ('polling_station', models.ForeignKey(null=True, to='pollingstations.PollingStation')),
+            ],
+        ),
+    ]
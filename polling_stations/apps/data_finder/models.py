@@ -3,6 +3,7 @@ from django.contrib.gis.db import models
 from django_extensions.db.models import TimeStampedModel
 
 from councils.models import Council
+from pollingstations.models import PollingStation
 
 
 class LoggedPostcode(TimeStampedModel):
@@ -24,3 +25,38 @@ class LoggedPostcode(TimeStampedModel):
             self.postcode,
             self.brand,
         )
+
+
+class PostcodeAnswer(models.Model):
+    """
+    The answer we would give for a postcode, worked out in advance
+    by the build_postcode_answers command (see PostcodeAnswerBuilder)
+    so that PostcodeView and the API can usually skip straight to it
+    """
+    postcode = models.CharField(max_length=15, unique=True)
+    council = models.ForeignKey(Council, null=True, db_index=True)
+    route_type = models.CharField(max_length=20)
+    address_slug = models.CharField(blank=True, max_length=255)
+    polling_station = models.ForeignKey(PollingStation, null=True)
+    location = models.PointField()
+    # comma-separated GSS codes from geocoding the postcode
+    # (used to look up a custom finder when we serve the answer)
+    gss_codes = models.CharField(blank=True, max_length=100)
+
+    objects = models.GeoManager()
+
+    @property
+    def geocode_result(self):
+        # same shape as the output of data_finder.helpers.geocode()
+        return {
+            'source': 'postcode_answer',
+            'wgs84_lon': self.location.x,
+            'wgs84_lat': self.location.y,
+            'gss_codes': self.gss_codes.split(',') if self.gss_codes else [],
+        }
+
+    def __str__(self):
+        return "{0} ({1})".format(
+            self.postcode,
+            self.route_type,
+        )
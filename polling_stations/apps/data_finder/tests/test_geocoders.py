@@ -1,7 +1,13 @@
 import mock
 from django.test import TestCase
 from data_finder.helpers import (
-    geocode, geocode_point_only, OnspdGeocoderAdapter, MultipleCouncilsException
+    AddressBaseGeocoderAdapter,
+    BulkPointGeocoder,
+    geocode,
+    geocode_point_only,
+    MultipleCouncilsException,
+    OnspdGeocoderAdapter,
+    PostcodeError
 )
 
 
@@ -91,3 +97,40 @@ class GeocodePointOnlyTest(TestCase):
         """
         result = geocode_point_only('BB1 1BB', sleep=False)
         self.assertEqual('addressbase', result['source'])
+
+
+class BulkPointGeocoderTest(TestCase):
+
+    fixtures = ['test_addressbase.json']
+
+    def test_addressbase(self):
+        geocoder = BulkPointGeocoder(['AA1 1AA', 'bb11bb'])
+        for postcode in ['AA11AA', 'BB1 1BB']:
+            result = geocoder.geocode_point_only(postcode)
+            expected = AddressBaseGeocoderAdapter(postcode).geocode_point_only()
+            self.assertEqual('addressbase', result['source'])
+            self.assertAlmostEqual(expected['wgs84_lon'], result['wgs84_lon'])
+            self.assertAlmostEqual(expected['wgs84_lat'], result['wgs84_lat'])
+
+    @mock.patch("data_finder.helpers.geocode_point_only")
+    def test_not_found(self, mock_geocode_point_only):
+        """
+        We can't find the postcode in AddressBase or ONSPD
+
+        PostcodeError should be thrown without falling back
+        to geocoding the postcode again one at a time
+        """
+        geocoder = BulkPointGeocoder(['DD1 1DD'])
+        with self.assertRaises(PostcodeError):
+            geocoder.geocode_point_only('DD11DD')
+        self.assertFalse(mock_geocode_point_only.called)
+
+    @mock.patch("data_finder.helpers.OnspdGeocoderAdapter.geocode_point_only", mock_geocode)
+    def test_unseen_postcode(self):
+        """
+        If we ask for a postcode we didn't geocode up-front
+        we should fall back to geocode_point_only()
+        """
+        geocoder = BulkPointGeocoder([])
+        result = geocoder.geocode_point_only('DD1 1DD')
+        self.assertEqual('onspd', result['source'])
@@ -1,6 +1,10 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from addressbase.models import Blacklist
-from data_finder.helpers import RoutingHelper
+from data_finder.helpers import (
+    get_routing_cache,
+    invalidate_routing_cache,
+    RoutingHelper
+)
 
 
 class RoutingHelperTest(TestCase):
@@ -57,3 +61,42 @@ class RoutingHelperTest(TestCase):
         rh = RoutingHelper('dd11dd')
         endpoint = rh.get_endpoint()
         self.assertEqual('multiple_councils_view', endpoint.view)
+
+
+@override_settings(ROUTING_CACHE={'ENABLED': True, 'CACHE': 'default', 'TIMEOUT': 60})
+class RoutingHelperCacheTest(TestCase):
+
+    fixtures = ['test_routing.json']
+
+    def setUp(self):
+        get_routing_cache().clear()
+
+    def test_cached_route(self):
+        rh = RoutingHelper('AA11AA')
+        self.assertEqual('single_address', rh.route_type)
+
+        # a second lookup for the same postcode shouldn't hit the DB
+        with self.assertNumQueries(0):
+            rh = RoutingHelper('aa1 1aa')
+            endpoint = rh.get_endpoint()
+        self.assertEqual('address_view', endpoint.view)
+        self.assertEqual(rh.addresses[0].slug, endpoint.kwargs['address_slug'])
+        self.assertEqual(rh.addresses[0].polling_station_id, rh.route.polling_station_id)
+        self.assertEqual(rh.addresses[0].council_id, rh.route.council_id)
+
+    def test_invalidate(self):
+        rh = RoutingHelper('AA11AA')
+        self.assertEqual('address_view', rh.get_endpoint().view)
+
+        Blacklist.objects.create(postcode='AA11AA', lad='X01000001')
+        Blacklist.objects.create(postcode='AA11AA', lad='W06000022')
+
+        # until we invalidate, we still get the cached decision
+        rh = RoutingHelper('AA11AA')
+        self.assertEqual('address_view', rh.get_endpoint().view)
+
+        invalidate_routing_cache()
+        rh = RoutingHelper('AA11AA')
+        self.assertEqual('multiple_councils_view', rh.get_endpoint().view)
+        self.assertEqual(
+            sorted(['X01000001', 'W06000022']), sorted(rh.councils))
@@ -28,6 +28,8 @@ from .helpers import (
     DirectionsHelper,
     get_council,
     geocode,
+    get_answer_route,
+    get_postcode_answer,
     EveryElectionWrapper,
     MultipleCouncilsException,
     PostcodeError,
@@ -181,6 +183,8 @@ class BasePollingStationView(
 
 class PostcodeView(BasePollingStationView):
 
+    answer = None
+
     def get(self, request, *args, **kwargs):
 
         if 'postcode' in request.GET:
@@ -188,7 +192,14 @@ class PostcodeView(BasePollingStationView):
         if 'postcode' not in kwargs or kwargs['postcode'] == '':
             return HttpResponseRedirect(reverse('home'))
 
-        rh = RoutingHelper(self.kwargs['postcode'])
+        # if we've already worked out the answer for this postcode
+        # we don't need to geocode it or look up the council and station
+        self.answer = get_postcode_answer(self.kwargs['postcode'])
+        if self.answer:
+            rh = RoutingHelper(
+                self.kwargs['postcode'], route=get_answer_route(self.answer))
+        else:
+            rh = RoutingHelper(self.kwargs['postcode'])
         endpoint = rh.get_endpoint()
         if endpoint.view != 'postcode_view':
             return HttpResponseRedirect(
@@ -209,12 +220,18 @@ class PostcodeView(BasePollingStationView):
             return self.render_to_response(context)
 
     def get_location(self):
+        if self.answer:
+            return self.answer.geocode_result
         return geocode(self.postcode)
 
     def get_council(self, geocode_result):
+        if self.answer:
+            return self.answer.council
         return get_council(geocode_result)
 
     def get_station(self):
+        if self.answer:
+            return self.answer.polling_station
         return PollingStation.objects.get_polling_station(
             self.council.council_id, location=self.location)
 
@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+
+class DistrictIndex:
+    """
+    In-memory spatial index of PollingDistrict areas
+
+    Each process builds its own copy the first time it is used.
+    Districts are bucketed into a regular grid by bounding box and stored
+    as prepared geometries, so resolving a point to a district is a dict
+    lookup plus a handful of covers() calls instead of a PostGIS query.
+
+    Importers call invalidate_district_index() when they change
+    a council's districts. This bumps a version number in the cache
+    (shared between processes if we are using redis). Each process
+    checks this at most every CHECK_INTERVAL seconds and rebuilds
+    its index if the version has changed.
+    """
+
+    VERSION_KEY = 'polling_district_index_version'
+
+    def __init__(self, cell_size=0.05, check_interval=60):
+        self.cell_size = cell_size
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.grid = None
+        self.version = None
+        self.checked = 0
+
+    def get_cells(self, extent):
+        xmin, ymin, xmax, ymax = extent
+        for x in range(self.get_cell(xmin), self.get_cell(xmax) + 1):
+            for y in range(self.get_cell(ymin), self.get_cell(ymax) + 1):
+                yield (x, y)
+
+    def get_cell(self, value):
+        return int(math.floor(value / self.cell_size))
+
+    def build(self):
+        PollingDistrict = apps.get_model('pollingstations', 'PollingDistrict')
+        grid = {}
+        records = PollingDistrict.objects\
+            .exclude(area=None)\
+            .values_list(
+                'pk',
+                'council_id',
+                'internal_council_id',
+                'polling_station_id',
+                'area')\
+            .iterator()
+        for pk, council_id, internal_council_id, polling_station_id, area in records:
+            district = PollingDistrict(
+                pk=pk,
+                council_id=council_id,
+                internal_council_id=internal_council_id,
+                polling_station_id=polling_station_id,
+            )
+            entry = (area.prepared, district)
+            for cell in self.get_cells(area.extent):
+                grid.setdefault(cell, []).append(entry)
+        return grid
+
+    def get_version(self):
+        return cache.get(self.VERSION_KEY, 0)
+
+    def load(self):
+        now = time.time()
+        if self.grid is not None and now - self.checked < self.check_interval:
+            return self.grid
+
+        with self.lock:
+            version = self.get_version()
+            if self.grid is None or version != self.version:
+                self.grid = self.build()
+                self.version = version
+            self.checked = now
+        return self.grid
+
+    def get_districts(self, location):
+        if location.srid and location.srid != 4326:
+            location = location.transform(4326, clone=True)
+        grid = self.load()
+        cell = (self.get_cell(location.x), self.get_cell(location.y))
+        return [district for prepared, district in grid.get(cell, [])
+            if prepared.covers(location)]
+
+    def get_district(self, location):
+        """
+        Return the one PollingDistrict covering location
+        or None if there are zero or >1 matches
+        """
+        districts = self.get_districts(location)
+        if len(districts) == 1:
+            return districts[0]
+        return None
+
+
+def district_index_enabled():
+    return getattr(settings, 'POLLING_DISTRICT_INDEX', {}).get('ENABLED', False)
+
+
+_district_index = None
+
+def get_district_index():
+    global _district_index
+    if _district_index is None:
+        options = getattr(settings, 'POLLING_DISTRICT_INDEX', {})
+        _district_index = DistrictIndex(
+            check_interval=options.get('CHECK_INTERVAL', 60))
+    return _district_index
+
+
+def invalidate_district_index():
+    """
+    Tell every process holding a DistrictIndex to rebuild it
+    """
+    try:
+        cache.incr(DistrictIndex.VERSION_KEY)
+    except ValueError:
+        # key does not exist yet
+        cache.set(DistrictIndex.VERSION_KEY, 1, None)
+    if _district_index is not None:
+        _district_index.clear()
@@ -10,6 +10,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext as _
 
 from councils.models import Council
+from pollingstations.helpers import district_index_enabled, get_district_index
 from uk_geo_utils.helpers import Postcode
 
 
@@ -39,12 +40,8 @@ class PollingStationManager(models.GeoManager):
         assert any((polling_district, location))
 
         if not polling_district:
-            try:
-                polling_district = PollingDistrict.objects.get(
-                    area__covers=location)
-            except PollingDistrict.DoesNotExist:
-                return None
-            except PollingDistrict.MultipleObjectsReturned:
+            polling_district = self.get_polling_district(location)
+            if polling_district is None:
                 return None
 
         if polling_district.internal_council_id:
@@ -75,6 +72,17 @@ class PollingStationManager(models.GeoManager):
             # make this explicit rather than implied
             return None
 
+    def get_polling_district(self, location):
+        if district_index_enabled():
+            return get_district_index().get_district(location)
+
+        try:
+            return PollingDistrict.objects.get(area__covers=location)
+        except PollingDistrict.DoesNotExist:
+            return None
+        except PollingDistrict.MultipleObjectsReturned:
+            return None
+
     def get_polling_station_by_id(self, internal_council_id, council_id):
         station = self.filter(
             internal_council_id=internal_council_id,
@@ -1,6 +1,7 @@
 from django.contrib.gis.geos import Point
-from django.test import TestCase
-from pollingstations.models import PollingStation
+from django.test import TestCase, override_settings
+from pollingstations.helpers import get_district_index, invalidate_district_index
+from pollingstations.models import PollingDistrict, PollingStation
 
 
 # define the conditions we are going to test for here
@@ -58,3 +59,35 @@ class PollingStationsPointInPolygonTest(TestCase, PollingStationsTestBase):
             'X01000001', location=point)
         # district AA has a blank station refernce
         self.assertIsNone(station)
+
+
+# run the same tests using the in-memory district index
+@override_settings(POLLING_DISTRICT_INDEX={'ENABLED': True})
+class PollingStationsDistrictIndexTest(TestCase, PollingStationsTestBase):
+    fixtures = ['test_polling_stations_district_id.json']
+
+    def setUp(self):
+        invalidate_district_index()
+
+    def test_index_matches_db(self):
+        index = get_district_index()
+        points = [
+            Point(-2.1588134765625, 52.8193630015979),
+            Point(0.76904296875, 53.1434755845945),
+            Point(-4.3341064453125, 55.85835810656004),
+            Point(-10, 40),
+        ]
+        for point in points:
+            expected = set(PollingDistrict.objects\
+                .filter(area__covers=point)\
+                .values_list('pk', flat=True))
+            self.assertEqual(
+                expected, set([d.pk for d in index.get_districts(point)]))
+
+    def test_invalidate(self):
+        point = Point(-2.1588134765625, 52.8193630015979)
+        self.assertIsNotNone(get_district_index().get_district(point))
+
+        PollingDistrict.objects.all().delete()
+        invalidate_district_index()
+        self.assertIsNone(get_district_index().get_district(point))
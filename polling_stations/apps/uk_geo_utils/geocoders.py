@@ -1,7 +1,17 @@
 import abc
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.cache import caches
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from uk_geo_utils.helpers import (
-    get_address_model, get_onspd_model, get_onsud_model, Postcode)
+    get_address_model,
+    get_onspd_model,
+    get_onsud_model,
+    get_postcode_centroid_model,
+    Postcode
+)
 
 
 class CodesNotFoundException(Exception):
@@ -32,6 +42,173 @@ class BaseGeocoder(metaclass=abc.ABCMeta):
         pass
 
 
+class AddressBaseResult:
+    """
+    Everything AddressBaseGeocoder needs to know about a postcode:
+    the location of each UPRN, the ONSUD codes for each UPRN and
+    the postcode's centroid, if import_cleaned_addresses stored one.
+
+    This is fetched with one query and only holds plain python
+    values, so it is cheap to keep in memory or pickle into a cache.
+    """
+
+    def __init__(self, postcode, srid, points, code_types, codes, centroid=None):
+        self.postcode = postcode
+        self.srid = srid
+        # {uprn: (x, y)} (or None if the address has no location)
+        self.points = points
+        # names of the ONSUD fields in each tuple in codes
+        self.code_types = code_types
+        # {uprn: (code, code, ...)} for UPRNs found in ONSUD
+        self.codes = codes
+        # (x, y) from the postcode centroid table if there was
+        # a row for this postcode, otherwise we work it out from points
+        self._centroid = centroid
+        self._code_sets = {}
+
+    def __bool__(self):
+        return bool(self.points)
+
+    @property
+    def centroid(self):
+        if not self.points:
+            return None
+        if self._centroid is None:
+            if len(self.points) == 1:
+                self._centroid = next(iter(self.points.values()))
+            else:
+                # centroid of the union of the points: the
+                # union drops duplicates, so average the unique points
+                coords = set(p for p in self.points.values() if p is not None)
+                if coords:
+                    self._centroid = (
+                        sum(c[0] for c in coords) / len(coords),
+                        sum(c[1] for c in coords) / len(coords),
+                    )
+        if self._centroid is None:
+            return None
+        return Point(self._centroid[0], self._centroid[1], srid=self.srid)
+
+    def get_point(self, uprn):
+        coords = self.points[uprn]
+        if coords is None:
+            return None
+        return Point(coords[0], coords[1], srid=self.srid)
+
+    def get_code(self, code_type, uprn):
+        return self.codes[uprn][self.code_types.index(code_type)]
+
+    def get_code_set(self, code_type):
+        if code_type not in self._code_sets:
+            i = self.code_types.index(code_type)
+            self._code_sets[code_type] = set(c[i] for c in self.codes.values())
+        return self._code_sets[code_type]
+
+
+def fetch_addressbase_result(postcode):
+    """
+    Get the addresses for postcode (a Postcode), their ONSUD codes
+    and the precomputed centroid of the postcode in one query
+    """
+    address_model = get_address_model()
+    onsud_model = get_onsud_model()
+    centroid_model = get_postcode_centroid_model()
+    code_fields = [f for f in onsud_model._meta.concrete_fields if not f.primary_key]
+
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT a.uprn, ST_X(a.location), ST_Y(a.location),
+            ST_X(c.location), ST_Y(c.location), o.uprn, {codes}
+        FROM {addresses} a
+        LEFT JOIN {centroids} c ON c.postcode = a.postcode
+        LEFT JOIN {onsud} o ON o.uprn = a.uprn
+        WHERE a.postcode = %s
+        ORDER BY a.uprn;
+    """.format(
+        codes=', '.join('o.%s' % f.column for f in code_fields),
+        addresses=address_model._meta.db_table,
+        centroids=centroid_model._meta.db_table,
+        onsud=onsud_model._meta.db_table,
+    ), [postcode.with_space])
+
+    points = OrderedDict()
+    codes = {}
+    centroid = None
+    for row in cursor.fetchall():
+        points[row[0]] = (row[1], row[2]) if row[1] is not None else None
+        if row[3] is not None:
+            centroid = (row[3], row[4])
+        if row[5] is not None:
+            codes[row[0]] = tuple(row[6:])
+
+    return AddressBaseResult(
+        postcode.with_space,
+        address_model._meta.get_field('location').srid,
+        points,
+        tuple(f.name for f in code_fields),
+        codes,
+        centroid,
+    )
+
+
+def geocode_cache_options():
+    return getattr(settings, 'GEOCODE_CACHE', {})
+
+
+def geocode_cache_enabled():
+    return geocode_cache_options().get('ENABLED', False)
+
+
+def get_geocode_cache():
+    return caches[geocode_cache_options().get('CACHE', 'default')]
+
+
+GEOCODE_CACHE_VERSION_KEY = 'geocode_cache_version'
+
+def invalidate_geocode_cache():
+    """
+    Throw away every cached AddressBaseResult
+    by bumping the version number in every key
+    """
+    geocode_cache = get_geocode_cache()
+    try:
+        geocode_cache.incr(GEOCODE_CACHE_VERSION_KEY)
+    except ValueError:
+        # key does not exist yet
+        geocode_cache.set(GEOCODE_CACHE_VERSION_KEY, 1, None)
+
+
+def get_addressbase_result(postcode):
+    if not geocode_cache_enabled():
+        return fetch_addressbase_result(postcode)
+
+    geocode_cache = get_geocode_cache()
+    version = geocode_cache.get(GEOCODE_CACHE_VERSION_KEY, 0)
+    key = 'geocode:%i:%s' % (version, postcode.without_space)
+    result = geocode_cache.get(key)
+    if result is None:
+        result = fetch_addressbase_result(postcode)
+        geocode_cache.set(
+            key, result, geocode_cache_options().get('TIMEOUT', 60 * 60))
+    return result
+
+
+# Once we've seen the address table has some records in it
+# we remember that for the life of the process
+_addressbase_imported = False
+
+def addressbase_imported():
+    global _addressbase_imported
+    if not _addressbase_imported:
+        _addressbase_imported = get_address_model().objects.all().exists()
+    return _addressbase_imported
+
+
+def reset_addressbase_imported():
+    global _addressbase_imported
+    _addressbase_imported = False
+
+
 class AddressBaseGeocoder(BaseGeocoder):
 
     def __init__(self, postcode):
@@ -43,50 +220,46 @@ class AddressBaseGeocoder(BaseGeocoder):
         self.onsud_model = get_onsud_model()
         self.address_model = get_address_model()
 
-        # check if there are one or more records in the address table
-        if not self.address_model.objects.all().exists():
-            raise AddressBaseNotImportedException('Address Base table is empty')
-
-        self.addresses = self.address_model.objects.filter(
-            postcode=self.postcode.with_space).order_by('uprn')
-        if not self.addresses:
+        self.result = get_addressbase_result(self.postcode)
+        if not self.result:
+            # only check whether there are any records in the address
+            # table if we didn't find any for this postcode
+            if not addressbase_imported():
+                raise AddressBaseNotImportedException('Address Base table is empty')
             raise self.address_model.DoesNotExist(
                 'No addresses found for postcode %s' % (self.postcode))
 
-        self.uprns = self.onsud_model.objects.filter(
-            uprn__in=self._get_uprns()).order_by('uprn')
-
-    def _get_uprns(self):
-        return [a.uprn for a in self.addresses]
-
     @property
     def centroid(self):
-        return self.addresses.centroid
+        return self.result.centroid
 
     def get_point(self, uprn):
-        return self.addresses.get_cached(uprn).location
+        if uprn not in self.result.points:
+            raise self.address_model.DoesNotExist()
+        return self.result.get_point(uprn)
 
     def get_code(self, code_type, uprn=None):
         # check the code_type field exists on our model
         self.onsud_model._meta.get_field(code_type)
 
         if uprn:
-            self.addresses.get_cached(uprn)
-            return getattr(self.uprns.get_cached(uprn), code_type)
+            if uprn not in self.result.points:
+                raise self.address_model.DoesNotExist()
+            if uprn not in self.result.codes:
+                raise self.onsud_model.DoesNotExist()
+            return self.result.get_code(code_type, uprn)
 
-        if len(self.uprns) == 0:
+        if len(self.result.codes) == 0:
             # No records in the ONSUD table were found for the given UPRNs
             # because...reasons
             raise CodesNotFoundException('Found no records in ONSUD for supplied UPRNs')
-        if len(self.addresses) != len(self.uprns):
+        if len(self.result.points) != len(self.result.codes):
             """
             TODO: once you can easily map addresses in WhereDIV to a UPRN,
             change this to:
 
-            for uprn in self._get_uprns():
-                try:
-                    self.uprns.get_cached(uprn)
-                except self.onsud_model.DoesNotExist:
+            for uprn in self.result.points:
+                if uprn not in self.result.codes:
                     raise SomeException('oh noes!!')
 
             Then you can handle it by calling something like
@@ -104,7 +277,7 @@ class AddressBaseGeocoder(BaseGeocoder):
             """
             pass
 
-        codes = set([getattr(u, code_type) for u in self.uprns])
+        codes = self.result.get_code_set(code_type)
         if len(codes) == 1:
             # all the uprns supplied are in the same area
             return list(codes)[0]
@@ -18,6 +18,9 @@ def get_onsud_model():
 def get_onspd_model():
     return get_model('ONSPD_MODEL', 'uk_geo_utils.Onspd')
 
+def get_postcode_centroid_model():
+    return get_model('POSTCODE_CENTROID_MODEL', 'uk_geo_utils.PostcodeCentroid')
+
 
 class Postcode:
 
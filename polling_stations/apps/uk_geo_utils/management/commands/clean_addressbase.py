@@ -1,10 +1,127 @@
 import csv
 import os
 import glob
+import io
+import locale
+import shutil
+import tempfile
+import time
+from multiprocessing import Pool
 from uk_geo_utils.helpers import AddressFormatter
 from django.core.management.base import BaseCommand
 
 
+FIELDNAMES = [
+    'UPRN',
+    'OS_ADDRESS_TOID',
+    'UDPRN',
+    'ORGANISATION_NAME',
+    'DEPARTMENT_NAME',
+    'PO_BOX_NUMBER',
+    'SUB_BUILDING_NAME',
+    'BUILDING_NAME',
+    'BUILDING_NUMBER',
+    'DEPENDENT_THOROUGHFARE',
+    'THOROUGHFARE',
+    'POST_TOWN',
+    'DOUBLE_DEPENDENT_LOCALITY',
+    'DEPENDENT_LOCALITY',
+    'POSTCODE',
+    'POSTCODE_TYPE',
+    'X_COORDINATE',
+    'Y_COORDINATE',
+    'LATITUDE',
+    'LONGITUDE',
+    'RPC',
+    'COUNTRY',
+    'CHANGE_TYPE',
+    'LA_START_DATE',
+    'RM_START_DATE',
+    'LAST_UPDATE_DATE',
+    'CLASS',
+]
+
+# AddressFormatter's arguments, in order
+ADDRESS_FIELDS = [
+    'ORGANISATION_NAME',
+    'DEPARTMENT_NAME',
+    'PO_BOX_NUMBER',
+    'SUB_BUILDING_NAME',
+    'BUILDING_NAME',
+    'BUILDING_NUMBER',
+    'DEPENDENT_THOROUGHFARE',
+    'THOROUGHFARE',
+    'POST_TOWN',
+    'DOUBLE_DEPENDENT_LOCALITY',
+    'DEPENDENT_LOCALITY',
+]
+
+# how often (in seconds) to report progress
+PROGRESS_INTERVAL = 10
+
+UPRN = FIELDNAMES.index('UPRN')
+POSTCODE = FIELDNAMES.index('POSTCODE')
+LATITUDE = FIELDNAMES.index('LATITUDE')
+LONGITUDE = FIELDNAMES.index('LONGITUDE')
+ADDRESS = [FIELDNAMES.index(field) for field in ADDRESS_FIELDS]
+
+
+def clean_row(row):
+    """
+    Turn a row from an AddressBase CSV (as a list)
+    into a (UPRN, address, postcode, location) tuple
+    """
+    return (
+        row[UPRN],
+        AddressFormatter(*[row[i] for i in ADDRESS]).generate_address_label(),
+        row[POSTCODE],
+        "SRID=4326;POINT({} {})".format(row[LONGITUDE], row[LATITUDE]),
+    )
+
+
+def find_chunks(csv_path, chunk_size):
+    """
+    Split a file into (start, end) byte ranges of about chunk_size bytes.
+    Each range starts at the beginning of a line, which is safe because
+    AddressBase fields never contain line breaks.
+    """
+    chunks = []
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def clean_chunk(job):
+    """
+    Clean the lines between start and end in csv_path and write them
+    to out_path. Runs in a worker process, so everything it needs is
+    passed in and it returns (rows, bytes read) for the progress readout.
+    """
+    csv_path, start, end, out_path = job
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = io.StringIO(data.decode(locale.getpreferredencoding(False)), newline='')
+
+    rows = 0
+    with open(out_path, 'w') as out_file:
+        writer = csv.writer(out_file)
+        for row in csv.reader(lines):
+            if not row:
+                # blank line (csv.DictReader used to skip these)
+                continue
+            writer.writerow(clean_row(row))
+            rows += 1
+    return rows, end - start
+
+
 class Command(BaseCommand):
 
     def add_arguments(self, parser):
@@ -13,87 +130,81 @@ class Command(BaseCommand):
             help='The path to the folder containing the AddressBase CSVs'
         )
 
+        parser.add_argument(
+            '-w',
+            '--workers',
+            help='<Optional> Number of processes to clean the CSVs with (default: 1)',
+            type=int,
+            required=False,
+            default=1
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            help='<Optional> Split the CSVs into chunks of about this many MB (default: 32)',
+            type=float,
+            required=False,
+            default=32
+        )
+
+    def get_jobs(self, tmp_path, chunk_size):
+        jobs = []
+        for csv_path in sorted(glob.glob(os.path.join(self.base_path, '*.csv'))):
+            if csv_path.endswith('cleaned.csv'):
+                continue
+            for start, end in find_chunks(csv_path, chunk_size):
+                out_path = os.path.join(tmp_path, 'chunk-%06i.csv' % len(jobs))
+                jobs.append((csv_path, start, end, out_path))
+        return jobs
+
+    def write_progress(self, done, total, rows, num_bytes, started):
+        elapsed = max(time.time() - started, 0.001)
+        self.stdout.write(
+            "%i/%i chunks, %i addresses (%.0f addresses/s, %.1f MB/s)" %
+            (done, total, rows, rows / elapsed, num_bytes / elapsed / 1024 / 1024))
+
     def handle(self, *args, **kwargs):
-        self.fieldnames = [
-            'UPRN',
-            'OS_ADDRESS_TOID',
-            'UDPRN',
-            'ORGANISATION_NAME',
-            'DEPARTMENT_NAME',
-            'PO_BOX_NUMBER',
-            'SUB_BUILDING_NAME',
-            'BUILDING_NAME',
-            'BUILDING_NUMBER',
-            'DEPENDENT_THOROUGHFARE',
-            'THOROUGHFARE',
-            'POST_TOWN',
-            'DOUBLE_DEPENDENT_LOCALITY',
-            'DEPENDENT_LOCALITY',
-            'POSTCODE',
-            'POSTCODE_TYPE',
-            'X_COORDINATE',
-            'Y_COORDINATE',
-            'LATITUDE',
-            'LONGITUDE',
-            'RPC',
-            'COUNTRY',
-            'CHANGE_TYPE',
-            'LA_START_DATE',
-            'RM_START_DATE',
-            'LAST_UPDATE_DATE',
-            'CLASS',
-        ]
         self.base_path = os.path.abspath(kwargs['ab_path'])
         out_path = os.path.join(self.base_path, 'addressbase_cleaned.csv')
+        workers = max(kwargs.get('workers') or 1, 1)
+        chunk_size = max(int((kwargs.get('chunk_size') or 32) * 1024 * 1024), 1)
 
-        with open(out_path, 'w') as out_file:
-            for csv_path in glob.glob(os.path.join(self.base_path, '*.csv')):
-                if csv_path.endswith('cleaned.csv'):
-                    continue
-                self.out_csv = csv.DictWriter(out_file, fieldnames=[
-                    'UPRN',
-                    'address',
-                    'postcode',
-                    'location',
-                ])
-                print(csv_path)
-                self.clean_csv(csv_path)
-                out_file.flush()
-
-    def line_filer(self, csv_path):
-        with open(csv_path) as csv_file:
-            for line in csv.DictReader(csv_file, fieldnames=self.fieldnames):
-                # Do any filtering we might need to do here
-                yield line
-
-    def clean_csv(self, csv_path):
-        for line in self.line_filer(csv_path):
-            self.out_csv.writerow(self.clean_output_line(line))
-
-    def clean_address(self, line):
-        address_fields = [
-            'ORGANISATION_NAME',
-            'DEPARTMENT_NAME',
-            'PO_BOX_NUMBER',
-            'SUB_BUILDING_NAME',
-            'BUILDING_NAME',
-            'BUILDING_NUMBER',
-            'DEPENDENT_THOROUGHFARE',
-            'THOROUGHFARE',
-            'DOUBLE_DEPENDENT_LOCALITY',
-            'DEPENDENT_LOCALITY',
-            'POST_TOWN'
-        ]
-        kwargs = {k.lower(): line[k] for k in line if k in address_fields}
-        return AddressFormatter(**kwargs).generate_address_label()
-
-    def clean_output_line(self, line):
-        data = {}
-        data['UPRN'] = line['UPRN']
-        data['address'] = self.clean_address(line)
-        data['postcode'] = line['POSTCODE']
-        data['location'] = "SRID=4326;POINT({} {})".format(
-            line['LONGITUDE'],
-            line['LATITUDE'],
-        )
-        return data
+        # write each chunk to its own file, then stitch them
+        # together in order once they have all been cleaned
+        tmp_path = tempfile.mkdtemp(dir=self.base_path)
+        try:
+            jobs = self.get_jobs(tmp_path, chunk_size)
+            self.stdout.write(
+                "cleaning %i chunks with %i workers.." % (len(jobs), workers))
+
+            started = time.time()
+            rows = 0
+            num_bytes = 0
+            if workers > 1:
+                pool = Pool(workers)
+                results = pool.imap_unordered(clean_chunk, jobs)
+            else:
+                pool = None
+                results = map(clean_chunk, jobs)
+            try:
+                last_progress = started
+                for done, result in enumerate(results, 1):
+                    rows += result[0]
+                    num_bytes += result[1]
+                    if done == len(jobs) or time.time() - last_progress >= PROGRESS_INTERVAL:
+                        self.write_progress(done, len(jobs), rows, num_bytes, started)
+                        last_progress = time.time()
+            finally:
+                if pool is not None:
+                    pool.close()
+                    pool.join()
+
+            self.stdout.write("writing %s.." % (out_path))
+            with open(out_path, 'wb') as out_file:
+                for job in jobs:
+                    with open(job[3], 'rb') as chunk_file:
+                        shutil.copyfileobj(chunk_file, out_file)
+        finally:
+            shutil.rmtree(tmp_path)
+
+        self.stdout.write("...done")
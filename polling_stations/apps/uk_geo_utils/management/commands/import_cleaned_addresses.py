@@ -1,7 +1,9 @@
 import os
 from django.db import connection
 from django.core.management.base import BaseCommand
-from uk_geo_utils.helpers import get_address_model
+from uk_geo_utils.geocoders import (
+    invalidate_geocode_cache, reset_addressbase_imported)
+from uk_geo_utils.helpers import get_address_model, get_postcode_centroid_model
 
 
 class Command(BaseCommand):
@@ -12,6 +14,18 @@ class Command(BaseCommand):
             help='The path to the folder containing the cleaned AddressBase CSVs'
         )
 
+    def build_postcode_centroids(self, cursor):
+        # same as AddressQuerySet.centroid, for every postcode at once
+        centroid_table = get_postcode_centroid_model()._meta.db_table
+        cursor.execute("TRUNCATE TABLE %s;" % (centroid_table))
+        cursor.execute("""
+            INSERT INTO {centroids} (postcode, location, num_addresses)
+            SELECT postcode, ST_Centroid(ST_Union(location)), COUNT(*)
+            FROM {addresses}
+            WHERE location IS NOT NULL
+            GROUP BY postcode;
+        """.format(centroids=centroid_table, addresses=self.table_name))
+
     def handle(self, *args, **kwargs):
         self.table_name = get_address_model()._meta.db_table
 
@@ -31,4 +45,9 @@ class Command(BaseCommand):
             FROM STDIN (FORMAT CSV, DELIMITER ',', quote '"');
         """ % (self.table_name), fp)
 
+        self.stdout.write("building postcode centroids..")
+        self.build_postcode_centroids(cursor)
+
+        reset_addressbase_imported()
+        invalidate_geocode_cache()
         self.stdout.write("...done")
@@ -2,6 +2,7 @@ import os
 import glob
 from django.db import connection
 from django.core.management.base import BaseCommand
+from uk_geo_utils.geocoders import invalidate_geocode_cache
 from uk_geo_utils.helpers import get_onsud_model
 
 
@@ -37,4 +38,5 @@ class Command(BaseCommand):
                 wz11, ccg, bua11, buasd11, ruc11, oac11, lep1, lep2, pfa, imd)
                 FROM STDIN (FORMAT CSV, DELIMITER ',', QUOTE '"', HEADER);
             """ % (self.table_name), fp)
+        invalidate_geocode_cache()
         self.stdout.write("...done")
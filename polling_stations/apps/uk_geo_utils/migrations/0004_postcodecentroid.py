@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.contrib.gis.db.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uk_geo_utils', '0003_auto_20171030_1504'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostcodeCentroid',
+            fields=[
+                ('postcode', models.CharField(max_length=15, serialize=False, primary_key=True)),
+                ('location', django.contrib.gis.db.models.fields.PointField(null=True, srid=4326, blank=True)),
+                ('num_addresses', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.contrib.gis.db import models
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.db.models.sql.datastructures import EmptyResultSet
 
 
 class CachedGetMixin:
@@ -14,18 +17,28 @@ class AddressQuerySet(models.QuerySet, CachedGetMixin):
 
     @property
     def centroid(self):
-        if not self:
-            return None
-
-        if len(self) == 1:
-            return self[0].location
-
-        base_point = self[0].location
-        poly = base_point.union(self[1].location)
-        for m in self:
-            poly = poly.union(m.location)
+        """
+        Centroid of the union of the points in this queryset
 
-        return poly.centroid
+        This is calculated in the DB, so we don't need to fetch every
+        address and build up the union one point at a time.
+        The union (rather than ST_Collect) drops duplicate points,
+        e.g: lots of flats in the same building.
+        """
+        try:
+            sql, params = self.values('location').query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        cursor = connection.cursor()
+        cursor.execute("""
+            SELECT ST_X(centroid), ST_Y(centroid) FROM
+            (SELECT ST_Centroid(ST_Union(location)) AS centroid
+            FROM ({query}) AS addresses) AS c;
+        """.format(query=sql), params)
+        x, y = cursor.fetchone()
+        if x is None:
+            return None
+        return Point(x, y, srid=self.model._meta.get_field('location').srid)
 
 
 class AbstractAddressManager(models.GeoManager):
@@ -209,3 +222,23 @@ class AbstractOnspd(models.Model):
 
 class Onspd(AbstractOnspd):
     pass
+
+
+class AbstractPostcodeCentroid(models.Model):
+    """
+    Centroid of the addresses in each postcode. This is built from the
+    address table by import_cleaned_addresses so we can look up
+    a large postcode (e.g: student halls) without aggregating
+    hundreds of addresses.
+    """
+    postcode = models.CharField(primary_key=True, max_length=15)
+    location = models.PointField(null=True, blank=True)
+    num_addresses = models.IntegerField(default=0)
+    objects = models.GeoManager()
+
+    class Meta:
+        abstract = True
+
+
+class PostcodeCentroid(AbstractPostcodeCentroid):
+    pass
@@ -1,10 +1,14 @@
 from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.core.exceptions import FieldDoesNotExist
 from django.contrib.gis.geos import Point
 from uk_geo_utils.geocoders import (
     AddressBaseGeocoder,
     get_address_model,
+    invalidate_geocode_cache,
+    reset_addressbase_imported,
     get_onsud_model,
+    get_postcode_centroid_model,
     AddressBaseNotImportedException,
     CodesNotFoundException,
     MultipleCodesException,
@@ -51,6 +55,9 @@ class AddressBaseGeocoderTest(TestCase):
         The AddressBase table has no records in it
         """
         get_address_model().objects.all().delete()
+        # an earlier test may have told this process
+        # there are addresses in the table
+        reset_addressbase_imported()
         with self.assertNumQueries(FuzzyInt(0, 3)):
             with self.assertRaises(AddressBaseNotImportedException):
                 addressbase = AddressBaseGeocoder('AA11AA')
@@ -163,3 +170,49 @@ class AddressBaseGeocoderTest(TestCase):
             with self.assertRaises(get_onsud_model().DoesNotExist):
                 result = addressbase.get_code('lad', '00000006')
             self.assertIsInstance(addressbase.get_point('00000006'), Point)
+
+    def test_one_query(self):
+        """
+        Everything we need to geocode a postcode
+        should come back from one query
+        """
+        with self.assertNumQueries(1):
+            addressbase = AddressBaseGeocoder('BB1 1BB')
+            self.assertEqual('B01000001', addressbase.get_code('lad'))
+            self.assertEqual('B01000001', addressbase.get_code('lad'))
+            self.assertEqual('', addressbase.get_code('eer'))
+            self.assertEqual('B01000001', addressbase.get_code('lad', '00000004'))
+            self.assertIsInstance(addressbase.centroid, Point)
+            self.assertIsInstance(addressbase.get_point('00000005'), Point)
+
+    def test_centroid(self):
+        addressbase = AddressBaseGeocoder('BB1 1BB')
+        expected = get_address_model().objects.filter(postcode='BB1 1BB').centroid
+        self.assertAlmostEqual(expected.x, addressbase.centroid.x)
+        self.assertAlmostEqual(expected.y, addressbase.centroid.y)
+        self.assertEqual(expected.srid, addressbase.centroid.srid)
+
+    def test_precomputed_centroid(self):
+        # import_cleaned_addresses stored a centroid for this postcode
+        get_postcode_centroid_model().objects.create(
+            postcode='BB1 1BB', location=Point(1, 2, srid=4326), num_addresses=3)
+        with self.assertNumQueries(1):
+            addressbase = AddressBaseGeocoder('BB1 1BB')
+            self.assertEqual(Point(1, 2, srid=4326), addressbase.centroid)
+            self.assertEqual('B01000001', addressbase.get_code('lad'))
+
+    @override_settings(GEOCODE_CACHE={'ENABLED': True, 'CACHE': 'default'})
+    def test_cache(self):
+        cache.clear()
+        with self.assertNumQueries(1):
+            AddressBaseGeocoder('BB1 1BB')
+
+        with self.assertNumQueries(0):
+            addressbase = AddressBaseGeocoder('BB1 1BB')
+            self.assertEqual('B01000001', addressbase.get_code('lad'))
+            self.assertIsInstance(addressbase.centroid, Point)
+
+        invalidate_geocode_cache()
+        with self.assertNumQueries(1):
+            AddressBaseGeocoder('BB1 1BB')
+        cache.clear()
@@ -44,3 +44,11 @@ class CentroidTest(TestCase):
         # centre point of the North and South pole
         # should be *somewhere* on the equator, right
         self.assertEqual(qs.centroid.y, 0)
+
+    def test_centroid_empty(self):
+        self.assertIsNone(Address.objects.filter(pk='foo').centroid)
+        self.assertIsNone(Address.objects.none().centroid)
+
+    def test_centroid_one_query(self):
+        with self.assertNumQueries(1):
+            Address.objects.filter(pk__lte=3).centroid
@@ -0,0 +1,83 @@
+import csv
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.test import TestCase
+from uk_geo_utils.management.commands.clean_addressbase import (
+    Command, FIELDNAMES, find_chunks)
+
+
+def make_row(uprn, **fields):
+    row = dict.fromkeys(FIELDNAMES, '')
+    row['UPRN'] = uprn
+    row.update(fields)
+    return [row[field] for field in FIELDNAMES]
+
+
+class CleanAddressBaseTest(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        rows = [
+            make_row(str(uprn), BUILDING_NUMBER=str(uprn),
+                     THOROUGHFARE='BONEHURST ROAD', POST_TOWN='HORLEY',
+                     POSTCODE='RH6 8QG', LATITUDE='51.1', LONGITUDE='-0.1')
+            for uprn in range(1, 51)
+        ]
+        rows.append(make_row(
+            '51', ORGANISATION_NAME='MELA', BUILDING_NAME='1-7',
+            THOROUGHFARE='LINKFIELD STREET', POST_TOWN='REDHILL',
+            POSTCODE='RH1 1AA', LATITUDE='51.2', LONGITUDE='-0.2'))
+        with open(os.path.join(self.path, 'ab.csv'), 'w') as f:
+            csv.writer(f).writerows(rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def clean(self, **opts):
+        cmd = Command()
+        cmd.stdout = StringIO()
+        opts['ab_path'] = self.path
+        cmd.handle(**opts)
+        with open(os.path.join(self.path, 'addressbase_cleaned.csv')) as f:
+            return list(csv.reader(f))
+
+    def test_find_chunks(self):
+        csv_path = os.path.join(self.path, 'ab.csv')
+        chunks = find_chunks(csv_path, 100)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(0, chunks[0][0])
+        self.assertEqual(os.path.getsize(csv_path), chunks[-1][1])
+        with open(csv_path, 'rb') as f:
+            data = f.read()
+        for start, end in chunks:
+            # every chunk is a whole number of lines
+            self.assertTrue(data[start:end].endswith(b'\n'))
+
+    def test_clean(self):
+        rows = self.clean()
+        self.assertEqual(51, len(rows))
+        self.assertEqual(
+            ['1', '1 BONEHURST ROAD, HORLEY', 'RH6 8QG', 'SRID=4326;POINT(-0.1 51.1)'],
+            rows[0])
+        self.assertEqual(
+            ['51', 'MELA, 1-7 LINKFIELD STREET, REDHILL', 'RH1 1AA', 'SRID=4326;POINT(-0.2 51.2)'],
+            rows[-1])
+
+        # no temp files left behind
+        self.assertEqual(
+            ['ab.csv', 'addressbase_cleaned.csv'], sorted(os.listdir(self.path)))
+
+    def test_clean_in_parallel(self):
+        # lots of small chunks, cleaned by 2 processes,
+        # should give us exactly the same output in the same order
+        self.assertEqual(
+            self.clean(),
+            self.clean(workers=2, chunk_size=0.0001))
+
+    def test_blank_lines(self):
+        expected = self.clean()
+        with open(os.path.join(self.path, 'ab.csv'), 'a') as f:
+            f.write('\n\n')
+        self.assertEqual(expected, self.clean())
@@ -1,7 +1,7 @@
 import os
 from io import StringIO
 from django.test import TestCase, override_settings
-from uk_geo_utils.models import Address
+from uk_geo_utils.models import Address, PostcodeCentroid
 from uk_geo_utils.management.commands.import_cleaned_addresses import Command
 
 
@@ -37,3 +37,10 @@ class CleanedAddressImportTest(TestCase):
 
         # ensure all our tasty data has been imported
         self.assertEqual(4, Address.objects.count())
+
+        # and we have a centroid for each postcode
+        self.assertEqual(4, PostcodeCentroid.objects.count())
+        centroid = PostcodeCentroid.objects.get(pk='BL2 3JA')
+        self.assertAlmostEqual(-2.3886188, centroid.location.x)
+        self.assertAlmostEqual(53.6028404, centroid.location.y)
+        self.assertEqual(1, centroid.num_addresses)
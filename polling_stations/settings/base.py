@@ -267,6 +267,88 @@ TEST_RUNNER = 'django.test.runner.DiscoverRunner'
 ADDRESS_MODEL = 'addressbase.Address'
 
 
+"""
+In-memory polling district index
+
+Set ENABLED to True to resolve a point to a polling district using
+an index held in memory by each process instead of a PostGIS query.
+
+CHECK_INTERVAL is how often (in seconds) each process checks whether
+a council has been re-imported since it built its index. This relies on
+a cache shared between processes (e.g: redis) in production.
+"""
+POLLING_DISTRICT_INDEX = {
+    'ENABLED': False,
+    'CHECK_INTERVAL': 60,
+}
+
+
+"""
+In-memory council resolver
+
+Set ENABLED to True to resolve a point to a council using simplified
+council boundaries held in memory by each process (falling back to the
+exact boundary in the DB for points close to an edge) instead of
+querying the councils table on every postcode lookup.
+Importers always use the resolver.
+"""
+COUNCIL_RESOLVER = {
+    'ENABLED': False,
+}
+
+
+"""
+Routing cache
+
+Set ENABLED to True to cache the decision RoutingHelper makes for each
+postcode (route type, address slug, council ids) so the homepage form,
+the postcode views and the API don't repeat the same queries for every
+step of a user journey. CACHE is the name of the entry in CACHES to use:
+the default local memory cache, or a django-redis cache in production
+so the cache is shared between processes. Importers invalidate the
+cache whenever they change a council's data.
+"""
+ROUTING_CACHE = {
+    'ENABLED': False,
+    'CACHE': 'default',
+    'TIMEOUT': 60 * 60,
+}
+
+
+"""
+Geocode cache
+
+Set ENABLED to True to cache what AddressBaseGeocoder finds for each
+postcode (the location and ONSUD codes of each UPRN) across requests.
+CACHE is the name of the entry in CACHES to use: the default local
+memory cache or a django-redis cache shared between processes.
+import_cleaned_addresses and import_onsud invalidate the cache.
+"""
+GEOCODE_CACHE = {
+    'ENABLED': False,
+    'CACHE': 'default',
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+
+"""
+Precomputed postcode answers
+
+Set ENABLED to True to build a PostcodeAnswer row for every postcode
+in a council after we import it (or run the build_postcode_answers
+command) and answer PostcodeView and API requests from that table
+when we have a row for the postcode.
+
+Importing or tearing down a council also drops (and, for an import,
+rebuilds) the answers its data affects in neighbouring councils.
+Answers aren't updated when AddressBase, ONSUD, ONSPD or the blacklist
+change: run build_postcode_answers --all after importing those.
+"""
+POSTCODE_ANSWERS = {
+    'ENABLED': False,
+}
+
+
 EMAIL_SIGNUP_ENDPOINT = 'https://democracyclub.org.uk/mailing_list/api_signup/v1/'
 EMAIL_SIGNUP_API_KEY = ''
 
@@ -15,3 +15,10 @@ We can change the section name using the BOTO_SECTION setting
 """
 BOTO_SECTION = 'wheredoivote'
 S3_DATA_BUCKET = 'pollingstations-data'
+
+"""
+S3Wrapper keeps a manifest of the ETag and size of every file it
+has downloaded and only fetches files which have changed,
+using up to S3_FETCH_WORKERS threads at once.
+"""
+S3_FETCH_WORKERS = 8